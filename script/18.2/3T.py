@@ -1,4 +1,8 @@
 import math
+import time
+import os
+import tempfile
+from System.Collections.Generic import List
 
 # ---------------------------------------------------------
 # sketching 2D operations
@@ -58,6 +62,16 @@ def datum_plane(dot, dir1, dir2, name='default'):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    # a single item or any collection of them
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
+def box(body):
+    return body.Shape.GetBoundingBox(Matrix.Identity)
+
 # ---------------------------------------------------------
 # manipulating operations
 # ---------------------------------------------------------
@@ -99,11 +113,118 @@ def copy(name, item, (x, y, z)):
     move(new, (x, y, z))
     new.SetName(name)
 
-def split_by_plane(body, cutter):
-    SplitBody.Execute(select(body), select(cutter))
+def copy_block(name, items, (x, y, z)):
+    Copy.ToClipboard(select(items))
+    created = list(Paste.FromClipboard().CreatedObjects)
+    for new in created:
+        move(new, (x, y, z))
+        new.SetName(name)
+    return created
+
+def pattern(name, item, (x, y, z), count):
+    # one linear pattern in the form SpaceClaim records it,
+    # the direction a selection of a datum line dropped after
+    # and an info argument, not run against SpaceClaim yet
+    before = len(GetRootPart().Components)
+    axis = datum_line((0, 0, 0), (x, y, z), 'pattern')
+    data = LinearPatternData()
+    data.PatternDimension = PatternDimensionType.One
+    data.LinearDirection = select(axis)
+    data.CountX = count
+    data.PitchX = (x ** 2 + y ** 2 + z ** 2) ** .5
+    Pattern.CreateLinear(select(item), data, None)
+    delete(axis)
+    for new in GetRootPart().Components[before:]:
+        new.SetName(name)
+
+def instance(name, item, (x, y, z)):
+    new = Component.Create(GetRootPart(), item.Template)
+    new.Transform(item.Placement)
+    move(new, (x, y, z))
+    new.SetName(name)
 
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
+def replicate(name, item, (x, y, z), count, mode='copy'):
+    # instances share the template geometry instead of
+    # pasting a full copy
+    if mode == 'doubling':
+        # paste the stack built so far, 1, 2, 4, ... sections
+        # plus the remainder, in the same order as one by one
+        stack = [item]
+        while len(stack) < count:
+            block = stack[:count - len(stack)]
+            n = len(stack)
+            stack += copy_block(name, block, (n * x, n * y, n * z))
+        return
+    if mode == 'pattern':
+        pattern(name, item, (x, y, z), count)
+        return
+    for i in range(1, count):
+        if mode == 'instance':
+            instance(name, item, (i * x, i * y, i * z))
+        else:
+            copy(name, item, (i * x, i * y, i * z))
+
+def split_by_plane(bodies, cutters):
+    return split_bodies(bodies, cutters)
+
+def split_by_face(bodies, cutters):
+    return split_bodies(bodies, cutters, True)
+
+def split_bodies(bodies, cutters, extend=False):
+    # every body by every cutter in a single SplitBody call,
+    # returns the pieces of each body in the order of bodies
+    #
+    # pieces keep the name of their body, so the bodies are
+    # tagged for the call and get their own names back after
+    bodies, cutters = as_list(bodies), as_list(cutters)
+    names = [x.GetName() for x in bodies]
+    parts = []
+    for i, body in enumerate(bodies):
+        body.SetName('split-{}'.format(i))
+        if body.Parent not in parts:
+            parts.append(body.Parent)
+    if extend:
+        SplitBody.ByCutter(select(bodies), select(cutters), True)
+    else:
+        SplitBody.Execute(select(bodies), select(cutters))
+    tags = dict(('split-{}'.format(i), i) for i in range(len(bodies)))
+    pieces = [[] for x in bodies]
+    for part in parts:
+        for body in part.Bodies:
+            i = tags.get(body.GetName())
+            if i is not None:
+                pieces[i].append(body)
+                body.SetName(names[i])
+    return pieces
+
+def reach(body):
+    # radial extent of the bounding box of the body
+    low, high = box(body).MinCorner, box(body).MaxCorner
+    return max(abs(low.X), abs(low.Y), abs(high.X), abs(high.Y))
+
+def crosses(body, cutter, tolerance=0):
+    # the datum plane passes through the bounding box of
+    # the body rather than just touching it
+    frame = cutter.Shape.Geometry.Frame
+    low, high = box(body).MinCorner, box(body).MaxCorner
+    origin, normal = frame.Origin, frame.DirZ
+    distances = [(x - origin.X) * normal.X +
+                 (y - origin.Y) * normal.Y +
+                 (z - origin.Z) * normal.Z
+                 for x in [low.X, high.X]
+                 for y in [low.Y, high.Y]
+                 for z in [low.Z, high.Z]]
+    return min(distances) < -tolerance and max(distances) > tolerance
+
+def plan_split(cutters, where=None, tolerance=0):
+    # splits by each plane only the root bodies it crosses,
+    # whatever order the kernel keeps the bodies in
+    for cutter in as_list(cutters):
+        bodies = [x for x in GetRootPart().Bodies
+                  if (not where or where(x)) and
+                  crosses(x, cutter, tolerance)]
+        if bodies:
+            split_by_plane(bodies, cutter)
 
 def merge_bodies(bodies):
     result = Combine.Merge(select(bodies))
@@ -114,12 +235,22 @@ def component(bodies):
 # ---------------------------------------------------------
 # named selections operations
 # ---------------------------------------------------------
+pending = []
+
 def named_selection(name, items, desc=None):
+    # queued until create_groups()
     if desc:
         items = [x for x, d in zip(items, desc) if d]        
-    select = Selection.Create(items)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
+    pending.append((name, list(items)))
+
+def create_groups():
+    # every queued named selection, one Group.Create each as
+    # the API has no batch call, with its final name so nothing
+    # depends on the localized default name of a new group
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
 
 def equals(x, y):
     if y != 0:
@@ -127,18 +258,22 @@ def equals(x, y):
     else:
         return abs(x) <= 1e-3
 
+def unique(items):
+    # items in order, each one once however many times it
+    # is reached
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
 def gather_faces(bodies):
-    faces = []
-    for body in bodies:
-        faces += body.Faces
-    return faces
+    return list(unique(x for body in bodies for x in body.Faces))
 
 def gather_edges(bodies):
-    edges = []
-    for body in bodies:
-        for face in body.Faces:
-            edges += face.Edges
-    return edges
+    # body.Edges has an edge shared by two faces once,
+    # walking face.Edges met it twice
+    return list(unique(x for body in bodies for x in body.Edges))
 
 # ---------------------------------------------------------
 # finishing operations
@@ -154,6 +289,7 @@ def delete_all():
            GetRootPart().DatumPlanes,
            GetRootPart().DatumLines,
            GetRootPart().DatumPoints)
+    del pending[:]
 
 def share_topology(tolerance=MM(.1)):
     options = ShareTopologyOptions()
@@ -201,10 +337,16 @@ delta1 = MM(.48)
 delta2 = MM(.05)
 split = .74
 
+# test sections are replicated by 'copy', 'instance',
+# 'doubling' or 'pattern', instances are only made
+# independent by share_topology when PreserveInstances is off,
+# 'pattern' is written to the recorded call form but not run
+replication = 'copy'
+
 # ---------------------------------------------------------
 # define builder function
 # ---------------------------------------------------------
-def builder(height, pitch):
+def builder(height, pitch, path=None):
     
     delete_all()
 
@@ -265,42 +407,34 @@ def builder(height, pitch):
     result = sketch.finish()
     revolve(result, line_1)
 
-    # make axial and radial cuts
+    # make axial and radial cuts where the planes cross the
+    # bodies: axial ones inside the rib, radial ones outside
+    # the o-grid square, halfway marks leave room for loose
+    # bounding boxes
+    inside = lambda x: reach(x) < radius - height/2
+    outside = lambda x: reach(x) > (ogrid + radius - height)/2
+
     cut_axial_1 = datum_plane(
         (0, 0, pitch/2 - delta1/2),
         Direction.DirX, Direction.DirY)
     cut_axial_2 = datum_plane(
         (0, 0, pitch/2 - delta1/2 + delta2),
         Direction.DirX, Direction.DirY)
-    split_by_plane(GetRootPart().Bodies[0], cut_axial_1)
-    split_by_plane(GetRootPart().Bodies[1], cut_axial_1)
-
-    split_by_plane(GetRootPart().Bodies[5], cut_axial_2)
-    split_by_plane(GetRootPart().Bodies[6], cut_axial_2)
+    plan_split([cut_axial_1, cut_axial_2], inside, TOL)
 
     cut_radial_1 = datum_plane((0, 0, 0),
                                Direction.DirX, Direction.DirZ)
     cut_radial_2 = datum_plane((0, 0, 0),
                                Direction.DirY, Direction.DirZ)
-    split_by_plane(GetRootPart().Bodies[1],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[2],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[3],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[4],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[6],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[8],  cut_radial_1)
-
-    split_by_plane(GetRootPart().Bodies[1],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[2],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[3],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[4],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[6],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[8],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[9],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[10], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[11], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[12], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[13], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[14], cut_radial_2)
+    plan_split([cut_radial_1, cut_radial_2], outside, TOL)
+
+    # the rib is the solid, found by where it is in its own
+    # section, which starts at z0, rather than by the order
+    # the splits left the bodies in
+    rib = lambda x, z0: not inside(x) and \
+        box(x).MinCorner.Z >= z0 + pitch/2 - delta1/2 - TOL and \
+        box(x).MaxCorner.Z <= z0 + pitch/2 + delta1/2 + TOL
+    assert len([x for x in GetRootPart().Bodies if rib(x, 0)]) == 4
 
     # move to component - translate - copy
     component(GetRootPart().Bodies)
@@ -309,8 +443,10 @@ def builder(height, pitch):
 
     move(test, (0, 0,length_stb))
 
-    for i in range(1, nsecs):
-        copy('test', test, (0, 0, i * pitch))
+    start = time.time()
+    replicate('test', test, (0, 0, pitch), nsecs, replication)
+    if timings is not None:
+        timings.append((replication, pitch, nsecs, time.time() - start))
 
     
     # ---------------------------------------------------------
@@ -350,13 +486,7 @@ def builder(height, pitch):
     revolve(result, line_1)
 
     # make radial cuts
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[2], cut_radial_1)
-
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[2], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[3], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[4], cut_radial_2)
+    plan_split([cut_radial_1, cut_radial_2], outside, TOL)
 
     # move to component - translate - copy
     component(GetRootPart().Bodies)
@@ -384,11 +514,11 @@ def builder(height, pitch):
     bodies_fluid = []
     for i in range(nsecs):
         bodies = tests[i].GetBodies()
-        for j in range(27):
-            if j in [3, 11, 17, 23]:
-                bodies_solid.append(bodies[j])
-            else:
-                bodies_fluid.append(bodies[j])
+        z0 = min(box(x).MinCorner.Z for x in bodies)
+        solid = [x for x in bodies if rib(x, z0)]
+        assert len(solid) == 4
+        bodies_solid += solid
+        bodies_fluid += [x for x in bodies if x not in solid]
     for body in stab1.GetBodies() + stab2.GetBodies():
         bodies_fluid.append(body)
     named_selection('solid', bodies_solid)
@@ -448,10 +578,42 @@ def builder(height, pitch):
     desc = [equals(x, length_stb) for x in spans]
     named_selection('axi3', edges, desc)
 
+    create_groups()
+
     # save everything
-    save('C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3T-{}-{}'.\
+    save(path or 'C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3T-{}-{}'.\
          format(heights.get(height), pitches.get(pitch)))
 
+# ---------------------------------------------------------
+# benchmark replication modes
+# ---------------------------------------------------------
+# (mode, pitch, sections, seconds) of every replication
+# while benchmark() runs, None leaves the builds untimed
+timings = None
+
+def benchmark(height, modes=('copy', 'doubling'), folder=None):
+    # builds every pitch with each mode into folder, a
+    # temporary one by default so the saved variants are left
+    # alone, the geometry is the same whatever the mode
+    global replication, timings
+    default = replication
+    folder = folder or tempfile.mkdtemp()
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    timings = []
+    try:
+        for pitch in pitches.keys():
+            for mode in modes:
+                replication = mode
+                name = '{}-{}-{}'.format(mode, heights.get(height),
+                                         pitches.get(pitch))
+                builder(height, pitch, os.path.join(folder, name))
+        for mode, pitch, nsecs, seconds in timings:
+            print('{:<10}{:>8.4f}{:>6}{:>10.2f}'.format(
+                mode, pitch, nsecs, seconds))
+    finally:
+        replication, timings = default, None
+
 # ---------------------------------------------------------
 # start modeling
 # ---------------------------------------------------------
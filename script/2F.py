@@ -1,5 +1,7 @@
+import collections
 import math
 import time
+from System.Collections.Generic import List
 
 ''' -------------------------------------------------------
 sketching 2D operations
@@ -59,6 +61,13 @@ def datum_plane(dot, dir1, dir2, name='default'):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    ''' a single item or any collection of them '''
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
 ''' -------------------------------------------------------
 manipulating operations
 ------------------------------------------------------- '''
@@ -73,22 +82,26 @@ def copy(name, item, direction, length):
     move(new, direction, length)
     new.SetName(name)
 
-def split_by_plane(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter))
-
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
-
 def component(bodies):
     ComponentHelper.MoveBodiesToComponent(select(bodies))
 
 ''' -------------------------------------------------------
 named selections operations
 ------------------------------------------------------- '''
+pending = []
+
 def named_selection(name, items):
-    select = Selection.Create(items)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
+    ''' queued until create_groups() '''
+    pending.append((name, list(items)))
+
+def create_groups():
+    ''' every queued named selection, one Group.Create each as
+    the API has no batch call, with its final name so nothing
+    depends on the localized default name of a new group '''
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
 
 def equals(x, y):
     if y != 0:
@@ -96,18 +109,128 @@ def equals(x, y):
     else:
         return abs(x) <= 1e-3
 
+def unique(items):
+    ''' items in order, each one once however many times it
+    is reached '''
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
 def gather_faces(bodies):
-    faces = []
-    for body in bodies:
-        faces += body.Faces
-    return faces
+    return list(unique(x for body in bodies for x in body.Faces))
 
 def gather_edges(bodies):
-    edges = []
-    for body in bodies:
-        for face in body.Faces:
-            edges += face.Edges
-    return edges
+    ''' body.Edges has an edge shared by two faces once,
+    walking face.Edges met it twice '''
+    return list(unique(x for body in bodies for x in body.Edges))
+
+''' -------------------------------------------------------
+descriptor tables
+------------------------------------------------------- '''
+def edge_values(edge):
+    point = edge.EvalMid().Point
+    return [edge.GetInterval().Span, point.Y, point.Z]
+
+def tabulate(groups, entities, columns, values):
+    ''' every entity evaluated once into columns, groups are
+    (name, bodies) pairs and name goes to the group column '''
+    table = dict((x, []) for x in ['item', 'group'] + columns)
+    for group, bodies in groups:
+        for body in bodies:
+            for item in entities(body):
+                table['item'].append(item)
+                table['group'].append(group)
+                for name, value in zip(columns, values(item)):
+                    table[name].append(value)
+    return table
+
+def tabulate_edges(groups):
+    return tabulate(groups, lambda x: x.Edges,
+                    ['span', 'y', 'z'], edge_values)
+
+def evaluate(spec, table):
+    ''' selections of a spec from one pass over the rows of a
+    table, spec is a list of (name, rule) where rule is either
+    a predicate over a row, the columns being its attributes,
+    or a set operation (op, name, name) with op one of '|',
+    '&' and '-' on selections listed before it
+
+    names starting with an underscore are operands only and
+    are left out of the result '''
+    operations = {'|': set.union, '&': set.intersection,
+                  '-': set.difference}
+    columns = sorted(table)
+    Row = collections.namedtuple('Row', columns)
+    tests = [(name, rule) for name, rule in spec if callable(rule)]
+    chosen = dict((name, set()) for name, rule in tests)
+    for i, values in enumerate(zip(*[table[x] for x in columns])):
+        row = Row(*values)
+        for name, rule in tests:
+            if rule(row):
+                chosen[name].add(i)
+    for name, rule in spec:
+        if not callable(rule):
+            op, a, b = rule
+            chosen[name] = operations[op](chosen[a], chosen[b])
+    selections = collections.OrderedDict()
+    for name, rule in spec:
+        if not name.startswith('_'):
+            selections[name] = [table['item'][i]
+                                for i in sorted(chosen[name])]
+    return selections
+
+''' -------------------------------------------------------
+expected inventory
+------------------------------------------------------- '''
+def inventory():
+    ''' bodies, faces and edges of the build, the size of every
+    named selection and the fluid area, from the parameters
+    alone: three quadrilaterals, two stabilizers and the test
+    section '''
+    return {
+        'bodies': 3,
+        'faces': 3,
+        'edges': 12,
+        'fluid': 3,
+        'axis': 3,
+        'inlet': 1,
+        'outlet': 1,
+        'wall-fluid': 1,
+        'wall-out': 2,
+        'rad2': 6,
+        'axi1': 2,
+        'axi3': 4,
+        'fluid area': radius * length_all}
+
+def measure(groups, size, unit):
+    ''' the same inventory counted on the built bodies, groups
+    maps 'solid'/'fluid' to bodies, and on the queued named
+    selections '''
+    bodies = [x for kind in groups for x in groups[kind]]
+    actual = dict((name, len(items)) for name, items in pending)
+    actual['bodies'] = len(bodies)
+    actual['faces'] = len(gather_faces(bodies))
+    actual['edges'] = len(gather_edges(bodies))
+    for kind in groups:
+        actual['{} {}'.format(kind, unit)] = \
+            sum(size(x) for x in groups[kind])
+    return actual
+
+def check(expected, actual, rtol=1e-3):
+    ''' every difference at once, counts must match exactly
+    and sizes within rtol '''
+    wrong = []
+    for name in sorted(expected):
+        x, y = expected[name], actual.get(name)
+        if isinstance(x, int):
+            same = x == y
+        else:
+            same = y is not None and abs(x - y) <= rtol * abs(x)
+        if not same:
+            wrong.append('{}: expected {}, got {}'.format(name, x, y))
+    assert not wrong, '\n'.join(wrong)
 
 ''' -------------------------------------------------------
 finishing operations
@@ -123,6 +246,7 @@ def delete_all():
            GetRootPart().DatumPlanes,
            GetRootPart().DatumLines,
            GetRootPart().DatumPoints)
+    del pending[:]
 
 def share_topology(tolerance=MM(.1)):
     options = ShareTopologyOptions()
@@ -139,6 +263,17 @@ def zoom():
     Selection.Clear()
     ViewHelper.ZoomToEntity()
 
+''' -------------------------------------------------------
+batch parameters
+------------------------------------------------------- '''
+def parameter(name, default=None):
+    ''' script parameters injected by a batch run,
+    see tools/bench.py '''
+    try:
+        return getattr(Parameters, name)
+    except (NameError, AttributeError):
+        return default
+
 ''' -------------------------------------------------------
 START FROM HERE
 ------------------------------------------------------- '''
@@ -152,6 +287,11 @@ diameter = 2 * radius
 length_all = 50 * diameter
 length_stb = 10 * diameter
 
+''' True counts the build against its expected inventory,
+whose counts are calibrated on tools/standin.py only, where
+share topology imprints nothing, so it is off by default '''
+validate = False
+
 ''' -------------------------------------------------------
 define builder function
 ------------------------------------------------------- '''
@@ -212,46 +352,34 @@ def builder():
 
     named_selection('fluid', gather_faces(all_bodies))
 
-    edges = gather_edges(all_bodies)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, 0)]
-    named_selection('axis', select)
-
-    edges = gather_edges(stab1_bodies)
-    select = [x for x in edges if 
-              equals(x.EvalMid().Point.Z, 0)]
-    named_selection('inlet', select)
-
-    edges = gather_edges(stab2_bodies)
-    select = [x for x in edges if 
-        equals(x.EvalMid().Point.Z, length_all)]
-    named_selection('outlet', select)
-
-    edges = gather_edges(test1_bodies)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius)]
-    named_selection('wall-fluid', select)
-
-    edges = gather_edges(stab1_bodies + stab2_bodies)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius)]
-    named_selection('wall-out', select)
-
-    ''' mesher named selections '''
-    edges = gather_edges(all_bodies)
-    spans = [x.GetInterval().Span for x in edges]
-
-    select = [x for x, y in zip(edges, spans) if 
-              equals(y, radius)]
-    named_selection('rad2', select)
-
-    select = [x for x, y in zip(edges, spans) if
-              equals(y, length_all - 2 * length_stb)]
-    named_selection('axi1', select)
-
-    select = [x for x, y in zip(edges, spans) if
-              equals(y, length_stb)]
-    named_selection('axi3', select)
+    ''' evaluate every edge once, fluent selections first,
+    then the mesher ones '''
+    edges = tabulate_edges([('stab1', stab1_bodies),
+                            ('stab2', stab2_bodies),
+                            ('test', test1_bodies)])
+    spec = [
+        ('axis', lambda x: equals(x.y, 0)),
+        ('inlet', lambda x: x.group == 'stab1' and equals(x.z, 0)),
+        ('outlet', lambda x: x.group == 'stab2' and
+                             equals(x.z, length_all)),
+        ('_wall', lambda x: equals(x.y, radius)),
+        ('wall-fluid', lambda x: x.group == 'test' and
+                                 equals(x.y, radius)),
+        ('wall-out', ('-', '_wall', 'wall-fluid')),
+        ('rad2', lambda x: equals(x.span, radius)),
+        ('axi1', lambda x: equals(x.span, length_all - 2 * length_stb)),
+        ('axi3', lambda x: equals(x.span, length_stb))]
+    for name, items in evaluate(spec, edges).items():
+        named_selection(name, items)
+
+    ''' counted against the model before anything is created,
+    an edge dropped or picked twice by a predicate fails here '''
+    if validate:
+        actual = measure({'fluid': all_bodies},
+                         lambda x: sum(y.Area for y in x.Faces), 'area')
+        check(inventory(), actual)
+
+    create_groups()
 
     ''' save everything '''
     save('C:\\users\\frenc\\yandexdisk\\cfd\\geo\\2F-00-000')
@@ -259,4 +387,6 @@ def builder():
 ''' -------------------------------------------------------
 start modeling
 ------------------------------------------------------- '''
+validate = str(parameter('validate', validate)) != 'False'
+
 builder()
@@ -1,5 +1,14 @@
+import collections
+import bisect
 import math
 import time
+import hashlib
+import io
+import json
+import os
+import tempfile
+from System.Collections.Generic import List
+from System.Runtime.InteropServices import ExternalException
 
 ''' -------------------------------------------------------
 sketching 2D operations
@@ -9,6 +18,8 @@ class Sketch():
     def __init__(self, plane):
         self.curves = List[ITrimmedCurve]()
         self.plane = plane
+        self.loops = []
+        self.sides = set()
 
     def line(self, (x1, y1, z1), (x2, y2, z2)):
         pt1 = Point.Create(x1, y1, z1)
@@ -26,9 +37,46 @@ class Sketch():
         result = CurveSegment.Create(Circle.Create(frame, radius), interval)
         self.curves.Add(result)
 
-    def finish(self):
-        return PlanarBody.Create(self.plane, self.curves).\
-            CreatedBody.Faces[0]
+    def finish(self, role=None):
+        body = PlanarBody.Create(self.plane, self.curves).CreatedBody
+        tag([body], role)
+        return body.Faces[0]
+
+    def loop(self, label, *args):
+        ''' closed polygon labelled for finish_loops(), a side
+        another loop has drawn already is shared, not redrawn '''
+        self.loops.append((label, args))
+        for a, b in zip(args, args[1:] + args[:1]):
+            side = frozenset([a, b])
+            if side not in self.sides:
+                self.sides.add(side)
+                self.line(a, b)
+
+    def finish_loops(self, role=None, roles=None, validate=False):
+        ''' one planar body for all the loops, its faces as
+        (label, face) pairs in body order, each face goes to the
+        loop with the nearest bounding box center
+
+        role tags the body and its faces, roles maps a label to
+        the role of its face instead, validate checks that every
+        loop got exactly one face '''
+        body = PlanarBody.Create(self.plane, self.curves).CreatedBody
+        tag([body], role)
+        centers = [(label, [(min(x) + max(x))/2 for x in zip(*points)])
+                   for label, points in self.loops]
+        faces = []
+        for face in body.Faces:
+            point = face.MidPoint().Point
+            mid = [point.X, point.Y, point.Z]
+            label = min(centers, key=lambda x: sum(
+                (a - b) ** 2 for a, b in zip(mid, x[1])))[0]
+            faces.append((label, face))
+            if roles and label in roles:
+                tag_faces([face], roles[label])
+        if validate:
+            assert sorted(x for x, y in faces) == \
+                sorted(x for x, y in self.loops)
+        return faces
 
 ''' -------------------------------------------------------
 primitives
@@ -60,6 +108,13 @@ def datum_plane(dot, dir1, dir2, name='default'):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    ''' a single item or any collection of them '''
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
 ''' -------------------------------------------------------
 manipulating operations
 ------------------------------------------------------- '''
@@ -68,17 +123,115 @@ def move(item, direction, length):
     Move.Translate(select(item), direction, length, 
                    options)
 
+def objects():
+    return len(GetRootPart().Components) + len(GetRootPart().Bodies)
+
+def landed(components, bodies):
+    ''' objects added to the tree since it had that many
+    components and bodies '''
+    part = GetRootPart()
+    return list(part.Components)[components:] + \
+           list(part.Bodies)[bodies:]
+
+def paste(item, retries=5):
+    ''' pasted copies of item, only a clipboard held by another
+    process is retried, with backoff
+
+    a paste that landed without being reported is taken from
+    the tree, one that landed in part is deleted before the
+    next attempt, so no orphan shifts the components after it '''
+    count = len(item) if isinstance(item, list) else 1
+    for attempt in range(retries):
+        before = (len(GetRootPart().Components),
+                  len(GetRootPart().Bodies))
+        try:
+            Copy.ToClipboard(select(item))
+            created = list(Paste.FromClipboard().CreatedObjects)
+        except ExternalException:
+            created = []
+        if len(created) == count:
+            return created
+        new = landed(*before)
+        if len(new) == count:
+            return new
+        delete(new)
+        time.sleep(.1 * 2 ** attempt)
+    raise RuntimeError('failed to paste after {} retries'.format(retries))
+
 def copy(name, item, direction, length):
-    Copy.ToClipboard(select(item))
-    new = Paste.FromClipboard().CreatedObjects[0]
+    new = paste(item)[0]
     move(new, direction, length)
     new.SetName(name)
 
-def split_by_plane(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter))
+def copy_block(name, items, direction, length):
+    created = paste(items)
+    move(created, direction, length)
+    for new in created:
+        new.SetName(name)
+    return created
+
+def pattern(name, item, direction, pitch, count):
+    ''' count sections in one linear pattern, in the form
+    SpaceClaim records it: the direction is a selection, here
+    of a datum line dropped after, and CreateLinear takes an
+    info argument, not run against SpaceClaim yet '''
+    before = len(GetRootPart().Components)
+    axis = datum_line((0, 0, 0), (direction.X, direction.Y, direction.Z),
+                      'pattern')
+    data = LinearPatternData()
+    data.PatternDimension = PatternDimensionType.One
+    data.LinearDirection = select(axis)
+    data.CountX = count
+    data.PitchX = pitch
+    Pattern.CreateLinear(select(item), data, None)
+    delete(axis)
+    for new in GetRootPart().Components[before:]:
+        new.SetName(name)
+
+def instance(name, item, direction, length):
+    new = Component.Create(GetRootPart(), item.Template)
+    new.Transform(item.Placement)
+    move(new, direction, length)
+    new.SetName(name)
 
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
+def replicate(name, item, direction, pitch, count, mode='copy'):
+    ''' instances share the template geometry instead of
+    pasting a full copy, share_topology makes them independent '''
+    if mode == 'doubling':
+        ''' paste the stack built so far, 1, 2, 4, ... sections
+        plus the remainder, in the same order as one by one '''
+        stack = [item]
+        while len(stack) < count:
+            block = stack[:count - len(stack)]
+            stack += copy_block(name, block, direction,
+                                len(stack) * pitch)
+        return
+    if mode == 'pattern':
+        pattern(name, item, direction, pitch, count)
+        return
+    for i in range(1, count):
+        if mode == 'instance':
+            instance(name, item, direction, i * pitch)
+        else:
+            copy(name, item, direction, i * pitch)
+
+def tag(bodies, role):
+    ''' the role ('solid', 'fluid') of a body and of its faces
+    is kept as their text attribute, which copies and
+    instances carry, names are left to the builder '''
+    if role:
+        for body in bodies:
+            body.SetTextAttribute('role', role)
+            tag_faces(body.Faces, role)
+
+def tag_faces(faces, role):
+    for face in faces:
+        face.SetTextAttribute('role', role)
+
+def role(item):
+    ''' the role of a body or face, None if it has none '''
+    found, value = item.TryGetTextAttribute('role')
+    return value if found else None
 
 def component(bodies):
     ComponentHelper.MoveBodiesToComponent(select(bodies))
@@ -86,10 +239,20 @@ def component(bodies):
 ''' -------------------------------------------------------
 named selections operations
 ------------------------------------------------------- '''
+pending = []
+
 def named_selection(name, items):
-    select = Selection.Create(items)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
+    ''' queued until create_groups() '''
+    pending.append((name, list(items)))
+
+def create_groups():
+    ''' every queued named selection, one Group.Create each as
+    the API has no batch call, with its final name so nothing
+    depends on the localized default name of a new group '''
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
 
 def equals(x, y):
     if y != 0:
@@ -97,18 +260,174 @@ def equals(x, y):
     else:
         return abs(x) <= 1e-3
 
+def unique(items):
+    ''' items in order, each one once however many times it
+    is reached '''
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
 def gather_faces(bodies):
-    faces = []
-    for body in bodies:
-        faces += body.Faces
-    return faces
+    return list(unique(x for body in bodies for x in body.Faces))
 
 def gather_edges(bodies):
-    edges = []
-    for body in bodies:
-        for face in body.Faces:
-            edges += face.Edges
-    return edges
+    ''' body.Edges has an edge shared by two faces once,
+    walking face.Edges met it twice '''
+    return list(unique(x for body in bodies for x in body.Edges))
+
+''' -------------------------------------------------------
+descriptor tables
+------------------------------------------------------- '''
+def edge_values(edge):
+    point = edge.EvalMid().Point
+    return [edge.GetInterval().Span, point.Y, point.Z]
+
+def tabulate(groups, entities, columns, values):
+    ''' every entity evaluated once into columns, groups are
+    (name, bodies or faces) pairs and name goes to the group
+    column, an entity met again keeps its first group '''
+    table = dict((x, []) for x in ['item', 'group'] + columns)
+    seen = set()
+    for group, owners in groups:
+        for owner in owners:
+            for item in entities(owner):
+                if item in seen:
+                    continue
+                seen.add(item)
+                table['item'].append(item)
+                table['group'].append(group)
+                for name, value in zip(columns, values(item)):
+                    table[name].append(value)
+    return table
+
+def tabulate_edges(groups):
+    return tabulate(groups, lambda x: x.Edges,
+                    ['span', 'y', 'z'], edge_values)
+
+def evaluate(spec, table):
+    ''' selections of a spec from one pass over the rows of a
+    table, spec is a list of (name, rule) where rule is either
+    a predicate over a row, the columns being its attributes,
+    or a set operation (op, name, name) with op one of '|',
+    '&' and '-' on selections listed before it
+
+    names starting with an underscore are operands only and
+    are left out of the result '''
+    operations = {'|': set.union, '&': set.intersection,
+                  '-': set.difference}
+    columns = sorted(table)
+    Row = collections.namedtuple('Row', columns)
+    tests = [(name, rule) for name, rule in spec if callable(rule)]
+    chosen = dict((name, set()) for name, rule in tests)
+    for i, values in enumerate(zip(*[table[x] for x in columns])):
+        row = Row(*values)
+        for name, rule in tests:
+            if rule(row):
+                chosen[name].add(i)
+    for name, rule in spec:
+        if not callable(rule):
+            op, a, b = rule
+            chosen[name] = operations[op](chosen[a], chosen[b])
+    selections = collections.OrderedDict()
+    for name, rule in spec:
+        if not name.startswith('_'):
+            selections[name] = [table['item'][i]
+                                for i in sorted(chosen[name])]
+    return selections
+
+''' -------------------------------------------------------
+axial index
+------------------------------------------------------- '''
+class Slabs():
+    ''' items bucketed by the axial position of their midpoint,
+    those at one of the sorted bounds are a bisect away '''
+
+    def __init__(self, items, bounds, tolerance, z=None):
+        self.bounds = sorted(bounds)
+        self.tolerance = tolerance
+        self.planes = [[] for x in self.bounds]
+        z = z or (lambda x: x.EvalMid().Point.Z)
+        for item in items:
+            i, at = self.locate(z(item))
+            if at:
+                self.planes[i].append(item)
+
+    def locate(self, z):
+        i = bisect.bisect_left(self.bounds, z - self.tolerance)
+        at = i < len(self.bounds) and \
+             self.bounds[i] <= z + self.tolerance
+        return i, at
+
+    def at(self, z):
+        ''' items at the bound z '''
+        i, at = self.locate(z)
+        return list(self.planes[i]) if at else []
+
+''' -------------------------------------------------------
+expected inventory
+------------------------------------------------------- '''
+def inventory(height, pitch, nsecs):
+    ''' bodies, faces and edges of a build, the size of every
+    named selection and the solid and fluid areas, from the
+    parameters alone
+
+    every test section is a single body of 6 quadrilateral
+    faces in 2 rows, one of them the rib, and every stabilizer
+    one of 2 faces, edges inside a body are shared '''
+    stabs = 0 if periodic else 2
+    expected = {
+        'bodies': nsecs + stabs,
+        'faces': 6 * nsecs + 2 * stabs,
+        'edges': 17 * nsecs + 7 * stabs,
+        'solid': nsecs,
+        'fluid': 5 * nsecs + 2 * stabs,
+        'wall-fluid': 2 * nsecs,
+        'wall-solid': nsecs,
+        'sides': 3 * nsecs,
+        'axis': 3 * nsecs + stabs,
+        'rad1': 4 * nsecs + 2 * stabs,
+        'rad2': 4 * nsecs + 2 * stabs,
+        'axi1': 6 * nsecs,
+        'axi2': 3 * nsecs}
+    if periodic:
+        expected.update({'periodic-in': 2, 'periodic-out': 2})
+    else:
+        expected.update({'inlet': 2, 'outlet': 2, 'wall-out': 2,
+                         'axi3': 3 * stabs})
+    length = pitch if periodic else 2 * length_stb + nsecs * pitch
+    solid = nsecs * height * (delta1 + delta2)/2
+    expected['solid area'] = solid
+    expected['fluid area'] = radius * length - solid
+    return expected
+
+def measure(bodies, groups, size, unit):
+    ''' the same inventory counted on the built bodies, groups
+    maps 'solid'/'fluid' to faces, and on the queued named
+    selections '''
+    actual = dict((name, len(items)) for name, items in pending)
+    actual['bodies'] = len(bodies)
+    actual['faces'] = len(gather_faces(bodies))
+    actual['edges'] = len(gather_edges(bodies))
+    for kind in groups:
+        actual['{} {}'.format(kind, unit)] = \
+            sum(size(x) for x in groups[kind])
+    return actual
+
+def check(expected, actual, rtol=1e-3):
+    ''' every difference at once, counts must match exactly
+    and sizes within rtol '''
+    wrong = []
+    for name in sorted(expected):
+        x, y = expected[name], actual.get(name)
+        if isinstance(x, int):
+            same = x == y
+        else:
+            same = y is not None and abs(x - y) <= rtol * abs(x)
+        if not same:
+            wrong.append('{}: expected {}, got {}'.format(name, x, y))
+    assert not wrong, '\n'.join(wrong)
 
 ''' -------------------------------------------------------
 finishing operations
@@ -124,6 +443,7 @@ def delete_all():
            GetRootPart().DatumPlanes,
            GetRootPart().DatumLines,
            GetRootPart().DatumPoints)
+    del pending[:]
 
 def share_topology(tolerance=MM(.1)):
     options = ShareTopologyOptions()
@@ -131,15 +451,342 @@ def share_topology(tolerance=MM(.1)):
     options.PreserveInstances = False
     ShareTopology.FindAndFix(options)
 
-def save(path):
-    path = '{}.scdoc'.format(path)
+def save(path, key=None):
     options = ExportOptions.Create()
-    DocumentSave.Execute(path, options)
+    DocumentSave.Execute('{}.scdoc'.format(path), options)
+    if key:
+        with open('{}.md5'.format(path), 'w') as f:
+            f.write(key)
+
+def fingerprint(*values):
+    ''' md5 of the script at script_path and the values a
+    variant is built from, None if the script cannot be read
+    back, which is said as every variant is then rebuilt '''
+    try:
+        with io.open(script_path, encoding='utf-8') as f:
+            source = f.read()
+    except (TypeError, IOError) as error:
+        print('no fingerprint, the variant is rebuilt: cannot read '
+              'the script ({}), pass script=<path>'.format(error))
+        return None
+    text = source + repr(values)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def built(path, key):
+    ''' whether path.scdoc was saved with the same fingerprint '''
+    if not key or not os.path.exists('{}.scdoc'.format(path)):
+        return False
+    try:
+        with io.open('{}.md5'.format(path)) as f:
+            return f.read().strip() == key
+    except IOError:
+        return False
 
 def zoom():
     Selection.Clear()
     ViewHelper.ZoomToEntity()
 
+''' -------------------------------------------------------
+batch parameters
+------------------------------------------------------- '''
+def parameter(name, default=None):
+    ''' script parameters injected by a batch run,
+    see tools/sweep.py '''
+    try:
+        return getattr(Parameters, name)
+    except (NameError, AttributeError):
+        return default
+
+''' -------------------------------------------------------
+tracing
+------------------------------------------------------- '''
+traced = ['Sketch.finish', 'Sketch.finish_loops', 'copy', 'move',
+          'replicate', 'component', 'share_topology', 'tabulate',
+          'evaluate', 'named_selection', 'measure', 'check',
+          'create_groups', 'save', 'delete_all']
+
+def patch(scope, names, wrapper):
+    ''' helpers or Class.method in scope replaced by what
+    wrapper(name, helper) makes of them, a name the script does
+    not have is an error rather than a helper left unwrapped '''
+    for name in names:
+        owner, _, attr = name.rpartition('.')
+        if owner:
+            owner = scope.get(owner)
+            if not hasattr(owner, attr):
+                raise NameError('no helper ' + name)
+            setattr(owner, attr, wrapper(name, getattr(owner, attr)))
+        elif name in scope:
+            scope[name] = wrapper(name, scope[name])
+        else:
+            raise NameError('no helper ' + name)
+
+class Tracer():
+    ''' opt-in timing of the CAD helpers, every call of a
+    wrapped helper is a complete event of a chrome trace
+    (chrome://tracing, perfetto) with the objects in the root
+    part after it, flush() writes the totals of a build as csv
+
+    clock is time.time in SpaceClaim, the stand-in of
+    tools/standin.py counts operations of the modeler instead '''
+
+    def __init__(self, folder, clock=time.time):
+        self.folder = folder
+        self.clock = clock
+        self.events = []
+        self.totals = collections.OrderedDict()
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def wrap(self, scope, names):
+        patch(scope, names, self.timed)
+
+    def timed(self, name, function):
+        def call(*args, **kwargs):
+            start = self.clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, start, self.clock())
+        return call
+
+    def record(self, name, start, end):
+        count = objects()
+        calls, seconds, most = self.totals.get(name, (0, 0., 0))
+        self.totals[name] = (calls + 1, seconds + end - start,
+                             max(most, count))
+        self.events.append({'name': name, 'ph': 'X',
+                            'pid': os.getpid(), 'tid': 0,
+                            'ts': int(start * 1e6),
+                            'dur': int((end - start) * 1e6),
+                            'args': {'objects': count}})
+
+    def flush(self, path):
+        ''' totals of the build saved to path as <name>.csv, the
+        trace so far as trace-<pid>.json for the whole sweep '''
+        name = os.path.basename(path)
+        with open(os.path.join(self.folder, name + '.csv'), 'w') as f:
+            f.write('operation,calls,seconds,mean,objects\n')
+            for key, (calls, seconds, most) in self.totals.items():
+                f.write('{},{},{:.4f},{:.4f},{}\n'.format(
+                    key, calls, seconds, seconds / calls, most))
+        self.totals.clear()
+        trace = 'trace-{}.json'.format(os.getpid())
+        with open(os.path.join(self.folder, trace), 'w') as f:
+            json.dump({'traceEvents': self.events,
+                       'displayTimeUnit': 'ms'}, f)
+
+tracer = None
+
+''' -------------------------------------------------------
+journal
+------------------------------------------------------- '''
+journaled = ['Sketch.finish', 'Sketch.finish_loops', 'copy', 'move',
+             'replicate', 'component', 'delete', 'delete_all',
+             'share_topology', 'named_selection', 'create_groups', 'save']
+
+''' arguments of a helper that are lengths, by position,
+scaled on replay together with every point and radius '''
+lengths = {'move': [2], 'copy': [3], 'replicate': [3],
+           'share_topology': [0]}
+
+class Journal():
+    ''' opt-in record of the helpers that change the document,
+    every outermost call in order with its arguments resolved
+    to numbers, geometry and addresses of bodies, faces and
+    edges, flush() writes the journal of a build as json
+
+    replay() makes the calls of a journal again and nothing
+    else, none of the bookkeeping between them, the tables and
+    predicates of the named selections included '''
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.calls = []
+        self.depth = 0
+        self.places = None
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def wrap(self, scope, names):
+        patch(scope, names, self.recorded)
+
+    def recorded(self, name, function):
+        def call(*args, **kwargs):
+            if not self.depth:
+                self.calls.append([name, [self.encode(x) for x in args],
+                                   dict((k, self.encode(v))
+                                        for k, v in kwargs.items())])
+            self.depth += 1
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.depth -= 1
+                ''' named selections only queue, anything else
+                may change where things are '''
+                if name != 'named_selection':
+                    self.places = None
+        return call
+
+    def encode(self, value):
+        ''' an argument as json, see decode() '''
+        if value is None or isinstance(value, (bool, int, long, float,
+                                               basestring)):
+            return value
+        if isinstance(value, Direction):
+            return {'direction': [value.X, value.Y, value.Z]}
+        if isinstance(value, Point):
+            return {'point': [value.X, value.Y, value.Z]}
+        if isinstance(value, Frame):
+            return {'frame': [self.encode(x) for x in
+                              [value.Origin, value.DirX, value.DirY]]}
+        if isinstance(value, Plane):
+            return {'plane': self.encode(value.Frame)}
+        if isinstance(value, Line):
+            return {'line': [self.encode(value.Origin),
+                             self.encode(value.Direction)]}
+        if isinstance(value, CurveSegment):
+            if isinstance(value.Geometry, Circle):
+                return {'arc': [self.encode(value.Geometry.Frame),
+                                value.Geometry.Radius,
+                                value.Bounds.Start, value.Bounds.End]}
+            return {'segment': [self.encode(value.StartPoint),
+                                self.encode(value.EndPoint)]}
+        if isinstance(value, Sketch):
+            return {'sketch': [self.encode(value.plane),
+                               self.encode(value.curves),
+                               getattr(value, 'loops', [])]}
+        if isinstance(value, (DesignBody, DesignFace, DesignEdge,
+                              Component, DatumPlane)):
+            return {'item': self.address(value)}
+        if isinstance(value, dict):
+            return {'dict': [[self.encode(x), self.encode(y)]
+                             for x, y in value.items()]}
+        return [self.encode(x) for x in value]
+
+    def address(self, item):
+        ''' where item is in the root part, see find() '''
+        if self.places is None:
+            root = GetRootPart()
+            self.places = {}
+            for i, body in enumerate(root.Bodies):
+                self.places[body] = ['body', i]
+            for i, component in enumerate(root.Components):
+                self.places[component] = ['component', i]
+                for j, body in enumerate(component.GetBodies()):
+                    self.places[body] = ['component', i, j]
+            for i, datum in enumerate(root.DatumPlanes):
+                self.places[datum] = ['datum', i]
+        if item not in self.places:
+            ''' every face or edge of its body at once '''
+            body = item.Parent
+            kind = 'face' if isinstance(item, DesignFace) else 'edge'
+            entities = body.Faces if kind == 'face' else body.Edges
+            for k, entity in enumerate(entities):
+                self.places[entity] = self.places[body] + [kind, k]
+        return self.places[item]
+
+    def flush(self, path):
+        ''' calls of the build saved to path as <name>.journal.json '''
+        name = os.path.basename(path) + '.journal.json'
+        with open(os.path.join(self.folder, name), 'w') as f:
+            json.dump({'calls': self.calls}, f, separators=(',', ':'))
+        del self.calls[:]
+
+    @staticmethod
+    def replay(path, scale=1., output=None):
+        ''' the calls of the journal at path made again, lengths
+        times scale, saved to output instead of where the build
+        was saved if given, returns where it is saved '''
+        with open(path) as f:
+            calls = json.load(f)['calls']
+        scope = globals()
+        for name, args, kwargs in calls:
+            found = {}
+            args = decode(args, scale, found)
+            kwargs = dict((str(k), decode(v, scale, found))
+                          for k, v in kwargs.items())
+            for i in lengths.get(name, []):
+                if i < len(args):
+                    args[i] *= scale
+            if name == 'save':
+                ''' without the fingerprint, a replay is no build
+                of the script '''
+                output = output or args[0]
+                args, kwargs = [output], {}
+            if '.' in name:
+                owner, attr = name.split('.')
+                function = getattr(scope[owner], attr)
+            else:
+                function = scope[name]
+            function(*args, **kwargs)
+        return output
+
+def find(address, found):
+    ''' the object at an address of Journal.address(), found
+    keeps the lists met on the way for the next address '''
+    def listed(key, items):
+        if key not in found:
+            found[key] = list(items())
+        return found[key]
+    root = GetRootPart()
+    kind, i = address[:2]
+    if kind == 'datum':
+        return listed(kind, lambda: root.DatumPlanes)[i]
+    if kind == 'body':
+        body = listed(kind, lambda: root.Bodies)[i]
+        rest = address[2:]
+    else:
+        components = listed(kind, lambda: root.Components)
+        if len(address) == 2:
+            return components[i]
+        body = listed(i, lambda: components[i].GetBodies())[address[2]]
+        rest = address[3:]
+    if not rest:
+        return body
+    kind, k = rest
+    return listed((body, kind), lambda: body.Faces if kind == 'face'
+                  else body.Edges)[k]
+
+def decode(value, scale, found):
+    ''' a journal argument back as what it was, points and
+    radii times scale '''
+    if isinstance(value, list):
+        return [decode(x, scale, found) for x in value]
+    if not isinstance(value, dict):
+        return value
+    kind, data = list(value.items())[0]
+    if kind == 'item':
+        return find(data, found)
+    if kind == 'point':
+        return Point.Create(*[x * scale for x in data])
+    if kind == 'direction':
+        return Direction.Create(*data)
+    data = decode(data, scale, found)
+    if kind == 'dict':
+        return dict(data)
+    if kind == 'frame':
+        return Frame.Create(*data)
+    if kind == 'plane':
+        return Plane.Create(data)
+    if kind == 'line':
+        return Line.Create(*data)
+    if kind == 'segment':
+        return CurveSegment.Create(*data)
+    if kind == 'arc':
+        frame, radius, start, end = data
+        return CurveSegment.Create(Circle.Create(frame, radius * scale),
+                                   Interval.Create(start, end))
+    plane, curves, loops = data
+    sketch = Sketch(plane)
+    for curve in curves:
+        sketch.curves.Add(curve)
+    sketch.loops = [(label, [[x * scale for x in point] for point in points])
+                    for label, points in loops]
+    return sketch
+
+journal = None
+
 ''' -------------------------------------------------------
 START FROM HERE
 ------------------------------------------------------- '''
@@ -174,113 +821,149 @@ length_stb = 10 * diameter
 delta1 = MM(.48)
 delta2 = MM(.05)
 
+''' test sections are replicated by 'copy', 'instance',
+'doubling' or 'pattern', instances are only made independent
+by share_topology when PreserveInstances is off, which is not
+checked against SpaceClaim yet, so they are opt-in, as is
+'pattern', written to the recorded call form but not run '''
+replication = 'copy'
+
+''' a single test section between periodic-in and
+periodic-out, without stabilizers and replicas '''
+periodic = False
+
+''' a folder for the per-build csv and the trace of the
+sweep, see Tracer, None leaves the helpers untouched '''
+trace = None
+
+''' a folder for the journal of every build, see Journal '''
+record = None
+
+''' True counts the build against its expected inventory,
+whose counts are calibrated on tools/standin.py only, where
+share topology imprints nothing, so it is off by default '''
+validate = False
+
 ''' -------------------------------------------------------
 define builder function
 ------------------------------------------------------- '''
-def builder(height, pitch):
-    
+def builder(height, pitch, path=None, force=False):
+
+    if not path:
+        path = 'C:\\users\\frenc\\yandexdisk\\cfd\\geo\\2V-{}-{}'.\
+               format(heights.get(height), pitches.get(pitch))
+        if periodic:
+            path += '-P'
+
+    ''' skip variants saved from the same script and parameters '''
+    key = fingerprint(height, pitch, radius, delta1, delta2, TOL, length_all,
+                      length_stb, periodic)
+    if built(path, key) and not force:
+        return
+
     delete_all()
 
     nsecs = int(round((length_all - 2 * length_stb)/pitch))
+    if periodic:
+        nsecs = 1
     ''' -------------------------------------------------------
     create test sections
     ------------------------------------------------------- '''
-    ''' all 6 sketches are on YZ plane '''
+    ''' all 6 loops are on YZ plane and make one body, they
+    share their sides so its faces share topology '''
     sketch_plane = Plane.PlaneYZ
+    sketch = Sketch(sketch_plane)
 
     ''' first half inner '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'inner-1',
         (0, 0, 0),
         (0, radius - height, 0),
         (0, radius - height, pitch/2 - delta1/2),
         (0, 0, pitch/2 - delta1/2))
-    result = sketch.finish()
 
     ''' middle part inner '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'inner-2',
         (0, 0, pitch/2 - delta1/2),
         (0, radius - height, pitch/2 - delta1/2),
         (0, radius - height, pitch/2 - delta1/2 + delta2),
         (0, 0, pitch/2 - delta1/2 + delta2))
-    result = sketch.finish()
 
     ''' second half inner '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'inner-3',
         (0, 0, pitch/2 - delta1/2 + delta2),
         (0, radius - height, pitch/2 - delta1/2 + delta2),
         (0, radius - height, pitch),
         (0, 0, pitch))
-    result = sketch.finish()
 
     ''' first half outer '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'outer-1',
         (0, radius - height, 0),
         (0, radius, 0),
         (0, radius, pitch/2 - delta1/2),
         (0, radius - height, pitch/2 - delta1/2))
-    result = sketch.finish()
 
     ''' mid part outer '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'rib',
         (0, radius - height, pitch/2 - delta1/2),
         (0, radius, pitch/2 - delta1/2),
         (0, radius, pitch/2 + delta1/2),
         (0, radius - height, pitch/2 - delta1/2 + delta2))
-    result = sketch.finish()
 
     ''' second half outer '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
+    sketch.loop(
+        'outer-3',
         (0, radius - height, pitch/2 - delta1/2 + delta2),
         (0, radius, pitch/2 + delta1/2),
         (0, radius, pitch),
         (0, radius - height, pitch))
-    result = sketch.finish()
+
+    ''' the rib is solid, copies carry the roles of the faces '''
+    sketch.finish_loops('fluid', {'rib': 'solid'}, validate)
 
     ''' move to component - translate - copy '''
     component(GetRootPart().Bodies)
     test = GetRootPart().Components[-1]
 
-    move(test, Direction.DirZ, length_stb)
+    if not periodic:
+        move(test, Direction.DirZ, length_stb)
 
-    for i in range(1, nsecs):
-        copy('test', test, Direction.DirZ, i * pitch)
-        time.sleep(.5)
+        start = time.time()
+        replicate('test', test, Direction.DirZ, pitch, nsecs, replication)
+        if timings is not None:
+            timings.append((replication, pitch, nsecs, time.time() - start))
     
-    ''' -------------------------------------------------------
-    create stabilization sections
-    ------------------------------------------------------- '''
-    ''' inner part '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
-        (0, 0, 0),
-        (0, radius - height, 0),
-        (0, radius - height, length_stb),
-        (0, 0, length_stb))
-    result = sketch.finish()
-    line_1 = line((0, 0, 0), Direction.DirZ)
-
-    ''' outer part '''
-    sketch = Sketch(sketch_plane)
-    sketch.polygon(
-        (0, radius - height, 0),
-        (0, radius, 0),
-        (0, radius, length_stb),
-        (0, radius - height, length_stb))
-    result = sketch.finish()
-    line_1 = line((0, 0, 0), Direction.DirZ)
-
-    ''' move to component - translate - copy '''
-    component(GetRootPart().Bodies)
-    stab = GetRootPart().Components[-1]
-
-    copy('stab', stab, Direction.DirZ, 
-         length_stb + nsecs * pitch)
+        ''' -------------------------------------------------------
+        create stabilization sections
+        ------------------------------------------------------- '''
+        ''' inner and outer part, one body '''
+        sketch = Sketch(sketch_plane)
+        sketch.loop(
+            'inner',
+            (0, 0, 0),
+            (0, radius - height, 0),
+            (0, radius - height, length_stb),
+            (0, 0, length_stb))
+
+        sketch.loop(
+            'outer',
+            (0, radius - height, 0),
+            (0, radius, 0),
+            (0, radius, length_stb),
+            (0, radius - height, length_stb))
+
+        sketch.finish_loops('fluid', validate=validate)
+
+        ''' move to component - translate - copy '''
+        component(GetRootPart().Bodies)
+        stab = GetRootPart().Components[-1]
+
+        copy('stab', stab, Direction.DirZ, 
+             length_stb + nsecs * pitch)
 
     ''' trash and share topology '''
     zoom()
@@ -291,92 +974,166 @@ def builder(height, pitch):
     create named selections
     ------------------------------------------------------- '''
     ''' define the tree '''
-    assert len(GetRootPart().Components) == nsecs + 2
-
-    stab1 = GetRootPart().Components[-2]
-    stab2 = GetRootPart().Components[-1]
+    assert len(GetRootPart().Components) == \
+        nsecs + (0 if periodic else 2)
+
+    stabs = []
+    if not periodic:
+        stab1 = GetRootPart().Components[-2]
+        stab2 = GetRootPart().Components[-1]
+        stabs = stab1.GetBodies() + stab2.GetBodies()
     tests = GetRootPart().Components[:nsecs]
 
-    ''' fluent named selections '''
-    bodies_solid = []
-    bodies_fluid = []
+    ''' fluent named selections, by the role of every face '''
+    faces_solid = []
+    faces_fluid = []
     for i in range(nsecs):
-        bodies = tests[i].GetBodies()
-        for j in [0, 1, 2, 3, 5]:
-            bodies_fluid.append(bodies[j])
-        bodies_solid.append(bodies[4])
-
-    edges = gather_edges(bodies_fluid)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius)]
-    named_selection('wall-fluid', select)
-
-    bodies_fluid += stab1.GetBodies() + stab2.GetBodies()
-    named_selection('solid', gather_faces(bodies_solid))
-    named_selection('fluid', gather_faces(bodies_fluid))
-
-    edges_stab_1 = gather_edges(stab1.GetBodies())
-    select = [x for x in edges_stab_1 if 
-              equals(x.EvalMid().Point.Z, 0)]
-    named_selection('inlet', select)
-
-    edges_stab_2 = gather_edges(stab2.GetBodies())
-    select = [x for x in edges_stab_2 if 
-        equals(x.EvalMid().Point.Z, 2 * length_stb + nsecs * pitch)]
-    named_selection('outlet', select)
-
-    edges = gather_edges(bodies_solid)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius)]
-    named_selection('wall-solid', select)
-
-    select = [x for x in edges if
-              not equals(x.EvalMid().Point.Y, radius)]
-    named_selection('sides', select)
-
-    bodies = [stab1.GetBodies()[1], stab2.GetBodies()[1]]
-    edges = gather_edges(bodies)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius)]
-    named_selection('wall-out', select)
-
-    edges = gather_edges(bodies_solid + bodies_fluid)
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, 0)]
-    named_selection('axis', select)
-
-    ''' mesher named selections '''
-    edges = gather_edges(bodies_solid + bodies_fluid)
-    spans = [x.GetInterval().Span for x in edges]
-
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius - height/2)]
-    named_selection('rad1', select)
-
-    select = [x for x in edges if
-              equals(x.EvalMid().Point.Y, radius/2 - height/2)]
-    named_selection('rad2', select)
-
-    select = [x for x, y in zip(edges, spans) if
-              equals(y, pitch/2 - delta1/2) or
-              equals(y, pitch/2 + delta1/2 - delta2)]
-    named_selection('axi1', select)
-
-    select = [x for x, y in zip(edges, spans) if
-              equals(y, delta1) or equals(y, delta2)]
-    named_selection('axi2', select)
-
-    select = [x for x, y in zip(edges, spans) if
-              equals(y, length_stb)]
-    named_selection('axi3', select)
+        for body in tests[i].GetBodies():
+            for face in body.Faces:
+                if role(face) == 'solid':
+                    faces_solid.append(face)
+                else:
+                    faces_fluid.append(face)
+    faces_stab = gather_faces(stabs)
+    named_selection('solid', faces_solid)
+    named_selection('fluid', faces_fluid + faces_stab)
+
+    ''' evaluate every edge once, the sides of the rib are
+    shared with the fluid and go with the solid '''
+    edges = tabulate_edges([('solid', faces_solid),
+                            ('fluid', faces_fluid),
+                            ('stab', faces_stab)])
+
+    ''' both ends of the model, the only planes queried, edges
+    there are looked up instead of scanned for '''
+    bounds = [0, pitch] if periodic else \
+             [0, 2 * length_stb + nsecs * pitch]
+    slabs = Slabs(range(len(edges['item'])), bounds, TOL,
+                  lambda i: edges['z'][i])
+    ends = lambda z: [edges['item'][i] for i in slabs.at(z)]
+
+    if periodic:
+        ''' both ends of the section, their edges must pair up
+        one to one for a conformal periodic interface '''
+        spans_in = sorted(edges['span'][i] for i in slabs.at(0))
+        spans_out = sorted(edges['span'][i] for i in slabs.at(pitch))
+        assert len(spans_in) == len(spans_out) and \
+            all(equals(x, y) for x, y in zip(spans_in, spans_out))
+        named_selection('periodic-in', ends(0))
+        named_selection('periodic-out', ends(pitch))
+    else:
+        named_selection('inlet', ends(0))
+        named_selection('outlet', ends(2 * length_stb + nsecs * pitch))
+
+    ''' the rest is a spec over the edge columns, fluent
+    selections first, then the mesher ones '''
+    spec = [
+        ('wall-fluid', lambda x: x.group == 'fluid' and
+                                 equals(x.y, radius)),
+        ('wall-solid', lambda x: x.group == 'solid' and
+                                 equals(x.y, radius)),
+        ('_solid', lambda x: x.group == 'solid'),
+        ('sides', ('-', '_solid', 'wall-solid')),
+        ('axis', lambda x: equals(x.y, 0)),
+        ('rad1', lambda x: equals(x.y, radius - height/2)),
+        ('rad2', lambda x: equals(x.y, radius/2 - height/2)),
+        ('axi1', lambda x: equals(x.span, pitch/2 - delta1/2) or
+                           equals(x.span, pitch/2 + delta1/2 - delta2)),
+        ('axi2', lambda x: equals(x.span, delta1) or
+                           equals(x.span, delta2))]
+    if not periodic:
+        spec += [
+            ('wall-out', lambda x: x.group == 'stab' and
+                                   equals(x.y, radius)),
+            ('axi3', lambda x: equals(x.span, length_stb))]
+    for name, items in evaluate(spec, edges).items():
+        named_selection(name, items)
+
+    ''' counted against the model before anything is created,
+    an edge dropped or picked twice by a predicate fails here '''
+    if validate:
+        bodies = [x for y in tests for x in y.GetBodies()] + stabs
+        actual = measure(bodies, {'solid': faces_solid,
+                                  'fluid': faces_fluid + faces_stab},
+                         lambda x: x.Area, 'area')
+        check(inventory(height, pitch, nsecs), actual)
+
+    create_groups()
 
     ''' save everything '''
-    save('C:\\users\\frenc\\yandexdisk\\cfd\\geo\\2V-{}-{}'.\
-         format(heights.get(height), pitches.get(pitch)))
+    save(path, key)
+    if tracer:
+        tracer.flush(path)
+    if journal:
+        journal.flush(path)
+
+''' -------------------------------------------------------
+benchmark replication modes
+------------------------------------------------------- '''
+''' (mode, pitch, sections, seconds) of every replication
+while benchmark() runs, None leaves the builds untimed '''
+timings = None
+
+def benchmark(height, modes=('copy', 'doubling'), folder=None):
+    ''' builds every pitch with each mode into folder, a
+    temporary one by default so the saved variants are left
+    alone, the geometry is the same whatever the mode '''
+    global replication, timings
+    default = replication
+    folder = folder or tempfile.mkdtemp()
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    timings = []
+    try:
+        for pitch in pitches.keys():
+            for mode in modes:
+                replication = mode
+                name = '{}-{}-{}'.format(mode, heights.get(height),
+                                         pitches.get(pitch))
+                builder(height, pitch, os.path.join(folder, name),
+                        force=True)
+        for mode, pitch, nsecs, seconds in timings:
+            print('{:<10}{:>8.4f}{:>6}{:>10.2f}'.format(
+                mode, pitch, nsecs, seconds))
+    finally:
+        replication, timings = default, None
 
 ''' -------------------------------------------------------
 start modeling
 ------------------------------------------------------- '''
-for pitch in pitches.keys():
-    for height in heights.keys():
-        builder(height, pitch)
+trace = parameter('trace', trace)
+if trace:
+    tracer = Tracer(trace, parameter('clock', time.time))
+    tracer.wrap(globals(), traced)
+
+record = parameter('record', record)
+if record:
+    journal = Journal(record)
+    journal.wrap(globals(), journaled)
+
+validate = str(parameter('validate', validate)) != 'False'
+
+''' the script fingerprints are made of, SpaceClaim need not
+define __file__ for /RunScript, so a batch run names it '''
+script_path = parameter('script', globals().get('__file__'))
+
+''' a longer or shorter pipe, in diameters '''
+if parameter('length'):
+    length_all = float(parameter('length')) * diameter
+
+if parameter('replay'):
+    ''' a journal made again instead of a build '''
+    path = Journal.replay(parameter('replay'),
+                          float(parameter('scale', 1.)),
+                          parameter('output'))
+    if tracer:
+        tracer.flush(path)
+elif parameter('height'):
+    ''' a single variant injected by a batch run '''
+    builder(MM(float(parameter('height'))),
+            MM(float(parameter('pitch'))),
+            parameter('output'))
+else:
+    for pitch in pitches.keys():
+        for height in heights.keys():
+            builder(height, pitch)
@@ -1,4 +1,6 @@
+import collections
 import math
+from System.Collections.Generic import List
 
 ''' -------------------------------------------------------
 sketching 2D operations
@@ -15,9 +17,12 @@ class Sketch():
         result = CurveSegment.Create(pt1, pt2)
         self.curves.Add(result)
 
-    def polygon(self, *args):
+    def polyline(self, *args):
         for i in range(len(args) - 1):
             self.line(args[i], args[i + 1])
+
+    def polygon(self, *args):
+        self.polyline(*args)
         self.line(args[-1], args[0])
 
     def circle(self, frame, radius, start=0, end=360):
@@ -58,6 +63,16 @@ def datum_plane(dot, dir1, dir2, name='default'):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    ''' a single item or any collection of them '''
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
+def box(body):
+    return body.Shape.GetBoundingBox(Matrix.Identity)
+
 ''' -------------------------------------------------------
 manipulating operations
 ------------------------------------------------------- '''
@@ -100,11 +115,67 @@ def copy(name, item, direction, length):
     move(new, direction, length)
     new.SetName(name)
 
-def split_by_plane(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter))
-
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
+def split_by_plane(bodies, cutters):
+    return split_bodies(bodies, cutters)
+
+def split_by_face(bodies, cutters):
+    return split_bodies(bodies, cutters, True)
+
+def split_bodies(bodies, cutters, extend=False):
+    ''' every body by every cutter in a single SplitBody call,
+    returns the pieces of each body in the order of bodies
+
+    pieces keep the name of their body, so the bodies are
+    tagged for the call and get their own names back after '''
+    bodies, cutters = as_list(bodies), as_list(cutters)
+    names = [x.GetName() for x in bodies]
+    parts = []
+    for i, body in enumerate(bodies):
+        body.SetName('split-{}'.format(i))
+        if body.Parent not in parts:
+            parts.append(body.Parent)
+    if extend:
+        SplitBody.ByCutter(select(bodies), select(cutters), True)
+    else:
+        SplitBody.ByCutter(select(bodies), select(cutters))
+    tags = dict(('split-{}'.format(i), i) for i in range(len(bodies)))
+    pieces = [[] for x in bodies]
+    for part in parts:
+        for body in part.Bodies:
+            i = tags.get(body.GetName())
+            if i is not None:
+                pieces[i].append(body)
+                body.SetName(names[i])
+    return pieces
+
+def reach(body):
+    ''' radial extent of the bounding box of the body '''
+    low, high = box(body).MinCorner, box(body).MaxCorner
+    return max(abs(low.X), abs(low.Y), abs(high.X), abs(high.Y))
+
+def crosses(body, cutter, tolerance=0):
+    ''' the datum plane passes through the bounding box of
+    the body rather than just touching it '''
+    frame = cutter.Shape.Geometry.Frame
+    low, high = box(body).MinCorner, box(body).MaxCorner
+    origin, normal = frame.Origin, frame.DirZ
+    distances = [(x - origin.X) * normal.X +
+                 (y - origin.Y) * normal.Y +
+                 (z - origin.Z) * normal.Z
+                 for x in [low.X, high.X]
+                 for y in [low.Y, high.Y]
+                 for z in [low.Z, high.Z]]
+    return min(distances) < -tolerance and max(distances) > tolerance
+
+def plan_split(cutters, where=None, tolerance=0):
+    ''' splits by each plane only the root bodies it crosses,
+    whatever order the kernel keeps the bodies in '''
+    for cutter in as_list(cutters):
+        bodies = [x for x in GetRootPart().Bodies
+                  if (not where or where(x)) and
+                  crosses(x, cutter, tolerance)]
+        if bodies:
+            split_by_plane(bodies, cutter)
 
 def merge_bodies(bodies):
     result = Combine.Merge(select(bodies))
@@ -112,31 +183,249 @@ def merge_bodies(bodies):
 def component(bodies):
     ComponentHelper.MoveBodiesToComponent(select(bodies))
 
+''' -------------------------------------------------------
+sector operations
+------------------------------------------------------- '''
+def polar(r, angle, z=0):
+    phi = math.radians(angle)
+    return (r * math.cos(phi), r * math.sin(phi), z)
+
+def distance((x1, y1, z1), (x2, y2, z2)):
+    return ((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2) ** .5
+
+def diamond(ogrid, angle, z=0):
+    ''' the o-grid square has its vertices on the axes,
+    this is where the ray at angle degrees crosses it '''
+    phi = math.radians(angle)
+    return polar(ogrid/(abs(math.cos(phi)) + abs(math.sin(phi))), angle, z)
+
+def border(ogrid, start, end, z=0):
+    ''' o-grid square from start to end degrees together
+    with its vertices in between '''
+    angles = [x for x in range(0, 720, 90) if start < x < end]
+    return [diamond(ogrid, x, z) for x in [start] + angles + [end]]
+
+def middle(ogrid, start, end, z, length):
+    ''' o-grid square extruded from z, short of a full turn
+    it is the sector between start and end degrees '''
+    points = border(ogrid, start, end, z)
+    if end - start < 360:
+        points = [(0, 0, z)] + points
+    else:
+        points = points[:-1]
+    sketch = Sketch(plane((0, 0, z), Direction.DirX, Direction.DirY))
+    sketch.polygon(*points)
+    extrude(sketch.finish(), Direction.DirZ, length)
+
+def inner(ogrid, radius, start, end, z, length):
+    ''' part between the o-grid square and radius from start
+    to end degrees, extruded from z '''
+    frame_1 = frame((0, 0, z), Direction.DirX, Direction.DirY)
+    points = border(ogrid, start, end, z)
+    sketch = Sketch(Plane.Create(frame_1))
+    sketch.polyline(*points)
+    sketch.line(points[-1], polar(radius, end, z))
+    sketch.circle(frame_1, radius, start, end)
+    sketch.line(polar(radius, start, z), points[0])
+    extrude(sketch.finish(), Direction.DirZ, length)
+
+def outer(profile, start, end):
+    ''' (r, z) profile revolved around the axis from start
+    to end degrees '''
+    sketch = Sketch(plane((0, 0, 0), direction(polar(1, start)),
+                          Direction.DirZ))
+    sketch.polygon(*[polar(r, start, z) for r, z in profile])
+    revolve(sketch.finish(), line((0, 0, 0), Direction.DirZ),
+            DEG(end - start))
+
+def on_plane(x, y, angle, tolerance):
+    ''' the point lies on the half-plane from the axis at angle
+    degrees, not on the other half of its plane '''
+    phi = math.radians(angle)
+    return abs(x * math.sin(phi) - y * math.cos(phi)) <= tolerance and \
+           x * math.cos(phi) + y * math.sin(phi) > tolerance
+
+def cuts(ogrid, sector):
+    ''' (angle, reach) of both cuts of a sector, reach being
+    where they cross the o-grid square, none for the pipe '''
+    if not sector:
+        return []
+    return [(x, distance((0, 0, 0), diamond(ogrid, x)))
+            for x in [90, 90 + sector]]
+
+def separable(ogrid, sector, tolerance):
+    ''' whether the cuts stay more than tolerance apart from
+    each other and from the corners of the o-grid between
+    them, closer ones are taken for the same plane '''
+    if not 0 < sector < 360:
+        return False
+    corners = [x for x in range(180, 720, 90) if x < 90 + sector]
+    angles = [90] + corners + [90 + sector]
+    gaps = [b - a for a, b in zip(angles[:-1], angles[1:])]
+    gap = min(gaps + [360 - sector, 180])
+    return ogrid / 8 ** .5 * math.sin(math.radians(gap / 2.)) > tolerance
+
 ''' -------------------------------------------------------
 named selections operations
 ------------------------------------------------------- '''
-def named_selection(name, items, condition=lambda x: True):
-    temp = []
+pending = []
+
+def named_selection(name, items):
+    ''' queued until create_groups() '''
+    pending.append((name, list(items)))
+
+def create_groups():
+    ''' every queued named selection, one Group.Create each as
+    the API has no batch call, with its final name so nothing
+    depends on the localized default name of a new group '''
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
+
+def unique(items):
+    ''' items in order, each one once however many times it
+    is reached '''
+    seen = set()
     for item in items:
-        if condition(item):
-            temp.append(item)
-    select = Selection.Create(temp)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
-    return temp
+        if item not in seen:
+            seen.add(item)
+            yield item
 
 def gather_faces(bodies):
-    faces = []
-    for body in bodies:
-        faces += body.Faces
-    return faces
+    return list(unique(x for body in bodies for x in body.Faces))
 
 def gather_edges(bodies):
-    edges = []
-    for body in bodies:
-        for face in body.Faces:
-            edges += face.Edges
-    return edges
+    ''' body.Edges has an edge shared by two faces once,
+    walking face.Edges met it twice '''
+    return list(unique(x for body in bodies for x in body.Edges))
+
+''' -------------------------------------------------------
+descriptor tables
+------------------------------------------------------- '''
+def face_values(face):
+    point = face.MidPoint().Point
+    return [face.Area, face.GetFaceNormal(0, 0).Z, point.X, point.Y]
+
+def edge_values(edge):
+    point = edge.EvalMid().Point
+    return [edge.GetInterval().Span, point.X, point.Y]
+
+def tabulate(groups, entities, columns, values):
+    ''' every entity evaluated once into columns, groups are
+    (name, bodies) pairs and name goes to the group column '''
+    table = dict((x, []) for x in ['item', 'group'] + columns)
+    for group, bodies in groups:
+        for body in bodies:
+            for item in entities(body):
+                table['item'].append(item)
+                table['group'].append(group)
+                for name, value in zip(columns, values(item)):
+                    table[name].append(value)
+    return table
+
+def tabulate_faces(groups):
+    return tabulate(groups, lambda x: x.Faces,
+                    ['area', 'nz', 'x', 'y'], face_values)
+
+def tabulate_edges(groups):
+    return tabulate(groups, lambda x: x.Edges, ['span', 'x', 'y'],
+                    edge_values)
+
+def evaluate(spec, table):
+    ''' selections of a spec from one pass over the rows of a
+    table, spec is a list of (name, rule) where rule is either
+    a predicate over a row, the columns being its attributes,
+    or a set operation (op, name, name) with op one of '|',
+    '&' and '-' on selections listed before it
+
+    names starting with an underscore are operands only and
+    are left out of the result '''
+    operations = {'|': set.union, '&': set.intersection,
+                  '-': set.difference}
+    columns = sorted(table)
+    Row = collections.namedtuple('Row', columns)
+    tests = [(name, rule) for name, rule in spec if callable(rule)]
+    chosen = dict((name, set()) for name, rule in tests)
+    for i, values in enumerate(zip(*[table[x] for x in columns])):
+        row = Row(*values)
+        for name, rule in tests:
+            if rule(row):
+                chosen[name].add(i)
+    for name, rule in spec:
+        if not callable(rule):
+            op, a, b = rule
+            chosen[name] = operations[op](chosen[a], chosen[b])
+    selections = collections.OrderedDict()
+    for name, rule in spec:
+        if not name.startswith('_'):
+            selections[name] = [table['item'][i]
+                                for i in sorted(chosen[name])]
+    return selections
+
+''' -------------------------------------------------------
+expected inventory
+------------------------------------------------------- '''
+def inventory(ogrid):
+    ''' bodies, faces and edges of the build, the size of every
+    named selection and the fluid volume, from the parameters
+    alone
+
+    the two stabilizers and the test section are a layer each,
+    the middle part with n sides (t of them on the o-grid
+    square) and q inner parts with m o-grid vertices each '''
+    if sector:
+        q, arc = 1, math.radians(sector)
+        m = len(border(ogrid, 90, 90 + sector)) - 2
+        n, t = m + 3, m + 1
+    else:
+        q, arc, m, n, t = 4, .5 * math.pi, 0, 4, 4
+    axial = n + q * (m + 4)
+    expected = {
+        'bodies': 3 * (1 + q),
+        'faces': 3 * (n + 2 + q * (m + 6)),
+        'edges': 3 * (3 * n + 3 * q * (m + 4)),
+        'fluid': 3 * (1 + q),
+        'inlet': 1 + q,
+        'outlet': 1 + q,
+        'wall-out': 2 * q,
+        'wall': q,
+        'tan': 3 * (2 * t + 2 * q * (m + 2)),
+        'rad': 3 * 4 * q,
+        'axi1': axial,
+        'axi2': 2 * axial,
+        'fluid volume': q * arc / 2 * radius ** 2 * length_all}
+    if sector:
+        expected.update({'symmetry-1': 6, 'symmetry-2': 6})
+    return expected
+
+def measure(groups, size, unit):
+    ''' the same inventory counted on the built bodies, groups
+    maps 'solid'/'fluid' to bodies, and on the queued named
+    selections '''
+    bodies = [x for kind in groups for x in groups[kind]]
+    actual = dict((name, len(items)) for name, items in pending)
+    actual['bodies'] = len(bodies)
+    actual['faces'] = len(gather_faces(bodies))
+    actual['edges'] = len(gather_edges(bodies))
+    for kind in groups:
+        actual['{} {}'.format(kind, unit)] = \
+            sum(size(x) for x in groups[kind])
+    return actual
+
+def check(expected, actual, rtol=1e-3):
+    ''' every difference at once, counts must match exactly
+    and sizes within rtol '''
+    wrong = []
+    for name in sorted(expected):
+        x, y = expected[name], actual.get(name)
+        if isinstance(x, int):
+            same = x == y
+        else:
+            same = y is not None and abs(x - y) <= rtol * abs(x)
+        if not same:
+            wrong.append('{}: expected {}, got {}'.format(name, x, y))
+    assert not wrong, '\n'.join(wrong)
 
 ''' -------------------------------------------------------
 finishing operations
@@ -152,6 +441,7 @@ def delete_all():
            GetRootPart().DatumPlanes,
            GetRootPart().DatumLines,
            GetRootPart().DatumPoints)
+    del pending[:]
 
 def share_topology(tolerance=MM(.1)):
     options = ShareTopologyOptions()
@@ -169,6 +459,17 @@ def zoom():
     ViewHelper.ZoomToEntity()
 
 
+''' -------------------------------------------------------
+batch parameters
+------------------------------------------------------- '''
+def parameter(name, default=None):
+    ''' script parameters injected by a batch run,
+    see tools/bench.py '''
+    try:
+        return getattr(Parameters, name)
+    except (NameError, AttributeError):
+        return default
+
 ''' -------------------------------------------------------
 START FROM HERE
 ------------------------------------------------------- '''
@@ -186,6 +487,17 @@ length_tst = length_all - 2 * length_stb
 
 split = .74
 
+''' only the sector from 90 to 90 + sector degrees with
+symmetry-1/symmetry-2 on its cuts, None is the whole pipe,
+cuts closer than TOL to each other or to an o-grid corner
+are refused by separable() '''
+sector = None
+
+''' True counts the build against its expected inventory,
+whose counts are calibrated on tools/standin.py only, where
+share topology imprints nothing, so it is off by default '''
+validate = False
+
 ''' -------------------------------------------------------
 define builder function
 ------------------------------------------------------- '''
@@ -200,43 +512,54 @@ def builder():
     ''' -------------------------------------------------------
     create all at once
     ------------------------------------------------------- '''
-    ''' middle rectangle '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon((ogrid, 0, 0), 
-                   (0, ogrid, 0), 
-                   (-ogrid, 0, 0), 
-                   (0, -ogrid, 0))
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, length_all - length_stb)
-
-    ''' outer part '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon((ogrid, 0, 0), 
-                   (0, ogrid, 0), 
-                   (-ogrid, 0, 0), 
-                   (0, -ogrid, 0))
-    frame_1 = frame((0, 0, 0), Direction.DirX, Direction.DirY)
-    sketch.circle(frame_1, radius)
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, length_all - length_stb)
-
-    ''' make axial and radial cuts '''
-    cut_radial_1 = datum_plane((0, 0, 0),
-                               Direction.DirX, Direction.DirZ)
-    cut_radial_2 = datum_plane((0, 0, 0),
-                               Direction.DirY, Direction.DirZ)
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[2], cut_radial_2)
-
-    cut_axial = datum_plane((0, 0, length_stb),
-                            Direction.DirX, Direction.DirY)
-    for body in GetRootPart().Bodies:
-        split_by_plane(body, cut_axial)
-
-    ''' form components - copy '''
-    component(GetRootPart().Bodies[5:])
-    component(GetRootPart().Bodies[:5])
+    if sector:
+        ''' stabilizer and test part of the sector, no cuts '''
+        assert separable(ogrid, sector, TOL)
+        for z, length in [(0, length_stb), (length_stb, length_tst)]:
+            middle(ogrid, 90, 90 + sector, z, length)
+            inner(ogrid, radius, 90, 90 + sector, z, length)
+
+        ''' form components - copy '''
+        component(GetRootPart().Bodies[2:])
+        component(GetRootPart().Bodies[:2])
+    else:
+        ''' middle rectangle '''
+        sketch = Sketch(Plane.PlaneXY)
+        sketch.polygon((ogrid, 0, 0), 
+                       (0, ogrid, 0), 
+                       (-ogrid, 0, 0), 
+                       (0, -ogrid, 0))
+        result = sketch.finish()
+        extrude(result, Direction.DirZ, length_all - length_stb)
+
+        ''' outer part '''
+        sketch = Sketch(Plane.PlaneXY)
+        sketch.polygon((ogrid, 0, 0), 
+                       (0, ogrid, 0), 
+                       (-ogrid, 0, 0), 
+                       (0, -ogrid, 0))
+        frame_1 = frame((0, 0, 0), Direction.DirX, Direction.DirY)
+        sketch.circle(frame_1, radius)
+        result = sketch.finish()
+        extrude(result, Direction.DirZ, length_all - length_stb)
+
+        ''' make axial and radial cuts '''
+        cut_radial_1 = datum_plane((0, 0, 0),
+                                   Direction.DirX, Direction.DirZ)
+        cut_radial_2 = datum_plane((0, 0, 0),
+                                   Direction.DirY, Direction.DirZ)
+        outside = lambda x: reach(x) > (ogrid + radius)/2
+        plan_split([cut_radial_1, cut_radial_2], outside, TOL)
+
+        cut_axial = datum_plane((0, 0, length_stb),
+                                Direction.DirX, Direction.DirY)
+        pieces = split_by_plane(GetRootPart().Bodies, cut_axial)
+
+        ''' form components - copy, the lower piece of every
+        body is the stabilizer and the upper one the test part '''
+        pieces = [sorted(x, key=lambda y: box(y).Center.Z) for x in pieces]
+        component([x[1] for x in pieces])
+        component([x[0] for x in pieces])
 
     copy('stab', GetRootPart().Components[-1], Direction.DirZ,
          length_all - length_stb)
@@ -250,9 +573,11 @@ def builder():
     create named selections
     ------------------------------------------------------- '''
     ''' helpful functions '''
-    face_up = lambda x: x.GetFaceNormal(0, 0).Z == 1
-    face_dn = lambda x: x.GetFaceNormal(0, 0).Z == -1
     equals = lambda x, y: abs(x - y)/y <= RTOL
+    arc = math.radians(sector) if sector else .5 * math.pi
+    ''' the mid point of a face is on the cylinder of radius r,
+    an area alone matches other faces for some sectors '''
+    at = lambda x, r: equals(x.x ** 2 + x.y ** 2, r ** 2)
 
     ''' define the tree '''
     test  = GetRootPart().Components[0]
@@ -268,43 +593,81 @@ def builder():
              test.GetBodies()
     named_selection('fluid', bodies)
 
-    faces_stab_1 = gather_faces(stab1.GetBodies())
-    named_selection('inlet', faces_stab_1, face_dn)
-
-    faces_stab_2 = gather_faces(stab2.GetBodies())
-    named_selection('outlet', faces_stab_2, face_up)
-
-    faces = faces_stab_1 + faces_stab_2
-    area = .5 * math.pi * radius * length_stb
-    named_selection('wall-out', faces, 
-                         lambda x: equals(x.Area, area))
-
-    faces = gather_faces(bodies)
-    area = .5 * math.pi * radius * length_tst
-    named_selection('wall', faces, 
-                         lambda x: equals(x.Area, area))
+    ''' evaluate every face and edge once '''
+    groups = [('stab1', stab1.GetBodies()),
+              ('stab2', stab2.GetBodies()),
+              ('test', test.GetBodies())]
+    faces = tabulate_faces(groups)
+    edges = tabulate_edges(groups)
+
+    spec = [
+        ('inlet', lambda x: x.group == 'stab1' and x.nz == -1),
+        ('outlet', lambda x: x.group == 'stab2' and x.nz == 1),
+        ('wall-out', lambda x: x.group != 'test' and at(x, radius) and
+                               equals(x.area, arc * radius * length_stb)),
+        ('wall', lambda x: at(x, radius) and
+                           equals(x.area, arc * radius * length_tst))]
+    if sector:
+        ''' the faces across the cuts of the sector, the mid
+        point of an axial face is anywhere in its bounds and can
+        be on a cut however far the face is from it '''
+        across = lambda x, angle: abs(x.nz) <= RTOL and \
+                                  on_plane(x.x, x.y, angle, TOL)
+        spec += [
+            ('symmetry-1', lambda x: across(x, 90)),
+            ('symmetry-2', lambda x: across(x, 90 + sector))]
+    for name, items in evaluate(spec, faces).items():
+        named_selection(name, items)
 
     ''' mesher named selections '''
-    edges = gather_edges(bodies)
-    length_1 = 2 ** .5 * ogrid
-    length_2 = .5 * math.pi
-    named_selection('tan', edges,
-        lambda x: equals(x.GetInterval().Span, length_1) or
-                  equals(x.GetInterval().Span, length_2))
-
-    named_selection('rad', edges,
-        lambda x: equals(x.GetInterval().Span, radius - ogrid))
-
-    named_selection('axi1', edges,
-        lambda x: equals(x.GetInterval().Span, length_tst))
-
-    named_selection('axi2', edges,
-        lambda x: equals(x.GetInterval().Span, length_stb))
+    tangential = [2 ** .5 * ogrid, arc]
+    radial = [radius - ogrid]
+    if sector:
+        ''' unless the cuts hit its vertices the o-grid square
+        ends with shorter edges '''
+        points = border(ogrid, 90, 90 + sector)
+        tangential = [distance(a, b) for a, b in
+                      zip(points[:-1], points[1:])] + [arc]
+        radial = [radius - distance((0, 0, 0), x)
+                  for x in [points[0], points[-1]]]
+    ''' edges along the cuts of a sector are not tangential,
+    those from the axis to the o-grid square are spokes, as
+    long as a tangential or radial edge for some angles and
+    neither '''
+    ends = cuts(ogrid, sector)
+    along = lambda x: any(on_plane(x.x, x.y, a, TOL) for a, r in ends)
+    spoke = lambda x: any(on_plane(x.x, x.y, a, TOL) and
+                          x.x ** 2 + x.y ** 2 < r ** 2 for a, r in ends)
+    spec = [
+        ('_tan', lambda x: any(equals(x.span, y) for y in tangential)),
+        ('_along', along),
+        ('tan', ('-', '_tan', '_along')),
+        ('_spoke', spoke),
+        ('_rad', lambda x: any(equals(x.span, y) for y in radial)),
+        ('rad', ('-', '_rad', '_spoke')),
+        ('axi1', lambda x: equals(x.span, length_tst)),
+        ('axi2', lambda x: equals(x.span, length_stb))]
+    for name, items in evaluate(spec, edges).items():
+        named_selection(name, items)
+
+    ''' counted against the model before anything is created,
+    a face or an edge a predicate misses fails here '''
+    if validate:
+        actual = measure({'fluid': bodies}, lambda x: x.Shape.Volume,
+                         'volume')
+        check(inventory(ogrid), actual, RTOL)
+
+    create_groups()
 
     ''' save everything '''
-    save('C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3F-00-000')
+    path = 'C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3F-00-000'
+    if sector:
+        path += '-S{:g}'.format(sector)
+    save(path)
 
 ''' -------------------------------------------------------
 start modeling
 ------------------------------------------------------- '''
+validate = str(parameter('validate', validate)) != 'False'
+
 builder()
@@ -1,5 +1,12 @@
+import collections
 import math
 import time
+import hashlib
+import io
+import json
+import os
+import tempfile
+from System.Collections.Generic import List
 
 ''' -------------------------------------------------------
 sketching 2D operations
@@ -16,9 +23,12 @@ class Sketch():
         result = CurveSegment.Create(pt1, pt2)
         self.curves.Add(result)
 
-    def polygon(self, *args):
+    def polyline(self, *args):
         for i in range(len(args) - 1):
             self.line(args[i], args[i + 1])
+
+    def polygon(self, *args):
+        self.polyline(*args)
         self.line(args[-1], args[0])
 
     def circle(self, frame, radius, start=0, end=360):
@@ -26,8 +36,10 @@ class Sketch():
         result = CurveSegment.Create(Circle.Create(frame, radius), interval)
         self.curves.Add(result)
 
-    def finish(self):
-        return PlanarBody.Create(self.plane, self.curves).CreatedBody.Faces[0]
+    def finish(self, role=None):
+        body = PlanarBody.Create(self.plane, self.curves).CreatedBody
+        tag([body], role)
+        return body.Faces[0]
 
 ''' -------------------------------------------------------
 primitives
@@ -59,27 +71,58 @@ def datum_plane(dot, dir1, dir2, name='default'):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    ''' a single item or any collection of them '''
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
 ''' -------------------------------------------------------
 manipulating operations
 ------------------------------------------------------- '''
-def revolve(face, axis, angle=DEG(360), merge=False):
+def revolve(face, axis, angle=DEG(360), merge=False, role=None):
     options = RevolveFaceOptions()
     options.ExtrudeType = ExtrudeType.ForceIndependent
     if merge:
         options.ExtrudeType = ExtrudeType.Add
     else:
         options.ExtrudeType = ExtrudeType.ForceIndependent
-    RevolveFaces.Execute(select(face), axis, angle, 
-                         options)
+    result = RevolveFaces.Execute(select(face), axis, angle, 
+                                  options)
+    tag(result.CreatedBodies, role)
 
-def extrude(face, direction, length, merge=False):
+def extrude(face, direction, length, merge=False, role=None):
     options = ExtrudeFaceOptions()
     if merge:
         options.ExtrudeType = ExtrudeType.Add
     else:
         options.ExtrudeType = ExtrudeType.ForceIndependent
-    ExtrudeFaces.Execute(select(face), direction, length, 
-                         options)
+    result = ExtrudeFaces.Execute(select(face), direction, length, 
+                                  options)
+    tag(result.CreatedBodies, role)
+
+def tag(bodies, role):
+    ''' the role ('solid', 'fluid') of a body and of its faces
+    is kept as their text attribute, which copies and
+    instances carry, names are left to the builder '''
+    if role:
+        for body in bodies:
+            body.SetTextAttribute('role', role)
+            tag_faces(body.Faces, role)
+
+def tag_faces(faces, role):
+    for face in faces:
+        face.SetTextAttribute('role', role)
+
+def rename(item, name):
+    ''' a name the builder gives, kept by a journal '''
+    item.SetName(name)
+
+def role(item):
+    ''' the role of a body or face, None if it has none '''
+    found, value = item.TryGetTextAttribute('role')
+    return value if found else None
 
 def sweep(face, curve, merge=False):
     options = SweepCommandOptions()
@@ -101,11 +144,58 @@ def copy(name, item, direction, length):
     move(new, direction, length)
     new.SetName(name)
 
-def split_by_plane(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter))
+def copy_block(name, items, direction, length):
+    Copy.ToClipboard(select(items))
+    created = list(Paste.FromClipboard().CreatedObjects)
+    move(created, direction, length)
+    for new in created:
+        new.SetName(name)
+    return created
+
+def pattern(name, item, direction, pitch, count):
+    ''' count sections in one linear pattern, in the form
+    SpaceClaim records it: the direction is a selection, here
+    of a datum line dropped after, and CreateLinear takes an
+    info argument, not run against SpaceClaim yet '''
+    before = len(GetRootPart().Components)
+    axis = datum_line((0, 0, 0), (direction.X, direction.Y, direction.Z),
+                      'pattern')
+    data = LinearPatternData()
+    data.PatternDimension = PatternDimensionType.One
+    data.LinearDirection = select(axis)
+    data.CountX = count
+    data.PitchX = pitch
+    Pattern.CreateLinear(select(item), data, None)
+    delete(axis)
+    for new in GetRootPart().Components[before:]:
+        new.SetName(name)
+
+def instance(name, item, direction, length):
+    new = Component.Create(GetRootPart(), item.Template)
+    new.Transform(item.Placement)
+    move(new, direction, length)
+    new.SetName(name)
 
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
+def replicate(name, item, direction, pitch, count, mode='copy'):
+    ''' instances share the template geometry instead of
+    pasting a full copy, share_topology makes them independent '''
+    if mode == 'doubling':
+        ''' paste the stack built so far, 1, 2, 4, ... sections
+        plus the remainder, in the same order as one by one '''
+        stack = [item]
+        while len(stack) < count:
+            block = stack[:count - len(stack)]
+            stack += copy_block(name, block, direction,
+                                len(stack) * pitch)
+        return
+    if mode == 'pattern':
+        pattern(name, item, direction, pitch, count)
+        return
+    for i in range(1, count):
+        if mode == 'instance':
+            instance(name, item, direction, i * pitch)
+        else:
+            copy(name, item, direction, i * pitch)
 
 def merge_bodies(bodies):
     result = Combine.Merge(select(bodies))
@@ -113,31 +203,343 @@ def merge_bodies(bodies):
 def component(bodies):
     ComponentHelper.MoveBodiesToComponent(select(bodies))
 
+''' -------------------------------------------------------
+sector operations
+------------------------------------------------------- '''
+def polar(r, angle, z=0):
+    phi = math.radians(angle)
+    return (r * math.cos(phi), r * math.sin(phi), z)
+
+def distance((x1, y1, z1), (x2, y2, z2)):
+    return ((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2) ** .5
+
+def diamond(ogrid, angle, z=0):
+    ''' the o-grid square has its vertices on the axes,
+    this is where the ray at angle degrees crosses it '''
+    phi = math.radians(angle)
+    return polar(ogrid/(abs(math.cos(phi)) + abs(math.sin(phi))), angle, z)
+
+def border(ogrid, start, end, z=0):
+    ''' o-grid square from start to end degrees together
+    with its vertices in between '''
+    angles = [x for x in range(0, 720, 90) if start < x < end]
+    return [diamond(ogrid, x, z) for x in [start] + angles + [end]]
+
+def middle(ogrid, start, end, z, length, role=None):
+    ''' o-grid square extruded from z, short of a full turn
+    it is the sector between start and end degrees '''
+    points = border(ogrid, start, end, z)
+    if end - start < 360:
+        points = [(0, 0, z)] + points
+    else:
+        points = points[:-1]
+    sketch = Sketch(plane((0, 0, z), Direction.DirX, Direction.DirY))
+    sketch.polygon(*points)
+    extrude(sketch.finish(), Direction.DirZ, length, role=role)
+
+def inner(ogrid, radius, start, end, z, length, role=None):
+    ''' part between the o-grid square and radius from start
+    to end degrees, extruded from z '''
+    frame_1 = frame((0, 0, z), Direction.DirX, Direction.DirY)
+    points = border(ogrid, start, end, z)
+    sketch = Sketch(Plane.Create(frame_1))
+    sketch.polyline(*points)
+    sketch.line(points[-1], polar(radius, end, z))
+    sketch.circle(frame_1, radius, start, end)
+    sketch.line(polar(radius, start, z), points[0])
+    extrude(sketch.finish(), Direction.DirZ, length, role=role)
+
+def outer(profile, start, end, role=None):
+    ''' (r, z) profile revolved around the axis from start
+    to end degrees '''
+    sketch = Sketch(plane((0, 0, 0), direction(polar(1, start)),
+                          Direction.DirZ))
+    sketch.polygon(*[polar(r, start, z) for r, z in profile])
+    revolve(sketch.finish(), line((0, 0, 0), Direction.DirZ),
+            DEG(end - start), role=role)
+
+def on_plane(x, y, angle, tolerance):
+    ''' the point lies on the half-plane from the axis at angle
+    degrees, not on the other half of its plane '''
+    phi = math.radians(angle)
+    return abs(x * math.sin(phi) - y * math.cos(phi)) <= tolerance and \
+           x * math.cos(phi) + y * math.sin(phi) > tolerance
+
+def cuts(ogrid, sector):
+    ''' (angle, reach) of both cuts of a sector, reach being
+    where they cross the o-grid square, none for the pipe '''
+    if not sector:
+        return []
+    return [(x, distance((0, 0, 0), diamond(ogrid, x)))
+            for x in [90, 90 + sector]]
+
+def separable(ogrid, sector, tolerance):
+    ''' whether the cuts stay more than tolerance apart from
+    each other and from the corners of the o-grid between
+    them, closer ones are taken for the same plane '''
+    if not 0 < sector < 360:
+        return False
+    corners = [x for x in range(180, 720, 90) if x < 90 + sector]
+    angles = [90] + corners + [90 + sector]
+    gaps = [b - a for a, b in zip(angles[:-1], angles[1:])]
+    gap = min(gaps + [360 - sector, 180])
+    return ogrid / 8 ** .5 * math.sin(math.radians(gap / 2.)) > tolerance
+
 ''' -------------------------------------------------------
 named selections operations
 ------------------------------------------------------- '''
-def named_selection(name, items, condition=lambda x: True):
-    temp = []
+pending = []
+
+def named_selection(name, items):
+    ''' queued until create_groups() '''
+    pending.append((name, list(items)))
+
+def create_groups():
+    ''' every queued named selection, one Group.Create each as
+    the API has no batch call, with its final name so nothing
+    depends on the localized default name of a new group '''
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
+
+def unique(items):
+    ''' items in order, each one once however many times it
+    is reached '''
+    seen = set()
     for item in items:
-        if condition(item):
-            temp.append(item)
-    select = Selection.Create(temp)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
-    return temp
+        if item not in seen:
+            seen.add(item)
+            yield item
 
 def gather_faces(bodies):
-    faces = []
-    for body in bodies:
-        faces += body.Faces
-    return faces
+    return list(unique(x for body in bodies for x in body.Faces))
 
 def gather_edges(bodies):
-    edges = []
-    for body in bodies:
-        for face in body.Faces:
-            edges += face.Edges
-    return edges
+    ''' body.Edges has an edge shared by two faces once,
+    walking face.Edges met it twice '''
+    return list(unique(x for body in bodies for x in body.Edges))
+
+''' -------------------------------------------------------
+descriptor tables
+------------------------------------------------------- '''
+def mid_point(point):
+    return [point.X, point.Y, point.Z]
+
+def face_values(face):
+    return [face.Area, face.GetFaceNormal(0, 0).Z]
+
+def edge_values(edge):
+    return [edge.GetInterval().Span]
+
+def moved(p, q, dz, tolerance):
+    ''' point q is point p translated by dz along z '''
+    return abs(q[0] - p[0]) <= tolerance and \
+           abs(q[1] - p[1]) <= tolerance and \
+           abs(q[2] - p[2] - dz) <= tolerance
+
+def describe(sections, entities, columns, values, mid, template=None,
+             tolerance=MM(.001), tagged=False):
+    ''' every entity evaluated once into columns and the x, y
+    and z of its mid point, sections are (index, bodies) pairs,
+    body is the position in bodies and role the tag of the
+    entity if tagged, of its body otherwise
+
+    template is an (index, bodies, shift) section, another
+    section with as many entities in each of its bodies is its
+    copy translated along z by (index - template index) * shift,
+    with the entities in the same order, if its first and last
+    entities are where that puts them, its rows are then the
+    template rows moved along z and nothing else of it is
+    evaluated '''
+    table = dict((x, []) for x in
+                 ['item', 'section', 'body', 'role'] + columns +
+                 ['x', 'y', 'z'])
+
+    def rows(body, items):
+        kind = role(body)
+        return [(values(x), role(x) if tagged else kind, mid(x))
+                for x in items]
+
+    if template:
+        first, bodies, shift = template
+        models = [rows(x, list(entities(x))) for x in bodies]
+    for index, bodies in sections:
+        items = [list(entities(x)) for x in bodies]
+        dz = template and (index - first) * shift
+        known = template and \
+                [len(x) for x in items] == [len(x) for x in models] and \
+                all(items) and \
+                moved(models[0][0][2], mid(items[0][0]), dz, tolerance) and \
+                moved(models[-1][-1][2], mid(items[-1][-1]), dz, tolerance)
+        for j, body in enumerate(bodies):
+            if known:
+                found = [(x, kind, [p[0], p[1], p[2] + dz])
+                         for x, kind, p in models[j]]
+            else:
+                found = rows(body, items[j])
+            for item, (row, kind, point) in zip(items[j], found):
+                table['item'].append(item)
+                table['section'].append(index)
+                table['body'].append(j)
+                table['role'].append(kind)
+                for name, value in zip(columns + ['x', 'y', 'z'],
+                                       row + point):
+                    table[name].append(value)
+    return table
+
+def describe_faces(sections, template=None):
+    return describe(sections, lambda x: x.Faces, ['area', 'nz'],
+                    face_values, lambda x: mid_point(x.MidPoint().Point),
+                    template, tagged=True)
+
+def describe_edges(sections, template=None):
+    return describe(sections, lambda x: x.Edges, ['span'], edge_values,
+                    lambda x: mid_point(x.EvalMid().Point), template)
+
+def evaluate(spec, table):
+    ''' selections of a spec from one pass over the rows of a
+    table, spec is a list of (name, rule) where rule is either
+    a predicate over a row, the columns being its attributes,
+    or a set operation (op, name, name) with op one of '|',
+    '&' and '-' on selections listed before it
+
+    names starting with an underscore are operands only and
+    are left out of the result '''
+    operations = {'|': set.union, '&': set.intersection,
+                  '-': set.difference}
+    columns = sorted(table)
+    Row = collections.namedtuple('Row', columns)
+    tests = [(name, rule) for name, rule in spec if callable(rule)]
+    chosen = dict((name, set()) for name, rule in tests)
+    for i, values in enumerate(zip(*[table[x] for x in columns])):
+        row = Row(*values)
+        for name, rule in tests:
+            if rule(row):
+                chosen[name].add(i)
+    for name, rule in spec:
+        if not callable(rule):
+            op, a, b = rule
+            chosen[name] = operations[op](chosen[a], chosen[b])
+    selections = collections.OrderedDict()
+    for name, rule in spec:
+        if not name.startswith('_'):
+            selections[name] = [table['item'][i]
+                                for i in sorted(chosen[name])]
+    return selections
+
+''' -------------------------------------------------------
+expected inventory
+------------------------------------------------------- '''
+def revolved(profile, angle):
+    ''' volume of an (r, z) polygon revolved by angle radians,
+    angle times the first moment of its area about the axis '''
+    moment = 0
+    for (r1, z1), (r2, z2) in zip(profile, profile[1:] + profile[:1]):
+        moment += (r1 + r2) * (r1 * z2 - r2 * z1)
+    return angle * abs(moment) / 6
+
+def inventory(height, pitch, nsecs, ogrid, rib):
+    ''' bodies, faces and edges of a build, the size of every
+    named selection and the solid and fluid volumes, from the
+    parameters alone, rib is the (r, z) profile of the solid
+
+    every axial layer, 3 per test section and one per
+    stabilizer, is the middle part with n sides (t of them on
+    the o-grid square), and q inner and q outer parts with m
+    o-grid vertices each '''
+    if sector:
+        q, arc = 1, math.radians(sector)
+        m = len(border(ogrid, 90, 90 + sector)) - 2
+        n, t = m + 3, m + 1
+    else:
+        q, arc, m, n, t = 4, .5 * math.pi, 0, 4, 4
+    stabs = 0 if periodic else 2
+    layers = 3 * nsecs + stabs
+    axial = n + q * (m + 4) + 4 * q
+    expected = {
+        'bodies': layers * (1 + 2 * q),
+        'faces': layers * (n + 2 + q * (m + 6) + 6 * q),
+        'edges': layers * (3 * n + 3 * q * (m + 4) + 12 * q),
+        'solid': q * nsecs,
+        'fluid': layers * (1 + 2 * q) - q * nsecs,
+        'wall-fluid': 2 * q * nsecs,
+        'wall-solid': q * nsecs,
+        'sides': 3 * q * nsecs,
+        'tan': layers * (2 * t + 2 * q * (m + 2) + 4 * q),
+        'rad1': layers * 4 * q,
+        'rad2': layers * 4 * q,
+        'axi1': 2 * nsecs * axial,
+        'axi2': nsecs * axial}
+    if periodic:
+        expected.update({'periodic-in': 1 + 2 * q,
+                         'periodic-out': 1 + 2 * q})
+    else:
+        expected.update({'inlet': 1 + 2 * q,
+                         'outlet': 1 + 2 * q,
+                         'wall-out': 2 * q,
+                         'axi3': stabs * axial})
+    if sector:
+        expected.update({'symmetry-1': 3 * layers,
+                         'symmetry-2': 3 * layers})
+    length = pitch if periodic else 2 * length_stb + nsecs * pitch
+    solid = nsecs * revolved(rib, q * arc)
+    expected['solid volume'] = solid
+    expected['fluid volume'] = q * arc / 2 * radius ** 2 * length - solid
+    return expected
+
+def measure(groups, size, unit):
+    ''' the same inventory counted on the built bodies, groups
+    maps 'solid'/'fluid' to bodies, and on the queued named
+    selections '''
+    bodies = [x for kind in groups for x in groups[kind]]
+    actual = dict((name, len(items)) for name, items in pending)
+    actual['bodies'] = len(bodies)
+    actual['faces'] = len(gather_faces(bodies))
+    actual['edges'] = len(gather_edges(bodies))
+    for kind in groups:
+        actual['{} {}'.format(kind, unit)] = \
+            sum(size(x) for x in groups[kind])
+    return actual
+
+def check(expected, actual, rtol=1e-3):
+    ''' every difference at once, counts must match exactly
+    and sizes within rtol '''
+    wrong = []
+    for name in sorted(expected):
+        x, y = expected[name], actual.get(name)
+        if isinstance(x, int):
+            same = x == y
+        else:
+            same = y is not None and abs(x - y) <= rtol * abs(x)
+        if not same:
+            wrong.append('{}: expected {}, got {}'.format(name, x, y))
+    assert not wrong, '\n'.join(wrong)
+
+''' -------------------------------------------------------
+sub-assembly cache
+------------------------------------------------------- '''
+cache = collections.OrderedDict()
+
+def cached(key):
+    ''' modeler copies of the bodies built for key, kept out of
+    the document so they survive delete_all() and are not saved '''
+    if key in cache:
+        cache[key] = cache.pop(key)
+        return cache[key]
+
+def remember(key, bodies, size=8):
+    ''' least recently used entries go first past size '''
+    cache[key] = [(x.GetName(), role(x), x.Shape.Copy()) for x in bodies]
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+def restore(shapes):
+    ''' bodies again from their copies, new bodies have no
+    attributes so they are tagged again '''
+    for name, kind, shape in shapes:
+        body = DesignBody.Create(GetRootPart(), name, shape.Copy())
+        tag([body], kind)
 
 ''' -------------------------------------------------------
 finishing operations
@@ -153,6 +555,7 @@ def delete_all():
            GetRootPart().DatumPlanes,
            GetRootPart().DatumLines,
            GetRootPart().DatumPoints)
+    del pending[:]
 
 def share_topology(tolerance=MM(.1)):
     options = ShareTopologyOptions()
@@ -160,16 +563,341 @@ def share_topology(tolerance=MM(.1)):
     options.PreserveInstances = False
     ShareTopology.FindAndFix(options)
 
-def save(path):
-    path = '{}.scdoc'.format(path)
+def save(path, key=None):
     options = ExportOptions.Create()
-    DocumentSave.Execute(path, options)
+    DocumentSave.Execute('{}.scdoc'.format(path), options)
+    if key:
+        with open('{}.md5'.format(path), 'w') as f:
+            f.write(key)
+
+def fingerprint(*values):
+    ''' md5 of the script at script_path and the values a
+    variant is built from, None if the script cannot be read
+    back, which is said as every variant is then rebuilt '''
+    try:
+        with io.open(script_path, encoding='utf-8') as f:
+            source = f.read()
+    except (TypeError, IOError) as error:
+        print('no fingerprint, the variant is rebuilt: cannot read '
+              'the script ({}), pass script=<path>'.format(error))
+        return None
+    text = source + repr(values)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+def built(path, key):
+    ''' whether path.scdoc was saved with the same fingerprint '''
+    if not key or not os.path.exists('{}.scdoc'.format(path)):
+        return False
+    try:
+        with io.open('{}.md5'.format(path)) as f:
+            return f.read().strip() == key
+    except IOError:
+        return False
 
 def zoom():
     Selection.Clear()
     ViewHelper.ZoomToEntity()
 
 
+''' -------------------------------------------------------
+batch parameters
+------------------------------------------------------- '''
+def parameter(name, default=None):
+    ''' script parameters injected by a batch run,
+    see tools/sweep.py '''
+    try:
+        return getattr(Parameters, name)
+    except (NameError, AttributeError):
+        return default
+
+''' -------------------------------------------------------
+tracing
+------------------------------------------------------- '''
+traced = ['Sketch.finish', 'extrude', 'revolve', 'copy', 'move',
+          'replicate', 'component', 'share_topology', 'describe',
+          'evaluate', 'named_selection', 'measure', 'check',
+          'create_groups', 'save', 'delete_all']
+
+def patch(scope, names, wrapper):
+    ''' helpers or Class.method in scope replaced by what
+    wrapper(name, helper) makes of them, a name the script does
+    not have is an error rather than a helper left unwrapped '''
+    for name in names:
+        owner, _, attr = name.rpartition('.')
+        if owner:
+            owner = scope.get(owner)
+            if not hasattr(owner, attr):
+                raise NameError('no helper ' + name)
+            setattr(owner, attr, wrapper(name, getattr(owner, attr)))
+        elif name in scope:
+            scope[name] = wrapper(name, scope[name])
+        else:
+            raise NameError('no helper ' + name)
+
+class Tracer():
+    ''' opt-in timing of the CAD helpers, every call of a
+    wrapped helper is a complete event of a chrome trace
+    (chrome://tracing, perfetto) with the objects in the root
+    part after it, flush() writes the totals of a build as csv
+
+    clock is time.time in SpaceClaim, the stand-in of
+    tools/standin.py counts operations of the modeler instead '''
+
+    def __init__(self, folder, clock=time.time):
+        self.folder = folder
+        self.clock = clock
+        self.events = []
+        self.totals = collections.OrderedDict()
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def wrap(self, scope, names):
+        patch(scope, names, self.timed)
+
+    def timed(self, name, function):
+        def call(*args, **kwargs):
+            start = self.clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, start, self.clock())
+        return call
+
+    def record(self, name, start, end):
+        count = objects()
+        calls, seconds, most = self.totals.get(name, (0, 0., 0))
+        self.totals[name] = (calls + 1, seconds + end - start,
+                             max(most, count))
+        self.events.append({'name': name, 'ph': 'X',
+                            'pid': os.getpid(), 'tid': 0,
+                            'ts': int(start * 1e6),
+                            'dur': int((end - start) * 1e6),
+                            'args': {'objects': count}})
+
+    def flush(self, path):
+        ''' totals of the build saved to path as <name>.csv, the
+        trace so far as trace-<pid>.json for the whole sweep '''
+        name = os.path.basename(path)
+        with open(os.path.join(self.folder, name + '.csv'), 'w') as f:
+            f.write('operation,calls,seconds,mean,objects\n')
+            for key, (calls, seconds, most) in self.totals.items():
+                f.write('{},{},{:.4f},{:.4f},{}\n'.format(
+                    key, calls, seconds, seconds / calls, most))
+        self.totals.clear()
+        trace = 'trace-{}.json'.format(os.getpid())
+        with open(os.path.join(self.folder, trace), 'w') as f:
+            json.dump({'traceEvents': self.events,
+                       'displayTimeUnit': 'ms'}, f)
+
+def objects():
+    return len(GetRootPart().Components) + len(GetRootPart().Bodies)
+
+tracer = None
+
+''' -------------------------------------------------------
+journal
+------------------------------------------------------- '''
+journaled = ['Sketch.finish', 'extrude', 'revolve', 'copy', 'move',
+             'replicate', 'component', 'rename', 'delete', 'delete_all',
+             'share_topology', 'named_selection', 'create_groups', 'save']
+
+''' arguments of a helper that are lengths, by position,
+scaled on replay together with every point and radius '''
+lengths = {'extrude': [2], 'move': [2], 'copy': [3], 'replicate': [3],
+           'share_topology': [0]}
+
+class Journal():
+    ''' opt-in record of the helpers that change the document,
+    every outermost call in order with its arguments resolved
+    to numbers, geometry and addresses of bodies, faces and
+    edges, flush() writes the journal of a build as json
+
+    replay() makes the calls of a journal again and nothing
+    else, none of the bookkeeping between them, the tables and
+    predicates of the named selections included '''
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.calls = []
+        self.depth = 0
+        self.places = None
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def wrap(self, scope, names):
+        patch(scope, names, self.recorded)
+
+    def recorded(self, name, function):
+        def call(*args, **kwargs):
+            if not self.depth:
+                self.calls.append([name, [self.encode(x) for x in args],
+                                   dict((k, self.encode(v))
+                                        for k, v in kwargs.items())])
+            self.depth += 1
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.depth -= 1
+                ''' named selections only queue, anything else
+                may change where things are '''
+                if name != 'named_selection':
+                    self.places = None
+        return call
+
+    def encode(self, value):
+        ''' an argument as json, see decode() '''
+        if value is None or isinstance(value, (bool, int, long, float,
+                                               basestring)):
+            return value
+        if isinstance(value, Direction):
+            return {'direction': [value.X, value.Y, value.Z]}
+        if isinstance(value, Point):
+            return {'point': [value.X, value.Y, value.Z]}
+        if isinstance(value, Frame):
+            return {'frame': [self.encode(x) for x in
+                              [value.Origin, value.DirX, value.DirY]]}
+        if isinstance(value, Plane):
+            return {'plane': self.encode(value.Frame)}
+        if isinstance(value, Line):
+            return {'line': [self.encode(value.Origin),
+                             self.encode(value.Direction)]}
+        if isinstance(value, CurveSegment):
+            if isinstance(value.Geometry, Circle):
+                return {'arc': [self.encode(value.Geometry.Frame),
+                                value.Geometry.Radius,
+                                value.Bounds.Start, value.Bounds.End]}
+            return {'segment': [self.encode(value.StartPoint),
+                                self.encode(value.EndPoint)]}
+        if isinstance(value, Sketch):
+            return {'sketch': [self.encode(value.plane),
+                               self.encode(value.curves),
+                               getattr(value, 'loops', [])]}
+        if isinstance(value, (DesignBody, DesignFace, DesignEdge,
+                              Component, DatumPlane)):
+            return {'item': self.address(value)}
+        return [self.encode(x) for x in value]
+
+    def address(self, item):
+        ''' where item is in the root part, see find() '''
+        if self.places is None:
+            root = GetRootPart()
+            self.places = {}
+            for i, body in enumerate(root.Bodies):
+                self.places[body] = ['body', i]
+            for i, component in enumerate(root.Components):
+                self.places[component] = ['component', i]
+                for j, body in enumerate(component.GetBodies()):
+                    self.places[body] = ['component', i, j]
+            for i, datum in enumerate(root.DatumPlanes):
+                self.places[datum] = ['datum', i]
+        if item not in self.places:
+            ''' every face or edge of its body at once '''
+            body = item.Parent
+            kind = 'face' if isinstance(item, DesignFace) else 'edge'
+            entities = body.Faces if kind == 'face' else body.Edges
+            for k, entity in enumerate(entities):
+                self.places[entity] = self.places[body] + [kind, k]
+        return self.places[item]
+
+    def flush(self, path):
+        ''' calls of the build saved to path as <name>.journal.json '''
+        name = os.path.basename(path) + '.journal.json'
+        with open(os.path.join(self.folder, name), 'w') as f:
+            json.dump({'calls': self.calls}, f, separators=(',', ':'))
+        del self.calls[:]
+
+    @staticmethod
+    def replay(path, scale=1., output=None):
+        ''' the calls of the journal at path made again, lengths
+        times scale, saved to output instead of where the build
+        was saved if given, returns where it is saved '''
+        with open(path) as f:
+            calls = json.load(f)['calls']
+        scope = globals()
+        for name, args, kwargs in calls:
+            found = {}
+            args = decode(args, scale, found)
+            kwargs = dict((str(k), decode(v, scale, found))
+                          for k, v in kwargs.items())
+            for i in lengths.get(name, []):
+                if i < len(args):
+                    args[i] *= scale
+            if name == 'save':
+                ''' without the fingerprint, a replay is no build
+                of the script '''
+                output = output or args[0]
+                args, kwargs = [output], {}
+            if '.' in name:
+                owner, attr = name.split('.')
+                function = getattr(scope[owner], attr)
+            else:
+                function = scope[name]
+            function(*args, **kwargs)
+        return output
+
+def find(address, found):
+    ''' the object at an address of Journal.address(), found
+    keeps the lists met on the way for the next address '''
+    def listed(key, items):
+        if key not in found:
+            found[key] = list(items())
+        return found[key]
+    root = GetRootPart()
+    kind, i = address[:2]
+    if kind == 'datum':
+        return listed(kind, lambda: root.DatumPlanes)[i]
+    if kind == 'body':
+        body = listed(kind, lambda: root.Bodies)[i]
+        rest = address[2:]
+    else:
+        components = listed(kind, lambda: root.Components)
+        if len(address) == 2:
+            return components[i]
+        body = listed(i, lambda: components[i].GetBodies())[address[2]]
+        rest = address[3:]
+    if not rest:
+        return body
+    kind, k = rest
+    return listed((body, kind), lambda: body.Faces if kind == 'face'
+                  else body.Edges)[k]
+
+def decode(value, scale, found):
+    ''' a journal argument back as what it was, points and
+    radii times scale '''
+    if isinstance(value, list):
+        return [decode(x, scale, found) for x in value]
+    if not isinstance(value, dict):
+        return value
+    kind, data = list(value.items())[0]
+    if kind == 'item':
+        return find(data, found)
+    if kind == 'point':
+        return Point.Create(*[x * scale for x in data])
+    if kind == 'direction':
+        return Direction.Create(*data)
+    data = decode(data, scale, found)
+    if kind == 'frame':
+        return Frame.Create(*data)
+    if kind == 'plane':
+        return Plane.Create(data)
+    if kind == 'line':
+        return Line.Create(*data)
+    if kind == 'segment':
+        return CurveSegment.Create(*data)
+    if kind == 'arc':
+        frame, radius, start, end = data
+        return CurveSegment.Create(Circle.Create(frame, radius * scale),
+                                   Interval.Create(start, end))
+    plane, curves, loops = data
+    sketch = Sketch(plane)
+    for curve in curves:
+        sketch.curves.Add(curve)
+    sketch.loops = [(label, [[x * scale for x in point] for point in points])
+                    for label, points in loops]
+    return sketch
+
+journal = None
+
 ''' -------------------------------------------------------
 START FROM HERE
 ------------------------------------------------------- '''
@@ -206,171 +934,156 @@ delta1 = MM(.48)
 delta2 = MM(.05)
 split = .74
 
+''' test sections are replicated by 'copy', 'instance',
+'doubling' or 'pattern', instances are only made independent
+by share_topology when PreserveInstances is off, which is not
+checked against SpaceClaim yet, so they are opt-in, as is
+'pattern', written to the recorded call form but not run '''
+replication = 'copy'
+
+''' named selections of the test sections are mapped from
+the first one instead of classifying every copy, a body is
+mapped by the order of its entities where a sample of them
+is where the template has them '''
+mapping = True
+
+''' stabilizers kept in memory across the builds of one run,
+benchmark() and a pitch loop rebuild them at the same height '''
+cache_size = 8
+
+''' a single test section between periodic-in and
+periodic-out, without stabilizers and replicas '''
+periodic = False
+
+''' only the sector from 90 to 90 + sector degrees with
+symmetry-1/symmetry-2 on its cuts, None is the whole pipe,
+cuts closer than TOL to each other or to an o-grid corner
+are refused by separable() '''
+sector = None
+
+''' a folder for the per-build csv and the trace of the
+sweep, see Tracer, None leaves the helpers untouched '''
+trace = None
+
+''' a folder for the journal of every build, see Journal '''
+record = None
+
+''' True counts the build against its expected inventory,
+whose counts are calibrated on tools/standin.py only, where
+share topology imprints nothing, so it is off by default '''
+validate = False
+
 ''' -------------------------------------------------------
 define builder function
 ------------------------------------------------------- '''
 
-def builder(height, pitch):
-    
+def builder(height, pitch, path=None, force=False):
+
+    if not path:
+        path = 'C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3T-{}-{}'.\
+               format(heights.get(height), pitches.get(pitch))
+        if periodic:
+            path += '-P'
+        if sector:
+            path += '-S{:g}'.format(sector)
+
+    ''' skip variants saved from the same script and parameters '''
+    key = fingerprint(height, pitch, radius, delta1, delta2, split, TOL, RTOL,
+                      length_all, length_stb, periodic, sector)
+    if built(path, key) and not force:
+        return
+
     delete_all()
 
     ogrid = (radius - height) * split
     nsecs = int((length_all - 2 * length_stb)/pitch)
+    if periodic:
+        nsecs = 1
+
+    ''' the whole pipe quarter by quarter or the sector '''
+    assert not sector or separable(ogrid, sector, TOL)
+    quarters = [(90 * i, 90 * (i + 1)) for i in range(4)]
+    if sector:
+        quarters = [(90, 90 + sector)]
 
     ''' -------------------------------------------------------
     create test sections
     ------------------------------------------------------- '''
-    ''' middle rectangle '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon((ogrid, 0, 0), 
-                   (0, ogrid, 0), 
-                   (-ogrid, 0, 0), 
-                   (0, -ogrid, 0))
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, pitch)
-
-    ''' inner part '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon((ogrid, 0, 0), 
-                   (0, ogrid, 0), 
-                   (-ogrid, 0, 0), 
-                   (0, -ogrid, 0))
-    frame_1 = frame((0, 0, 0), Direction.DirX, Direction.DirY)
-    sketch.circle(frame_1, radius - height)
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, pitch)
-
-    ''' outer part 3 parts
-    unlike the others is made by revolving aroung line_1 '''
-    line_1 = line((0, 0, 0), Direction.DirZ)
-
-    sketch = Sketch(Plane.PlaneYZ)
-    sketch.polygon(
-        (0, radius - height, 0), 
-        (0, radius, 0), 
-        (0, radius, pitch/2 - delta1/2), 
-        (0, radius - height, pitch/2 + delta1/2 - delta2))
-    result = sketch.finish()
-    revolve(result, line_1)
-
-    sketch = Sketch(Plane.PlaneYZ)
-    sketch.polygon(
-        (0, radius - height, pitch/2 + delta1/2 - delta2), 
-        (0, radius, pitch/2 - delta1/2), 
-        (0, radius, pitch/2 + delta1/2), 
-        (0, radius - height, pitch/2 + delta1/2))
-    result = sketch.finish()
-    revolve(result, line_1)
-
-    sketch = Sketch(Plane.PlaneYZ)
-    sketch.polygon(
-        (0, radius - height, pitch/2 + delta1/2),
-        (0, radius, pitch/2 + delta1/2), 
-        (0, radius, pitch), 
-        (0, radius - height, pitch))
-    result = sketch.finish()
-    revolve(result, line_1)
-
-    ''' make axial and radial cuts '''
-    cut_axial_1 = datum_plane(
-        (0, 0, pitch/2 - delta1/2),
-        Direction.DirX, Direction.DirY)
-    cut_axial_2 = datum_plane(
-        (0, 0, pitch/2 - delta1/2 + delta2),
-        Direction.DirX, Direction.DirY)
-    split_by_plane(GetRootPart().Bodies[0], cut_axial_1)
-    split_by_plane(GetRootPart().Bodies[1], cut_axial_1)
-
-    split_by_plane(GetRootPart().Bodies[5], cut_axial_2)
-    split_by_plane(GetRootPart().Bodies[6], cut_axial_2)
-
-    cut_radial_1 = datum_plane((0, 0, 0),
-                               Direction.DirX, Direction.DirZ)
-    cut_radial_2 = datum_plane((0, 0, 0),
-                               Direction.DirY, Direction.DirZ)
-    split_by_plane(GetRootPart().Bodies[1],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[2],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[3],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[4],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[6],  cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[8],  cut_radial_1)
-
-    split_by_plane(GetRootPart().Bodies[1],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[2],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[3],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[4],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[6],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[8],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[9],  cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[10], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[11], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[12], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[13], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[14], cut_radial_2)
+    ''' middle rectangle and inner part in the axial layers
+    of the rib, the inner part quarter by quarter '''
+    layers = [0, pitch/2 - delta1/2, pitch/2 - delta1/2 + delta2, pitch]
+    for z1, z2 in zip(layers[:-1], layers[1:]):
+        middle(ogrid, quarters[0][0], quarters[-1][1], z1, z2 - z1,
+               'fluid')
+        for start, end in quarters:
+            inner(ogrid, radius - height, start, end, z1, z2 - z1,
+                  'fluid')
+
+    ''' outer part 3 parts, (r, z) profiles revolved
+    quarter by quarter, the middle one is the solid '''
+    outer_1 = [(radius - height, 0),
+               (radius, 0),
+               (radius, pitch/2 - delta1/2),
+               (radius - height, pitch/2 + delta1/2 - delta2)]
+    outer_2 = [(radius - height, pitch/2 + delta1/2 - delta2),
+               (radius, pitch/2 - delta1/2),
+               (radius, pitch/2 + delta1/2),
+               (radius - height, pitch/2 + delta1/2)]
+    outer_3 = [(radius - height, pitch/2 + delta1/2),
+               (radius, pitch/2 + delta1/2),
+               (radius, pitch),
+               (radius - height, pitch)]
+    for profile, kind in [(outer_1, 'fluid'),
+                          (outer_2, 'solid'),
+                          (outer_3, 'fluid')]:
+        for start, end in quarters:
+            outer(profile, start, end, kind)
 
     ''' move to component - translate - copy '''
     component(GetRootPart().Bodies)
     test = GetRootPart().Components[-1]
-    test.SetName('test')
+    rename(test, 'test')
 
-    move(test, Direction.DirZ, length_stb)
+    if not periodic:
+        move(test, Direction.DirZ, length_stb)
 
-    for i in range(1, nsecs):
-        copy('test', test, Direction.DirZ, i * pitch)
+        start = time.time()
+        replicate('test', test, Direction.DirZ, pitch, nsecs, replication)
+        if timings is not None:
+            timings.append((replication, pitch, nsecs, time.time() - start))
 
     
-    ''' -------------------------------------------------------
-    create stabilization sections
-    ------------------------------------------------------- '''
-    ''' middle rectangle '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon((ogrid, 0, 0), 
-                   (0, ogrid, 0), 
-                   (-ogrid, 0, 0), 
-                   (0, -ogrid, 0))
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, length_stb)
-
-    ''' inner part '''
-    sketch = Sketch(Plane.PlaneXY)
-    sketch.polygon(
-        (ogrid, 0, 0), 
-        (0, ogrid, 0), 
-        (-ogrid, 0, 0), 
-        (0, -ogrid, 0))
-    frame_1 = frame((0, 0, 0), Direction.DirX, Direction.DirY)
-    sketch.circle(frame_1, radius - height)
-    result = sketch.finish()
-    extrude(result, Direction.DirZ, length_stb)
-
-    ''' outer part by revolving aroung line_1 '''
-    line_1 = line((0, 0, 0), Direction.DirZ)
-
-    sketch = Sketch(Plane.PlaneYZ)
-    sketch.polygon(
-        (0, radius - height, 0), 
-        (0, radius, 0), 
-        (0, radius, length_stb), 
-        (0, radius - height, length_stb))
-    result = sketch.finish()
-    revolve(result, line_1)
-
-    ''' make radial cuts '''
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_1)
-    split_by_plane(GetRootPart().Bodies[2], cut_radial_1)
-
-    split_by_plane(GetRootPart().Bodies[1], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[2], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[3], cut_radial_2)
-    split_by_plane(GetRootPart().Bodies[4], cut_radial_2)
-
-    ''' move to component - translate - copy '''
-    component(GetRootPart().Bodies)
-    stab = GetRootPart().Components[-1]
-    stab.SetName('stab')
-
-    copy('stab', stab, Direction.DirZ, 
-         length_stb + nsecs * pitch)
+        ''' -------------------------------------------------------
+        create stabilization sections
+        ------------------------------------------------------- '''
+        ''' stabilizers do not depend on the pitch, reuse them '''
+        stab_key = ('stab', height, length_stb, sector, radius, split)
+        ''' a journal has them built, not restored '''
+        shapes = None if journal else cached(stab_key)
+        if shapes:
+            restore(shapes)
+        else:
+            ''' middle rectangle, inner and outer part '''
+            middle(ogrid, quarters[0][0], quarters[-1][1], 0, length_stb,
+                   'fluid')
+            for start, end in quarters:
+                inner(ogrid, radius - height, start, end, 0, length_stb,
+                      'fluid')
+            profile = [(radius - height, 0),
+                       (radius, 0),
+                       (radius, length_stb),
+                       (radius - height, length_stb)]
+            for start, end in quarters:
+                outer(profile, start, end, 'fluid')
+            remember(stab_key, GetRootPart().Bodies, cache_size)
+
+        ''' move to component - translate - copy '''
+        component(GetRootPart().Bodies)
+        stab = GetRootPart().Components[-1]
+        rename(stab, 'stab')
+
+        copy('stab', stab, Direction.DirZ, 
+             length_stb + nsecs * pitch)
 
     ''' trash and share topology '''
     zoom()
@@ -382,94 +1095,211 @@ def builder(height, pitch):
     create named selections
     ------------------------------------------------------- '''
     ''' helpful functions '''
-    face_up = lambda x: x.GetFaceNormal(0, 0).Z == 1
-    face_dn = lambda x: x.GetFaceNormal(0, 0).Z == -1
     equals = lambda x, y: abs(x - y)/y <= RTOL
+    arc = math.radians(sector) if sector else .5 * math.pi
+    ''' the mid point of a face is on the cylinder of radius r,
+    an area alone matches other faces for some sectors '''
+    at = lambda x, r: equals(x.x ** 2 + x.y ** 2, r ** 2)
 
     ''' define the tree '''
-    stab1 = GetRootPart().Components[-2]
-    stab2 = GetRootPart().Components[-1]
+    stabs = []
+    if not periodic:
+        stab1 = GetRootPart().Components[-2]
+        stab2 = GetRootPart().Components[-1]
+        stabs = stab1.GetBodies() + stab2.GetBodies()
     tests = GetRootPart().Components[:nsecs]
 
     ''' fluent named selections '''
     bodies_solid = []
     bodies_fluid = []
     for i in range(nsecs):
-        bodies = tests[i].GetBodies()
-        for j in range(27):
-            if j in [3, 11, 17, 23]:
-                bodies_solid.append(bodies[j])
+        for body in tests[i].GetBodies():
+            if role(body) == 'solid':
+                bodies_solid.append(body)
             else:
-                bodies_fluid.append(bodies[j])
-    for body in stab1.GetBodies() + stab2.GetBodies():
+                bodies_fluid.append(body)
+    for body in stabs:
         bodies_fluid.append(body)
     named_selection('solid', bodies_solid)
     named_selection('fluid', bodies_fluid)
 
-    faces_stab_1 = gather_faces(stab1.GetBodies())
-    named_selection('inlet', faces_stab_1, face_dn)
-
-    faces_stab_2 = gather_faces(stab2.GetBodies())
-    named_selection('outlet', faces_stab_2, face_up)
-
-    faces = faces_stab_1 + faces_stab_2
-    area = .5 * math.pi * radius * length_stb
-    named_selection('wall-out', faces, 
-                         lambda x: equals(x.Area, area))
-
-    faces = gather_faces(bodies_solid + bodies_fluid)
-    area = .5 * math.pi * radius * (pitch/2 - delta1/2)
-    named_selection('wall-fluid', faces, 
-                         lambda x: equals(x.Area, area))
-
-    faces = gather_faces(bodies_solid)
-    area = .5 * math.pi * radius * delta1
-    named_selection('wall-solid', faces,
-                         lambda x: equals(x.Area, area))
-
-    area = .5 * math.pi * (radius - height) * delta2
-    named_selection('sides', faces, 
-        lambda x: x.GetFaceNormal(0, 0).Z != 0 or 
-                  equals(x.Area, area))
+    ''' evaluate every face and edge once, stabilizers are
+    sections -1 and nsecs and do not match the template '''
+    sections = [(i, tests[i].GetBodies()) for i in range(nsecs)]
+    if not periodic:
+        sections = [(-1, stab1.GetBodies())] + sections + \
+                   [(nsecs, stab2.GetBodies())]
+    template = None
+    if mapping:
+        template = (0, tests[0].GetBodies(), pitch)
+    faces = describe_faces(sections, template)
+    edges = describe_edges(sections, template)
+
+    if periodic:
+        spec = [
+            ('periodic-in', lambda x: x.nz == -1 and abs(x.z) <= TOL),
+            ('periodic-out', lambda x: x.nz == 1 and
+                                       abs(x.z - pitch) <= TOL)]
+    else:
+        spec = [
+            ('inlet', lambda x: x.section == -1 and x.nz == -1),
+            ('outlet', lambda x: x.section == nsecs and x.nz == 1),
+            ('wall-out', lambda x: x.section in [-1, nsecs] and
+                         at(x, radius) and
+                         equals(x.area, arc * radius * length_stb))]
+    spec += [
+        ('wall-fluid', lambda x: at(x, radius) and
+            equals(x.area, arc * radius * (pitch/2 - delta1/2))),
+        ('wall-solid', lambda x: x.role == 'solid' and at(x, radius) and
+            equals(x.area, arc * radius * delta1)),
+        ('sides', lambda x: x.role == 'solid' and (x.nz != 0 or
+            at(x, radius - height) and
+            equals(x.area, arc * (radius - height) * delta2)))]
+    if sector:
+        ''' the faces across the cuts of the sector, the mid
+        point of an axial face is anywhere in its bounds and can
+        be on a cut however far the face is from it '''
+        across = lambda x, angle: abs(x.nz) <= RTOL and \
+                                  on_plane(x.x, x.y, angle, TOL)
+        spec += [
+            ('symmetry-1', lambda x: across(x, 90)),
+            ('symmetry-2', lambda x: across(x, 90 + sector))]
+    selections = evaluate(spec, faces)
+
+    if periodic:
+        ''' both ends of the section, their faces must pair up
+        one to one for a conformal periodic interface '''
+        area_in = sorted(x.Area for x in selections['periodic-in'])
+        area_out = sorted(x.Area for x in selections['periodic-out'])
+        assert len(area_in) == len(area_out) and \
+            all(equals(x, y) for x, y in zip(area_in, area_out))
+    for name, items in selections.items():
+        named_selection(name, items)
 
     ''' mesher named selections '''
-    edges = gather_edges(bodies_solid + bodies_fluid)
-    length_1 = 2 ** .5 * ogrid
-    length_2 = .5 * math.pi
-    named_selection('tan', edges,
-        lambda x: equals(x.GetInterval().Span, length_1) or
-                  equals(x.GetInterval().Span, length_2))
-
+    tangential = [2 ** .5 * ogrid, arc]
+    radial = [radius - height - ogrid]
+    if sector:
+        ''' unless the cuts hit its vertices the o-grid square
+        ends with shorter edges '''
+        points = border(ogrid, 90, 90 + sector)
+        tangential = [distance(a, b) for a, b in
+                      zip(points[:-1], points[1:])] + [arc]
+        radial = [radius - height - distance((0, 0, 0), x)
+                  for x in [points[0], points[-1]]]
     length = ((delta1 - delta2) ** 2 + height ** 2) ** .5
-    named_selection('rad1', edges,
-        lambda x: equals(x.GetInterval().Span, height) or
-                  equals(x.GetInterval().Span, length))
-
-    length = radius - height - ogrid
-    named_selection('rad2', edges,
-        lambda x: equals(x.GetInterval().Span, length))
-
-    length_1 = pitch/2 - delta1/2
-    length_2 = pitch/2 + delta1/2 - delta2
-    named_selection('axi1', edges,
-        lambda x: equals(x.GetInterval().Span, length_1) or
-                  equals(x.GetInterval().Span, length_2))
-
-    named_selection('axi2', edges,
-        lambda x: equals(x.GetInterval().Span, delta1) or
-                  equals(x.GetInterval().Span, delta2))
-
-    named_selection('axi3', edges,
-        lambda x: equals(x.GetInterval().Span, length_stb))
+    ''' edges along the cuts of a sector are not tangential,
+    those from the axis to the o-grid square are spokes, as
+    long as a tangential or radial edge for some angles and
+    neither '''
+    ends = cuts(ogrid, sector)
+    along = lambda x: any(on_plane(x.x, x.y, a, TOL) for a, r in ends)
+    spoke = lambda x: any(on_plane(x.x, x.y, a, TOL) and
+                          x.x ** 2 + x.y ** 2 < r ** 2 for a, r in ends)
+    spec = [
+        ('_tan', lambda x: any(equals(x.span, y) for y in tangential)),
+        ('_along', along),
+        ('tan', ('-', '_tan', '_along')),
+        ('_spoke', spoke),
+        ('_rad1', lambda x: equals(x.span, height) or
+                            equals(x.span, length)),
+        ('rad1', ('-', '_rad1', '_spoke')),
+        ('_rad2', lambda x: any(equals(x.span, y) for y in radial)),
+        ('rad2', ('-', '_rad2', '_spoke')),
+        ('axi1', lambda x: equals(x.span, pitch/2 - delta1/2) or
+                           equals(x.span, pitch/2 + delta1/2 - delta2)),
+        ('axi2', lambda x: equals(x.span, delta1) or
+                           equals(x.span, delta2))]
+    if not periodic:
+        spec += [('axi3', lambda x: equals(x.span, length_stb))]
+    for name, items in evaluate(spec, edges).items():
+        named_selection(name, items)
+
+    ''' counted against the model before anything is created,
+    a face or an edge a predicate misses fails here '''
+    if validate:
+        actual = measure({'solid': bodies_solid, 'fluid': bodies_fluid},
+                         lambda x: x.Shape.Volume, 'volume')
+        check(inventory(height, pitch, nsecs, ogrid, outer_2), actual,
+              RTOL)
+
+    create_groups()
 
     ''' save everything '''
-    save('C:\\users\\frenc\\yandexdisk\\cfd\\geo\\3T-{}-{}'.\
-         format(heights.get(height), pitches.get(pitch)))
+    save(path, key)
+    if tracer:
+        tracer.flush(path)
+    if journal:
+        journal.flush(path)
+
+''' -------------------------------------------------------
+benchmark replication modes
+------------------------------------------------------- '''
+''' (mode, pitch, sections, seconds) of every replication
+while benchmark() runs, None leaves the builds untimed '''
+timings = None
+
+def benchmark(height, modes=('copy', 'doubling'), folder=None):
+    ''' builds every pitch with each mode into folder, a
+    temporary one by default so the saved variants are left
+    alone, the geometry is the same whatever the mode '''
+    global replication, timings
+    default = replication
+    folder = folder or tempfile.mkdtemp()
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    timings = []
+    try:
+        for pitch in pitches.keys():
+            for mode in modes:
+                replication = mode
+                name = '{}-{}-{}'.format(mode, heights.get(height),
+                                         pitches.get(pitch))
+                builder(height, pitch, os.path.join(folder, name),
+                        force=True)
+        for mode, pitch, nsecs, seconds in timings:
+            print('{:<10}{:>8.4f}{:>6}{:>10.2f}'.format(
+                mode, pitch, nsecs, seconds))
+    finally:
+        replication, timings = default, None
 
 ''' -------------------------------------------------------
 start modeling
 ------------------------------------------------------- '''
-pitch = MM(10)
-# for pitch in pitches.keys():
-for height in heights.keys():
-    builder(height, pitch)
+trace = parameter('trace', trace)
+if trace:
+    tracer = Tracer(trace, parameter('clock', time.time))
+    tracer.wrap(globals(), traced)
+
+record = parameter('record', record)
+if record:
+    journal = Journal(record)
+    journal.wrap(globals(), journaled)
+
+validate = str(parameter('validate', validate)) != 'False'
+
+''' the script fingerprints are made of, SpaceClaim need not
+define __file__ for /RunScript, so a batch run names it '''
+script_path = parameter('script', globals().get('__file__'))
+
+''' a longer or shorter pipe, in diameters '''
+if parameter('length'):
+    length_all = float(parameter('length')) * diameter
+
+if parameter('replay'):
+    ''' a journal made again instead of a build '''
+    path = Journal.replay(parameter('replay'),
+                          float(parameter('scale', 1.)),
+                          parameter('output'))
+    if tracer:
+        tracer.flush(path)
+elif parameter('height'):
+    ''' a single variant injected by a batch run '''
+    builder(MM(float(parameter('height'))),
+            MM(float(parameter('pitch'))),
+            parameter('output'))
+else:
+    pitch = MM(10)
+    # for pitch in pitches.keys():
+    for height in heights.keys():
+        builder(height, pitch)
@@ -1,5 +1,6 @@
 import math
 from itertools import cycle
+from System.Collections.Generic import List
 
 class Sketch():
 
@@ -54,6 +55,13 @@ def plane(dot, normal):
 def select(item):
     return Selection.Create(item)
 
+def as_list(item):
+    # a single item or any collection of them
+    try:
+        return list(item)
+    except TypeError:
+        return [item]
+
 def rotate(face, axis, angle):
     options = RevolveFaceOptions()
     options.ExtrudeType = ExtrudeType.ForceIndependent
@@ -78,11 +86,38 @@ def delete(*args):
         if item:
             Delete.Execute(select(item))
 
-def split_by_plane(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter))
-
-def split_by_face(body, cutter):
-    SplitBody.ByCutter(select(body), select(cutter), True)
+def split_by_plane(bodies, cutters):
+    return split_bodies(bodies, cutters)
+
+def split_by_face(bodies, cutters):
+    return split_bodies(bodies, cutters, True)
+
+def split_bodies(bodies, cutters, extend=False):
+    # every body by every cutter in a single SplitBody call,
+    # returns the pieces of each body in the order of bodies
+    #
+    # pieces keep the name of their body, so the bodies are
+    # tagged for the call and get their own names back after
+    bodies, cutters = as_list(bodies), as_list(cutters)
+    names = [x.Name for x in bodies]
+    parts = []
+    for i, body in enumerate(bodies):
+        body.Name = 'split-{}'.format(i)
+        if body.Parent not in parts:
+            parts.append(body.Parent)
+    if extend:
+        SplitBody.ByCutter(select(bodies), select(cutters), True)
+    else:
+        SplitBody.ByCutter(select(bodies), select(cutters))
+    tags = dict(('split-{}'.format(i), i) for i in range(len(bodies)))
+    pieces = [[] for x in bodies]
+    for part in parts:
+        for body in part.Bodies:
+            i = tags.get(body.Name)
+            if i is not None:
+                pieces[i].append(body)
+                body.Name = names[i]
+    return pieces
 
 def merge_bodies(bodies):
     result = Combine.Merge(select(bodies))
@@ -100,10 +135,20 @@ def save(name):
     options = ExportOptions.Create()
     DocumentSave.Execute(path, options)
 
+pending = []
+
 def named_selection(name, items):
-    select = Selection.Create(items)
-    NamedSelection.Create(select, Selection.Empty())
-    NamedSelection.Rename('Группа1', name)
+    # queued until create_groups()
+    pending.append((name, list(items)))
+
+def create_groups():
+    # every queued named selection, one Group.Create each as
+    # the API has no batch call, with its final name so nothing
+    # depends on the localized default name of a new group
+    part = GetRootPart()
+    for name, items in pending:
+        Group.Create(part, name, List[IDocObject](items))
+    del pending[:]
 
 def named_selection_auto(name, items, condition):
     temp = []
@@ -247,5 +292,6 @@ faces = named_selection_auto('tub-rnd', TUB_Faces, lambda x: face_0(x) and face_
 area = faces[0].Area
 named_selection_auto('plt-rnd', PLT0.Faces, lambda x: face_0(x) and face_neq(x.Area, area))
 
+create_groups()
 share_topology()
 end()
@@ -0,0 +1,256 @@
+''' -------------------------------------------------------
+section-count scaling benchmark
+
+Builds every builder along a ladder of rungs, a rib pitch
+and a pipe length in diameters each, so the number of test
+sections goes from 1 to 120, and reports every traced stage
+(see Tracer in the builders) per rung, its marginal cost per
+section between the last two rungs and how it grows there,
+1 being linear:
+
+    python tools/bench.py --exe "C:\\...\\SpaceClaim.exe"
+
+times the stages in SpaceClaim batch jobs, one at a time so
+they do not compete for the machine. Without --exe
+
+    python2.7 tools/bench.py
+
+the builders run against the stand-in of tools/standin.py
+and the stages are counted in operations instead of seconds,
+or with --wall timed, which measures the Python of the
+builders alone. Plate merges and splits by faces, which the
+stand-in cannot, it is skipped there, and a skipped builder
+fails the bench unless --allow-skip is given.
+
+With --replay every build of a parameterised builder keeps a
+journal (see Journal in the builders) and is replayed from it,
+the replay is reported as a stage of its own next to the
+total of the build.
+
+2F, 3F and plate have no test sections, they are built once
+for reference and only their total is known.
+------------------------------------------------------- '''
+from __future__ import print_function
+
+import argparse
+import csv
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+
+import standin
+import sweep
+
+BUILDERS = ['2F', '2R', '2T', '2V', '3F', '3R', '3T', 'plate']
+SCALED = ['2R', '2T', '2V', '3R', '3T']
+# builders only SpaceClaim can build
+SPACECLAIM_ONLY = ['plate']
+
+# (pitch, mm; length, diameters)
+RUNGS = [(15., 22.), (10., 26.), (5., 32.), (2.5, 50.)]
+HEIGHT = .3
+
+# pipe diameter in mm and length of both stabilizers in
+# diameters, as the builders have them
+DIAMETER = 10.
+STABILIZERS = 20.
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, 'script')
+
+
+def sections(pitch, length):
+    ''' test sections of a rung '''
+    return int(round((length - STABILIZERS) * DIAMETER / pitch))
+
+
+def stages(path):
+    ''' operation -> (calls, seconds) of the csv a Tracer
+    wrote for a build, empty if there is none '''
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return dict((x['operation'],
+                     (int(x['calls']), float(x['seconds'])))
+                    for x in csv.DictReader(f))
+
+
+def run(job, folder, exe=None, wall=False):
+    ''' cost of the whole batch job or run of the stand-in '''
+    if exe:
+        result = sweep.run(exe, job, folder)
+        if result['status'] != 0:
+            raise RuntimeError('{} failed, see {}'.format(
+                job['name'], result['log']))
+        return result['seconds']
+    params = dict((x, str(job[x])) for x in sweep.PARAMS if x in job)
+    session = standin.run(job['script'], params, not wall)
+    return session.seconds if wall else session.total
+
+
+def build(kind, rung, folder, exe=None, validate=True, wall=False,
+          replay=False):
+    ''' one build of a rung, stage -> (calls, cost), total is
+    the whole batch job or run of the stand-in and replay that
+    of replaying its journal '''
+    pitch, length = rung
+    name = '{}-{:03d}'.format(kind, sections(pitch, length))
+    job = {'name': name,
+           'script': os.path.abspath(os.path.join(SCRIPTS, kind + '.py')),
+           'height': HEIGHT,
+           'pitch': pitch,
+           'length': length,
+           'output': os.path.join(folder, name),
+           'trace': folder,
+           'validate': validate}
+    replay = replay and kind in SCALED
+    if replay:
+        job['record'] = folder
+    for ext in ['.scdoc', '.md5', '.csv', '.journal.json']:
+        if os.path.exists(job['output'] + ext):
+            os.remove(job['output'] + ext)
+    total = run(job, folder, exe, wall)
+    result = stages(os.path.join(folder, name + '.csv'))
+    result['total'] = (1, total)
+    if replay:
+        again = {'name': name + '-replay',
+                 'script': job['script'],
+                 'replay': job['output'] + '.journal.json',
+                 'output': job['output'] + '-replay'}
+        result['replay'] = (1, run(again, folder, exe, wall))
+    return result
+
+
+def bench(kinds, rungs, folder, exe=None, validate=True, wall=False,
+          replay=False):
+    ''' kind -> [(sections, stages) per rung], the error the
+    builder failed with, or None if it was skipped '''
+    results = {}
+    for kind in kinds:
+        if kind in SPACECLAIM_ONLY and not exe:
+            results[kind] = None
+            continue
+        ladder = rungs if kind in SCALED else rungs[:1]
+        try:
+            results[kind] = [(sections(*x) if kind in SCALED else 1,
+                              build(kind, x, folder, exe, validate,
+                                    wall, replay))
+                             for x in ladder]
+        except Exception:
+            results[kind] = traceback.format_exc().strip().split('\n')[-1]
+    return results
+
+
+def growth(counts, values):
+    ''' exponent of the cost in the number of sections between
+    the last two rungs, and the marginal cost per section '''
+    (n1, n2), (v1, v2) = counts[-2:], values[-2:]
+    if n2 == n1:
+        return None, None
+    marginal = float(v2 - v1) / (n2 - n1)
+    if v1 <= 0 or v2 <= 0:
+        return None, marginal
+    return math.log(float(v2) / v1) / math.log(float(n2) / n1), marginal
+
+
+def report(kind, result, unit):
+    if result is None:
+        print('{}: skipped, the stand-in cannot build it\n'.format(kind))
+        return
+    if not isinstance(result, list):
+        print('{}: {}\n'.format(kind, result))
+        return
+    counts = [n for n, x in result]
+    names = sorted(set(x for n, y in result for x in y),
+                   key=lambda x: (x not in ('total', 'replay'),
+                                  x != 'total', -result[-1][1].get(
+                       x, (0, 0))[1], x))
+    print('{:<22}'.format('{} ({})'.format(kind, unit)) +
+          ''.join('{:>10}'.format(n) for n in counts) +
+          '{:>10}{:>8}'.format('marginal', 'growth'))
+    for name in names:
+        values = [x.get(name, (0, 0.))[1] for n, x in result]
+        row = '{:<22}'.format(name) + \
+              ''.join('{:>10.6g}'.format(x) for x in values)
+        if len(counts) > 1:
+            exponent, marginal = growth(counts, values)
+            row += '{:>10}'.format('-' if marginal is None
+                                   else '{:.4g}'.format(marginal))
+            row += '{:>8}'.format('-' if exponent is None
+                                  else '{:.2f}'.format(exponent))
+            if exponent and exponent > 1.2:
+                row += '  super-linear'
+        print(row)
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('builders', nargs='*', default=BUILDERS,
+                        help='builders to run, all by default')
+    parser.add_argument('--exe', default=os.environ.get('SPACECLAIM'),
+                        help='SpaceClaim executable (or $SPACECLAIM), '
+                             'the stand-in without it')
+    parser.add_argument('--rungs', nargs='+', metavar='PITCH:LENGTH',
+                        help='rib pitch in mm and pipe length in '
+                             'diameters, e.g. 15:22 2.5:50')
+    parser.add_argument('--validate', dest='validate',
+                        action='store_true', default=None,
+                        help='check the builds against their inventory, '
+                             'by default on the stand-in only, the one '
+                             'it is calibrated on')
+    parser.add_argument('--no-validate', dest='validate',
+                        action='store_false',
+                        help='skip the inventory checks of the builds')
+    parser.add_argument('--wall', action='store_true',
+                        help='time the stand-in runs instead of '
+                             'counting their operations')
+    parser.add_argument('--replay', action='store_true',
+                        help='replay every build from its journal '
+                             'and report the replay too')
+    parser.add_argument('--output', help='folder for the builds and '
+                                         'their csv, a temporary one '
+                                         'by default')
+    parser.add_argument('--summary', help='write the results as json')
+    parser.add_argument('--allow-skip', action='store_true',
+                        help='exit with 0 even if a builder the '
+                             'stand-in cannot build is skipped')
+    args = parser.parse_args(argv)
+
+    rungs = RUNGS
+    if args.rungs:
+        rungs = [tuple(float(y) for y in x.split(':')) for x in args.rungs]
+    folder = os.path.abspath(args.output or tempfile.mkdtemp())
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    try:
+        validate = not args.exe if args.validate is None else args.validate
+        results = bench(args.builders, rungs, folder, args.exe,
+                        validate, args.wall, args.replay)
+    finally:
+        if not args.output:
+            shutil.rmtree(folder)
+
+    unit = 's' if args.exe or args.wall else 'ops'
+    for kind in args.builders:
+        report(kind, results[kind], unit)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump({'unit': unit, 'results': results}, f, indent=2)
+    failed = [x for x in results
+              if results[x] is not None and not isinstance(results[x], list)]
+    skipped = [x for x in args.builders if results[x] is None]
+    if skipped:
+        print('warning: {} skipped, {}'.format(
+            ', '.join(skipped), 'allowed by --allow-skip' if args.allow_skip
+            else 'pass --exe to build them or --allow-skip'),
+            file=sys.stderr)
+    return 1 if failed or skipped and not args.allow_skip else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1561 @@
+''' -------------------------------------------------------
+SpaceClaim stand-in
+
+The builders are IronPython 2 scripts, SpaceClaim runs them
+with its API injected as globals. This runs a script with
+python2.7 against a stand-in of the part of the API the
+builders use, so that they and the tools driving them can be
+exercised on Linux without a licence:
+
+    python2.7 tools/standin.py script/3T.py height=.3 pitch=10
+
+Every call reaching the document or the modeler is counted
+by name, value types such as Point.Create are not. The
+running total is handed to the script as the clock
+parameter, so a Tracer (see the builders) given it reports
+its stages in operations instead of seconds; with --wall it
+keeps time.time and times the Python of the builders.
+
+The modeler is analytic and knows the few shapes the
+builders make: planar faces bounded by lines and arcs, found
+from the curves of a sketch as PlanarBody does, prisms
+extruded from them, polygons revolved about an axis, prisms
+split by planes along or across them and revolutions by
+planes through their axis. Areas, spans,
+mid points, normals, volumes and bounding boxes are exact,
+so a build counts its inventory as it does in SpaceClaim.
+Bodies are placed by translations only, copies and
+instances share the shape of their original and nothing is
+saved. Anything else, such as merging bodies or splitting
+by a face, raises NotImplementedError; plate needs both.
+------------------------------------------------------- '''
+from __future__ import print_function
+
+import collections
+import io
+import math
+import sys
+import time
+import types
+
+# coordinates closer than this, m, are the same point
+EPS = 1e-9
+TAU = 2 * math.pi
+
+session = None
+
+
+class Session(object):
+    ''' the document of one run and the operations counted
+    on it '''
+
+    def __init__(self):
+        self.root = Part('Design1')
+        self.clipboard = []
+        self.counts = collections.Counter()
+        self.total = 0
+        self.seconds = 0.
+
+    def count(self, name):
+        self.counts[name] += 1
+        self.total += 1
+
+    def clock(self):
+        return self.total
+
+
+def counted(name):
+    ''' a call into the document or the modeler '''
+    def wrap(function):
+        def call(*args, **kwargs):
+            if session:
+                session.count(name)
+            return function(*args, **kwargs)
+        return call
+    return wrap
+
+
+def counted_property(name, getter, setter=None):
+    return property(counted(name)(getter),
+                    setter and counted(name)(setter))
+
+
+def flatten(items):
+    ''' a single item or any collection of them '''
+    result = []
+    for item in items:
+        if isinstance(item, (list, tuple, Selection)):
+            result += flatten(item)
+        else:
+            result.append(item)
+    return result
+
+
+''' -------------------------------------------------------
+vectors, tuples of 3 floats
+------------------------------------------------------- '''
+ORIGIN = (0., 0., 0.)
+
+
+def add(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def scale(a, s):
+    return (a[0] * s, a[1] * s, a[2] * s)
+
+
+def dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1],
+            a[2] * b[0] - a[0] * b[2],
+            a[0] * b[1] - a[1] * b[0])
+
+
+def norm(a):
+    return math.sqrt(dot(a, a))
+
+
+def unit(a):
+    return scale(a, 1. / norm(a))
+
+
+def key(point):
+    ''' the same vertex however it was computed '''
+    return tuple(int(round(x / EPS)) for x in point)
+
+
+def bounds(points):
+    ''' lowest and highest corner of points '''
+    points = list(points)
+    return (tuple(min(x) for x in zip(*points)),
+            tuple(max(x) for x in zip(*points)))
+
+
+''' -------------------------------------------------------
+value types
+------------------------------------------------------- '''
+def MM(x):
+    return x / 1000.
+
+
+def DEG(x):
+    return math.radians(x)
+
+
+class Point(object):
+
+    def __init__(self, x, y, z):
+        self.X, self.Y, self.Z = x, y, z
+
+    @staticmethod
+    def Create(x, y, z):
+        return Point(x, y, z)
+
+    def __iter__(self):
+        return iter([self.X, self.Y, self.Z])
+
+
+Point.Origin = Point(0., 0., 0.)
+
+
+class Direction(Point):
+
+    @staticmethod
+    def Create(x, y, z):
+        ''' unit length, as SpaceClaim makes it '''
+        return Direction(*unit((x, y, z)))
+
+    def cross(self, other):
+        return Direction(*cross(tuple(self), tuple(other)))
+
+
+Direction.DirX = Direction(1., 0., 0.)
+Direction.DirY = Direction(0., 1., 0.)
+Direction.DirZ = Direction(0., 0., 1.)
+
+
+class Vector(Point):
+
+    @staticmethod
+    def Create(x, y, z):
+        return Vector(x, y, z)
+
+
+class Frame(object):
+
+    def __init__(self, origin, dirx, diry):
+        self.Origin, self.DirX, self.DirY = origin, dirx, diry
+        self.DirZ = dirx.cross(diry)
+
+    @staticmethod
+    def Create(origin, dirx, diry):
+        return Frame(origin, dirx, diry)
+
+
+class Plane(object):
+
+    def __init__(self, frame):
+        self.Frame = frame
+
+    @staticmethod
+    def Create(frame):
+        return Plane(frame)
+
+
+Plane.PlaneXY = Plane(Frame(Point.Origin, Direction.DirX, Direction.DirY))
+Plane.PlaneYZ = Plane(Frame(Point.Origin, Direction.DirY, Direction.DirZ))
+Plane.PlaneZX = Plane(Frame(Point.Origin, Direction.DirZ, Direction.DirX))
+
+
+class Line(object):
+
+    def __init__(self, origin, direction):
+        self.Origin, self.Direction = origin, direction
+
+    @staticmethod
+    def Create(origin, direction):
+        return Line(origin, direction)
+
+
+class Circle(object):
+
+    def __init__(self, frame, radius):
+        self.Frame, self.Radius = frame, radius
+
+    @staticmethod
+    def Create(frame, radius):
+        return Circle(frame, radius)
+
+    def at(self, angle):
+        frame, r = self.Frame, self.Radius
+        c, s = r * math.cos(angle), r * math.sin(angle)
+        return Point(frame.Origin.X + c * frame.DirX.X + s * frame.DirY.X,
+                     frame.Origin.Y + c * frame.DirX.Y + s * frame.DirY.Y,
+                     frame.Origin.Z + c * frame.DirX.Z + s * frame.DirY.Z)
+
+
+class Interval(object):
+
+    def __init__(self, start, end):
+        self.Start, self.End = start, end
+        self.Span = end - start
+
+    @staticmethod
+    def Create(start, end):
+        return Interval(start, end)
+
+
+class CurveSegment(object):
+    ''' a line between two points or an arc of a circle over
+    an interval of angles '''
+
+    def __init__(self, start, end, geometry=None, bounds=None):
+        self.StartPoint, self.EndPoint = start, end
+        self.Geometry, self.Bounds = geometry, bounds
+
+    @staticmethod
+    def Create(a, b):
+        if isinstance(a, Point):
+            return CurveSegment(a, b)
+        return CurveSegment(a.at(b.Start), a.at(b.End), a, b)
+
+
+class ITrimmedCurve(object):
+    pass
+
+
+class IDocObject(object):
+    pass
+
+
+class Generic(type):
+    ''' List[T] is List whatever T is '''
+
+    def __getitem__(cls, item):
+        return cls
+
+
+List = Generic('List', (list,), {'Add': list.append,
+                                 'Count': property(len)})
+
+
+class Options(object):
+
+    @classmethod
+    def Create(cls):
+        return cls()
+
+
+class MoveOptions(Options):
+    pass
+
+
+class ExtrudeFaceOptions(Options):
+    pass
+
+
+class RevolveFaceOptions(Options):
+    pass
+
+
+class SweepCommandOptions(Options):
+    pass
+
+
+class ShareTopologyOptions(Options):
+    pass
+
+
+class ExportOptions(Options):
+    pass
+
+
+class LinearPatternData(Options):
+    pass
+
+
+class ExtrudeType(object):
+    Add, ForceIndependent = 'Add', 'ForceIndependent'
+
+
+class PatternDimensionType(object):
+    One, Two = 'One', 'Two'
+
+
+class Matrix(object):
+    ''' a translation, the builders place nothing otherwise '''
+
+    def __init__(self, offset=ORIGIN):
+        self.offset = offset
+
+    @staticmethod
+    def CreateTranslation(vector):
+        return Matrix(tuple(vector))
+
+
+Matrix.Identity = Matrix()
+
+
+class Box(object):
+
+    def __init__(self, low, high):
+        self.MinCorner = Point(*low)
+        self.MaxCorner = Point(*high)
+        self.Center = Point(*scale(add(low, high), .5))
+
+
+class Result(object):
+
+    def __init__(self, created):
+        self.CreatedObjects = created
+        self.CreatedBodies = created
+        self.CreatedBody = created[0] if created else None
+
+
+''' -------------------------------------------------------
+planar curves, in the coordinates of the plane they lie on
+------------------------------------------------------- '''
+class Flat(object):
+    ''' a plane, origin and unit axes u and v, n is their
+    normal '''
+
+    def __init__(self, origin, u, v):
+        self.o, self.u, self.v = origin, u, v
+        self.n = cross(u, v)
+
+    @staticmethod
+    def of(frame):
+        return Flat(tuple(frame.Origin), tuple(frame.DirX),
+                    tuple(frame.DirY))
+
+    def point(self, p):
+        return add(self.o, self.vector(p))
+
+    def vector(self, p):
+        return add(scale(self.u, p[0]), scale(self.v, p[1]))
+
+    def local(self, point):
+        d = sub(point, self.o)
+        return (dot(d, self.u), dot(d, self.v))
+
+    def moved(self, offset):
+        return Flat(add(self.o, offset), self.u, self.v)
+
+
+class Segment(object):
+    ''' a line from p to q '''
+
+    closed = False
+    index = None
+
+    def __init__(self, p, q):
+        self.p, self.q = p, q
+
+    def start(self):
+        return self.p
+
+    def end(self):
+        return self.q
+
+    def reverse(self):
+        result = Segment(self.q, self.p)
+        result.index = self.index
+        return result
+
+    def span(self):
+        return math.hypot(self.q[0] - self.p[0], self.q[1] - self.p[1])
+
+    def mid(self):
+        return ((self.p[0] + self.q[0]) / 2, (self.p[1] + self.q[1]) / 2)
+
+    def heading(self):
+        ''' direction it leaves its start in '''
+        return (self.q[0] - self.p[0], self.q[1] - self.p[1])
+
+    def area(self):
+        ''' its part of the area a loop encloses '''
+        return (self.p[0] * self.q[1] - self.p[1] * self.q[0]) / 2
+
+    def extent(self):
+        return [self.p, self.q]
+
+    def extent3(self, flat):
+        return [flat.point(self.p), flat.point(self.q)]
+
+    def outline(self):
+        return [self.p]
+
+    def split(self, f0, m):
+        ''' pieces either side of the line f0 + m.p = 0 '''
+        fp = f0 + m[0] * self.p[0] + m[1] * self.p[1]
+        fq = f0 + m[0] * self.q[0] + m[1] * self.q[1]
+        if abs(fp) <= EPS or abs(fq) <= EPS or (fp > 0) == (fq > 0):
+            return [self]
+        t = fp / (fp - fq)
+        x = (self.p[0] + t * (self.q[0] - self.p[0]),
+             self.p[1] + t * (self.q[1] - self.p[1]))
+        return [Segment(self.p, x), Segment(x, self.q)]
+
+
+class Arc(object):
+    ''' the arc of the circle about c of radius r from angle a
+    through sweep, clockwise if negative '''
+
+    index = None
+
+    def __init__(self, c, r, a, sweep):
+        self.c, self.r, self.a, self.sweep = c, r, a, sweep
+        self.closed = abs(abs(sweep) - TAU) <= 1e-12
+
+    def at(self, angle):
+        return (self.c[0] + self.r * math.cos(angle),
+                self.c[1] + self.r * math.sin(angle))
+
+    def start(self):
+        return self.at(self.a)
+
+    def end(self):
+        return self.at(self.a + self.sweep)
+
+    def reverse(self):
+        result = Arc(self.c, self.r, self.a + self.sweep, -self.sweep)
+        result.index = self.index
+        return result
+
+    def span(self):
+        ''' in radians, as SpaceClaim has the interval of an arc '''
+        return abs(self.sweep)
+
+    def mid(self):
+        return self.at(self.a + self.sweep / 2)
+
+    def heading(self):
+        sign = 1 if self.sweep > 0 else -1
+        return (-sign * math.sin(self.a), sign * math.cos(self.a))
+
+    def area(self):
+        a, b = self.a, self.a + self.sweep
+        return (self.r * (self.c[0] * (math.sin(b) - math.sin(a)) -
+                          self.c[1] * (math.cos(b) - math.cos(a))) +
+                self.r ** 2 * self.sweep) / 2
+
+    def along(self, angle):
+        ''' how far from its start the arc reaches angle, in
+        radians '''
+        sign = 1 if self.sweep > 0 else -1
+        return ((angle - self.a) * sign) % TAU
+
+    def extremes(self, u, v):
+        ''' angles where c + r (cos, sin) in axes u, v is
+        farthest along some coordinate '''
+        angles = []
+        for k in range(len(u)):
+            if u[k] or v[k]:
+                phi = math.atan2(v[k], u[k])
+                angles += [phi, phi + math.pi]
+        return [self.a + self.sweep * (self.along(x) / abs(self.sweep))
+                for x in angles if self.along(x) <= abs(self.sweep)]
+
+    def extent(self):
+        angles = self.extremes((1., 0.), (0., 1.))
+        return [self.start(), self.end()] + [self.at(x) for x in angles]
+
+    def extent3(self, flat):
+        angles = self.extremes(flat.u, flat.v)
+        return [flat.point(self.at(x)) for x in
+                [self.a, self.a + self.sweep] + angles]
+
+    def outline(self):
+        n = max(2, int(abs(self.sweep) / TAU * 64) + 1)
+        return [self.at(self.a + self.sweep * i / n) for i in range(n)]
+
+    def split(self, f0, m):
+        fc = f0 + m[0] * self.c[0] + m[1] * self.c[1]
+        reach = self.r * math.hypot(m[0], m[1])
+        if abs(fc) >= reach - EPS:
+            return [self]
+        phi = math.atan2(m[1], m[0])
+        delta = math.acos(-fc / reach)
+        ts = sorted(self.along(x) for x in [phi + delta, phi - delta])
+        sign = 1 if self.sweep > 0 else -1
+        if self.closed:
+            ts = [0. if x > TAU - 1e-9 else x for x in ts]
+            ends = list(zip(ts, ts[1:] + [ts[0] + TAU]))
+        else:
+            ts = [x for x in ts if 1e-9 < x < abs(self.sweep) - 1e-9]
+            ends = list(zip([0.] + ts, ts + [abs(self.sweep)]))
+        return [Arc(self.c, self.r, self.a + sign * x, sign * (y - x))
+                for x, y in ends]
+
+
+def planar(flat, segment):
+    ''' a CurveSegment in the coordinates of flat '''
+    if segment.Geometry is None:
+        return Segment(flat.local(tuple(segment.StartPoint)),
+                       flat.local(tuple(segment.EndPoint)))
+    frame = segment.Geometry.Frame
+    u, v = tuple(frame.DirX), tuple(frame.DirY)
+    u2 = (dot(u, flat.u), dot(u, flat.v))
+    v2 = (dot(v, flat.u), dot(v, flat.v))
+    sign = 1 if u2[0] * v2[1] - u2[1] * v2[0] > 0 else -1
+    start, end = segment.Bounds.Start, segment.Bounds.End
+    return Arc(flat.local(tuple(frame.Origin)), segment.Geometry.Radius,
+               math.atan2(u2[1], u2[0]) + sign * start, sign * (end - start))
+
+
+''' -------------------------------------------------------
+loops and regions, a region is its outer loop and its
+holes with itself on the left of every curve
+------------------------------------------------------- '''
+def enclosed(loop):
+    ''' signed area, positive counterclockwise '''
+    return sum(x.area() for x in loop)
+
+
+def center(loop):
+    ''' of the bounding box '''
+    low, high = bounds(p for x in loop for p in x.extent())
+    return ((low[0] + high[0]) / 2, (low[1] + high[1]) / 2)
+
+
+def inside(point, loop):
+    ''' even-odd rule on the loop with its arcs as polygons '''
+    polygon = [p for x in loop for p in x.outline()]
+    x, y = point
+    result = False
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y1 > y) != (y2 > y) and \
+                x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            result = not result
+    return result
+
+
+def within(point, region):
+    return inside(point, region[0]) and \
+        not any(inside(point, x) for x in region[1:])
+
+
+def arrange(curves):
+    ''' the loops of a planar arrangement of curves, every
+    bounded face once counterclockwise and the outer border
+    of every connected part clockwise; a closed curve is a
+    loop of its own '''
+    loops, half = [], []
+    for curve in curves:
+        if curve.closed:
+            if curve.area() < 0:
+                curve = curve.reverse()
+            loops += [[curve], [curve.reverse()]]
+        else:
+            half += [curve, curve.reverse()]
+    leaving = collections.defaultdict(list)
+    for i, curve in enumerate(half):
+        dx, dy = curve.heading()
+        leaving[key(curve.start())].append((math.atan2(dy, dx), i))
+    place = {}
+    for k, items in leaving.items():
+        items.sort()
+        for j, (angle, i) in enumerate(items):
+            place[i] = (k, j)
+    seen = set()
+    for first in range(len(half)):
+        loop, i = [], first
+        while i not in seen:
+            seen.add(i)
+            loop.append(half[i])
+            ''' next clockwise from the way back '''
+            k, j = place[i ^ 1]
+            i = leaving[k][j - 1][1]
+        if loop:
+            loops.append(loop)
+    return loops
+
+
+def chain(curves):
+    ''' curves joined end to start into loops '''
+    after = collections.OrderedDict((key(x.start()), x) for x in curves)
+    loops = []
+    while after:
+        first, curve = after.popitem(last=False)
+        loop = [curve]
+        while key(curve.end()) != first:
+            curve = after.pop(key(curve.end()))
+            loop.append(curve)
+        loops.append(loop)
+    return loops
+
+
+def assemble(loops):
+    ''' regions of the loops, largest first, a clockwise loop
+    is a hole of the smallest counterclockwise loop around it
+    that is not joined to it and is left out without one '''
+    parent = list(range(len(loops)))
+
+    def root(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    vertices = {}
+    for i, loop in enumerate(loops):
+        for curve in loop:
+            j = vertices.setdefault(key(curve.start()), i)
+            parent[root(j)] = root(i)
+    areas = [enclosed(x) for x in loops]
+    regions = dict((i, [loops[i]]) for i in range(len(loops))
+                   if areas[i] > 0)
+    for i, loop in enumerate(loops):
+        if areas[i] < 0:
+            probe = loop[0].mid()
+            around = [j for j in regions if root(j) != root(i) and
+                      inside(probe, loops[j])]
+            if around:
+                regions[min(around, key=lambda x: areas[x])].append(loop)
+    return sorted(regions.values(), key=lambda x: -area(x))
+
+
+def area(region):
+    return sum(enclosed(x) for x in region)
+
+
+def clip(region, f0, m):
+    ''' pieces of region either side of the line f0 + m.p = 0,
+    None if the line misses it '''
+    value = lambda p: f0 + m[0] * p[0] + m[1] * p[1]
+    sides = {1: [], -1: []}
+    for loop in region:
+        for curve in loop:
+            for piece in curve.split(f0, m):
+                f = value(piece.mid())
+                if abs(f) <= EPS:
+                    raise NotImplementedError('a cut along the side '
+                                              'of a face')
+                sides[1 if f > 0 else -1].append(piece)
+    if not sides[1] or not sides[-1]:
+        return None
+    ''' the cut line runs with the positive side on its left '''
+    size = math.hypot(m[0], m[1])
+    t = (m[1] / size, -m[0] / size)
+    on = dict((key(p), p) for x in sides[1] + sides[-1]
+              for p in [x.start(), x.end()] if abs(value(p)) <= EPS)
+    points = sorted(on.values(), key=lambda p: p[0] * t[0] + p[1] * t[1])
+    cuts = [(a, b) for a, b in zip(points, points[1:])
+            if within(((a[0] + b[0]) / 2, (a[1] + b[1]) / 2), region)]
+    pieces = []
+    for side in [1, -1]:
+        curves = sides[side] + [Segment(a, b) if side > 0 else
+                                Segment(b, a) for a, b in cuts]
+        pieces += assemble(chain(curves))
+    return pieces
+
+
+''' -------------------------------------------------------
+solids, in the coordinates of their shape
+------------------------------------------------------- '''
+class Sheet(object):
+    ''' the faces a sketch bounds, faces sharing a curve share
+    its edge '''
+
+    def __init__(self, flat, curves):
+        self.flat, self.curves = flat, curves
+        for i, curve in enumerate(curves):
+            curve.index = i
+        self.regions = assemble(arrange(curves))
+
+    def topology(self, shape):
+        flat = self.flat
+        edges = [DesignEdge(shape, x.span(), flat.point(x.mid()),
+                      bounds(x.extent3(flat))) for x in self.curves]
+        faces = [DesignFace(shape, area(x), flat.point(center(x[0])), flat.n,
+                      [edges[y.index] for loop in x for y in loop],
+                      (flat, x))
+                 for x in self.regions]
+        return faces, edges, 0.
+
+    def split(self, origin, normal):
+        raise NotImplementedError('splitting a surface body')
+
+
+class Prism(object):
+    ''' a region swept along d '''
+
+    def __init__(self, flat, region, d):
+        self.flat, self.region, self.d = flat, region, d
+
+    def topology(self, shape):
+        flat, region, d = self.flat, self.region, self.d
+        size = norm(d)
+        rise = dot(d, flat.n)
+        sign = 1 if rise > 0 else -1
+        curves = [x for loop in region for x in loop]
+        bottom, top = [], []
+        for curve in curves:
+            points, mid = curve.extent3(flat), flat.point(curve.mid())
+            bottom.append(DesignEdge(shape, curve.span(), mid, bounds(points)))
+            top.append(DesignEdge(shape, curve.span(), add(mid, d),
+                            bounds(add(x, d) for x in points)))
+        lateral = collections.OrderedDict()
+        for curve in curves:
+            if not curve.closed:
+                point = flat.point(curve.start())
+                lateral[key(curve.start())] = DesignEdge(
+                    shape, size, add(point, scale(d, .5)),
+                    bounds([point, add(point, d)]))
+        base = area(region)
+        mid = flat.point(center(region[0]))
+        faces = [DesignFace(shape, base, mid, scale(flat.n, -sign), bottom),
+                 DesignFace(shape, base, add(mid, d), scale(flat.n, sign), top)]
+        for curve, low, high in zip(curves, bottom, top):
+            edges = [low, high]
+            if not curve.closed:
+                edges += [lateral[key(curve.start())],
+                          lateral[key(curve.end())]]
+            mid = add(flat.point(curve.mid()), scale(d, .5))
+            if isinstance(curve, Segment):
+                dx, dy = curve.heading()
+                side = cross(flat.vector((dx, dy)), d)
+                normal = unit(side)
+                if dot(normal, flat.vector((dy, -dx))) < 0:
+                    normal = scale(normal, -1)
+                faces.append(DesignFace(shape, norm(side), mid, normal, edges))
+            else:
+                if abs(abs(rise) - size) > EPS * size:
+                    raise NotImplementedError('an arc extruded at an '
+                                              'angle to its plane')
+                out = 1 if curve.sweep > 0 else -1
+                normal = flat.vector((out * math.cos(curve.a),
+                                      out * math.sin(curve.a)))
+                faces.append(DesignFace(shape, curve.r * curve.span() * size,
+                                  mid, normal, edges))
+        edges = bottom + top + list(lateral.values())
+        return faces, edges, abs(base * rise)
+
+    def split(self, origin, normal):
+        ''' pieces cut by the plane through origin, None if it
+        misses the prism '''
+        flat, d = self.flat, self.d
+        size = norm(d)
+        if abs(dot(d, normal)) <= EPS * size:
+            ''' along the prism, a cut of its region '''
+            m = (dot(flat.u, normal), dot(flat.v, normal))
+            pieces = clip(self.region, dot(sub(flat.o, origin), normal), m)
+            return pieces and [Prism(flat, x, d) for x in pieces]
+        if norm(cross(flat.n, normal)) <= EPS:
+            ''' across it, parallel to its ends '''
+            s = dot(sub(origin, flat.o), normal) / dot(d, normal)
+            if not EPS < s * size < size - EPS:
+                return None
+            return [Prism(flat, self.region, scale(d, s)),
+                    Prism(flat.moved(scale(d, s)), self.region,
+                          scale(d, 1 - s))]
+        raise NotImplementedError('a cut at an angle to a prism')
+
+
+class Revolution(object):
+    ''' a polygon turned by angle about the axis through
+    origin along the unit direction axis, from start radians
+    past where it was drawn '''
+
+    def __init__(self, flat, region, origin, axis, angle, start=0.):
+        self.flat, self.region = flat, region
+        self.origin, self.axis, self.angle = origin, axis, angle
+        self.start = start
+
+    def topology(self, shape):
+        flat, origin, axis, angle = \
+            self.flat, self.origin, self.axis, self.angle
+        profile = []
+        radial = None
+        for loop in self.region:
+            if any(not isinstance(x, Segment) for x in loop):
+                raise NotImplementedError('an arc revolved')
+            rz = []
+            for curve in loop:
+                point = sub(flat.point(curve.start()), origin)
+                z = dot(point, axis)
+                r = sub(point, scale(axis, z))
+                if norm(r) > EPS:
+                    radial = radial or unit(r)
+                    if abs(dot(r, radial) - norm(r)) > EPS:
+                        raise NotImplementedError('a profile across '
+                                                  'the axis')
+                rz.append((norm(r), z))
+            profile.append(rz)
+        tangent = cross(axis, radial)
+        radial, tangent = self.turn(radial, tangent, self.start)
+        sign = 1 if angle > 0 else -1
+        full = abs(angle) >= TAU - 1e-12
+
+        def at(r, z, phi):
+            return add(add(origin, scale(axis, z)),
+                       add(scale(radial, r * math.cos(phi)),
+                           scale(tangent, r * math.sin(phi))))
+
+        def turned(phi):
+            return add(scale(radial, -math.sin(phi)),
+                       scale(tangent, math.cos(phi)))
+
+        moment = enclosed_rz = 0.
+        for rz in profile:
+            for (r1, z1), (r2, z2) in zip(rz, rz[1:] + rz[:1]):
+                moment += (r1 + r2) * (r1 * z2 - r2 * z1)
+                enclosed_rz += (r1 * z2 - r2 * z1) / 2
+        orientation = 1 if enclosed_rz > 0 else -1
+
+        circles = {}
+        for rz in profile:
+            for r, z in rz:
+                if r > EPS and (r, z) not in circles:
+                    arc = Arc((0., 0.), r, 0., angle)
+                    plane = Flat(add(origin, scale(axis, z)), radial, tangent)
+                    circles[(r, z)] = DesignEdge(shape, abs(angle),
+                                           plane.point(arc.mid()),
+                                           bounds(arc.extent3(plane)))
+        ends = [[], []]
+        faces = []
+        for rz in profile:
+            for (r1, z1), (r2, z2) in zip(rz, rz[1:] + rz[:1]):
+                size = math.hypot(r2 - r1, z2 - z1)
+                rm, zm = (r1 + r2) / 2, (z1 + z2) / 2
+                edges = [circles[x] for x in [(r1, z1), (r2, z2)]
+                         if x in circles]
+                if not full:
+                    for end, phi in zip(ends, [0., angle]):
+                        end.append(DesignEdge(shape, size, at(rm, zm, phi),
+                                        bounds([at(r1, z1, phi),
+                                                at(r2, z2, phi)])))
+                    edges = [ends[0][-1], ends[1][-1]] + edges
+                nr = orientation * (z2 - z1) / size
+                nz = orientation * -(r2 - r1) / size
+                faces.append(DesignFace(shape, abs(angle) * rm * size,
+                                  at(rm, zm, angle / 2),
+                                  add(scale(radial, nr), scale(axis, nz)),
+                                  edges))
+        if not full:
+            low, high = bounds(x for rz in profile for x in rz)
+            rc, zc = (low[0] + high[0]) / 2, (low[1] + high[1]) / 2
+            section = abs(enclosed_rz)
+            faces = [DesignFace(shape, section, at(rc, zc, 0.),
+                          scale(tangent, -sign), ends[0]),
+                     DesignFace(shape, section, at(rc, zc, angle),
+                          scale(turned(angle), sign), ends[1])] + faces
+        edges = ends[0] + ends[1] + list(circles.values())
+        return faces, edges, abs(angle * moment) / 6
+
+    def turn(self, radial, tangent, phi):
+        ''' radial and tangent turned by phi about the axis '''
+        c, s = math.cos(phi), math.sin(phi)
+        return add(scale(radial, c), scale(tangent, s)), \
+               add(scale(radial, -s), scale(tangent, c))
+
+    def split(self, origin, normal):
+        ''' pieces either side of a plane through the axis,
+        each a revolution of its own part of angle '''
+        if abs(dot(normal, self.axis)) > EPS or \
+           abs(dot(sub(self.origin, origin), normal)) > EPS:
+            raise NotImplementedError('splitting a revolved body '
+                                      'off its axis')
+        for curve in self.region[0]:
+            point = sub(self.flat.point(curve.start()), self.origin)
+            point = sub(point, scale(self.axis, dot(point, self.axis)))
+            if norm(point) > EPS:
+                break
+        radial = unit(point)
+        radial, tangent = self.turn(radial, cross(self.axis, radial),
+                                    self.start)
+        across = cross(normal, self.axis)
+        psi = math.atan2(dot(across, tangent), dot(across, radial))
+        sign = 1 if self.angle > 0 else -1
+        sweep = abs(self.angle)
+        ts = sorted((sign * x) % TAU for x in [psi, psi + math.pi])
+        if sweep >= TAU - 1e-12:
+            ends = list(zip(ts, ts[1:] + [ts[0] + TAU]))
+        else:
+            ts = [x for x in ts if 1e-9 < x < sweep - 1e-9]
+            if not ts:
+                return []
+            ends = list(zip([0.] + ts, ts + [sweep]))
+        return [Revolution(self.flat, self.region, self.origin, self.axis,
+                           sign * (y - x), self.start + sign * x)
+                for x, y in ends]
+
+
+''' -------------------------------------------------------
+topology
+------------------------------------------------------- '''
+class DesignEdge(object):
+
+    def __init__(self, shape, span, mid, box):
+        self.shape, self.span, self.mid, self.box = shape, span, mid, box
+
+    @property
+    def Parent(self):
+        return self.shape.body
+
+    @counted('DesignEdge.GetInterval')
+    def GetInterval(self):
+        return Interval(0., self.span)
+
+    @counted('DesignEdge.EvalMid')
+    def EvalMid(self):
+        return Evaluation(Point(*add(self.mid, self.shape.offset)))
+
+
+class Attributed(object):
+    ''' text attributes, copies of the object keep them '''
+
+    attributes = None
+
+    @counted('SetTextAttribute')
+    def SetTextAttribute(self, name, value):
+        self.attributes = dict(self.attributes or {}, **{name: value})
+
+    @counted('TryGetTextAttribute')
+    def TryGetTextAttribute(self, name):
+        ''' (found, value), the out parameter is returned as
+        IronPython does '''
+        value = (self.attributes or {}).get(name)
+        return value is not None, value
+
+
+class DesignFace(Attributed):
+    ''' region is the (flat, region) of a face of a sketch,
+    which can be extruded or revolved '''
+
+    def __init__(self, shape, area, mid, normal, edges, region=None):
+        self.shape, self.area, self.mid = shape, area, mid
+        self.normal, self.edges, self.region = normal, edges, region
+
+    @property
+    def Parent(self):
+        return self.shape.body
+
+    Edges = counted_property('DesignFace.Edges', lambda x: list(x.edges))
+    Area = counted_property('DesignFace.Area', lambda x: x.area)
+
+    @counted('DesignFace.MidPoint')
+    def MidPoint(self):
+        return Evaluation(Point(*add(self.mid, self.shape.offset)))
+
+    @counted('DesignFace.GetFaceNormal')
+    def GetFaceNormal(self, u, v):
+        return Direction(*self.normal)
+
+    @counted('DesignFace.Evaluate')
+    def Evaluate(self, u, v):
+        ''' the mid point and normal, as 18.2 evaluates a face '''
+        return Evaluation(Point(*add(self.mid, self.shape.offset)),
+                          Direction(*self.normal))
+
+
+class Evaluation(object):
+
+    def __init__(self, point, normal=None):
+        self.Point, self.Normal = point, normal
+
+
+class Shape(object):
+    ''' a solid of the modeler translated by offset, its faces
+    and edges are made the first time they are asked for '''
+
+    Geometry = None
+    body = None
+
+    def __init__(self, solid, offset=ORIGIN, attributes=None):
+        self.solid, self.offset = solid, offset
+        self.attributes = attributes
+        self.made = None
+
+    def topology(self):
+        ''' faces get the attributes the faces of the shape it
+        was cloned from had, by position '''
+        if not self.made:
+            self.made = self.solid.topology(self)
+            for face, x in zip(self.made[0], self.attributes or []):
+                face.attributes = x
+        return self.made
+
+    faces = property(lambda x: x.topology()[0])
+    edges = property(lambda x: x.topology()[1])
+    Volume = property(counted('Body.Volume')(lambda x: x.topology()[2]))
+
+    @counted('Body.Copy')
+    def Copy(self):
+        return self.clone()
+
+    @counted('Body.GetBoundingBox')
+    def GetBoundingBox(self, matrix):
+        low, high = bounds(y for x in self.edges for y in x.box)
+        return Box(add(low, self.offset), add(high, self.offset))
+
+    def clone(self):
+        attributes = self.attributes
+        if self.made:
+            attributes = [x.attributes for x in self.faces]
+        return Shape(self.solid, self.offset, attributes)
+
+    def move(self, offset):
+        self.offset = add(self.offset, offset)
+
+    def split(self, origin, normal):
+        pieces = self.solid.split(sub(origin, self.offset), normal)
+        if not pieces:
+            return [self]
+        return [Shape(x, self.offset) for x in pieces]
+
+
+class Outline(object):
+    ''' the shape of a datum, its geometry only '''
+
+    def __init__(self, geometry):
+        self.Geometry = geometry
+
+
+''' -------------------------------------------------------
+document
+------------------------------------------------------- '''
+class Named(object):
+
+    name = None
+    parent = None
+
+    @counted('GetName')
+    def GetName(self):
+        return self.name
+
+    @counted('SetName')
+    def SetName(self, name):
+        self.name = name
+
+    Name = property(GetName, SetName)
+
+    @property
+    def Parent(self):
+        return self.parent
+
+    def collection(self):
+        return []
+
+    def detach(self):
+        if self.parent and self in self.collection():
+            self.collection().remove(self)
+        self.parent = None
+
+
+class Part(Named):
+
+    def __init__(self, name):
+        self.name = name
+        self.Bodies = []
+        self.Components = []
+        self.DatumPlanes = []
+        self.DatumLines = []
+        self.DatumPoints = []
+        self.Curves = []
+        self.Groups = []
+
+    def clone(self):
+        part = Part(self.name)
+        for body in self.Bodies:
+            body.clone(part)
+        return part
+
+    def translate(self, offset):
+        for body in self.Bodies:
+            body.translate(offset)
+
+
+class DesignBody(Named, Attributed):
+
+    def __init__(self, part, shape, name=None):
+        self.shape = shape
+        shape.body = self
+        self.name = name or 'Solid'
+        self.attach(part)
+
+    def attach(self, part):
+        self.parent = part
+        part.Bodies.append(self)
+
+    def collection(self):
+        return self.parent.Bodies
+
+    Faces = counted_property('DesignBody.Faces', lambda x: list(x.shape.faces))
+    Edges = counted_property('DesignBody.Edges', lambda x: list(x.shape.edges))
+    Shape = counted_property('DesignBody.Shape', lambda x: x.shape)
+
+    @staticmethod
+    @counted('DesignBody.Create')
+    def Create(part, name, shape):
+        return DesignBody(part, shape, name)
+
+    def clone(self, part):
+        body = DesignBody(part, self.shape.clone(), self.name)
+        body.attributes = self.attributes
+        return body
+
+    def translate(self, offset):
+        self.shape.move(offset)
+
+    def replace(self, shapes):
+        ''' the body by pieces of it, where it was in its part '''
+        bodies = self.parent.Bodies
+        i = bodies.index(self)
+        pieces = [DesignBody(self.parent, x, self.name) for x in shapes]
+        for piece in pieces:
+            piece.attributes = self.attributes
+        bodies[i:i + 1] = pieces
+        del bodies[-len(pieces):]
+        self.parent = None
+
+
+class Component(Named):
+
+    def __init__(self, parent, template, offset=ORIGIN):
+        self.Template = template
+        self.offset = offset
+        self.name = template.name
+        template.parent = self
+        self.parent = parent
+        parent.Components.append(self)
+
+    def collection(self):
+        return self.parent.Components
+
+    @property
+    def Placement(self):
+        return Matrix(self.offset)
+
+    @staticmethod
+    @counted('Component.Create')
+    def Create(parent, template):
+        ''' instances are copies, as they are once share
+        topology has made them independent, placed where the
+        template is in its own coordinates '''
+        part = template.clone()
+        if isinstance(template.parent, Component):
+            part.translate(scale(template.parent.offset, -1))
+        return Component(parent, part)
+
+    @counted('Component.GetBodies')
+    def GetBodies(self):
+        return list(self.Template.Bodies)
+
+    @counted('Component.Transform')
+    def Transform(self, matrix):
+        self.translate(matrix.offset)
+
+    def translate(self, offset):
+        self.offset = add(self.offset, offset)
+        self.Template.translate(offset)
+
+    def clone(self, parent):
+        component = Component(parent, self.Template.clone(), self.offset)
+        component.name = self.name
+        return component
+
+
+class Datum(Named):
+
+    kind = None
+
+    def __init__(self, part, name, geometry):
+        self.name = name
+        self.Shape = Outline(geometry)
+        self.parent = part
+        self.collection().append(self)
+
+    def collection(self):
+        return getattr(self.parent, self.kind)
+
+
+class DatumPlane(Datum):
+
+    kind = 'DatumPlanes'
+
+    @staticmethod
+    @counted('DatumPlane.Create')
+    def Create(part, name, plane):
+        return DatumPlane(part, name, plane)
+
+
+class DatumLine(Datum):
+
+    kind = 'DatumLines'
+
+    @staticmethod
+    @counted('DatumLine.Create')
+    def Create(part, name, line):
+        return DatumLine(part, name, line)
+
+
+class DatumPlaneCreator(object):
+
+    @staticmethod
+    @counted('DatumPlaneCreator.Create')
+    def Create(point, normal, flag):
+        n = unit(tuple(normal))
+        u = unit(cross((0., 0., 1.) if abs(n[2]) < .9 else (1., 0., 0.), n))
+        frame = Frame(point, Direction(*u), Direction(*cross(n, u)))
+        return DatumPlane(session.root, 'Plane', Plane(frame))
+
+
+class Group(Named):
+
+    def __init__(self, part, name, items):
+        self.name, self.items = name, list(items)
+        self.parent = part
+        part.Groups.append(self)
+
+    @staticmethod
+    @counted('Group.Create')
+    def Create(part, name, items):
+        return Group(part, name, items)
+
+
+def GetRootPart():
+    return session.root
+
+
+''' -------------------------------------------------------
+commands
+------------------------------------------------------- '''
+class Selection(object):
+
+    def __init__(self, items):
+        self.Items = flatten(items)
+
+    def __iter__(self):
+        return iter(self.Items)
+
+    @staticmethod
+    def Create(*items):
+        return Selection(items)
+
+    @staticmethod
+    @counted('Selection.Clear')
+    def Clear():
+        pass
+
+
+def sweep(faces, solid):
+    ''' solids of the faces of sketches, solid makes one of a
+    (flat, region), the sketch body a face was on is pulled
+    into its solid and goes '''
+    created = []
+    for face in flatten([faces]):
+        if not face.region:
+            raise NotImplementedError('sweeping a face of a solid')
+        flat, region = face.region
+        if face.Parent:
+            face.Parent.detach()
+        created.append(DesignBody(session.root, Shape(
+            solid(flat.moved(face.shape.offset), region))))
+    return Result(created)
+
+
+class PlanarBody(object):
+
+    @staticmethod
+    @counted('PlanarBody.Create')
+    def Create(plane, curves):
+        flat = Flat.of(plane.Frame)
+        sheet = Sheet(flat, [planar(flat, x) for x in curves])
+        return Result([DesignBody(session.root, Shape(sheet), 'Surface')])
+
+
+class ExtrudeFaces(object):
+
+    @staticmethod
+    @counted('ExtrudeFaces.Execute')
+    def Execute(selection, direction, length, options):
+        d = scale(unit(tuple(direction)), length)
+        return sweep(selection, lambda flat, region:
+                     Prism(flat, region, d))
+
+
+class RevolveFaces(object):
+
+    @staticmethod
+    @counted('RevolveFaces.Execute')
+    def Execute(selection, axis, angle, options):
+        origin, direction = tuple(axis.Origin), unit(tuple(axis.Direction))
+        return sweep(selection, lambda flat, region:
+                     Revolution(flat, region, origin, direction, angle))
+
+
+class Move(object):
+
+    @staticmethod
+    @counted('Move.Translate')
+    def Translate(selection, direction, length, options):
+        offset = scale(unit(tuple(direction)), length)
+        for item in flatten([selection]):
+            item.translate(offset)
+
+
+class Copy(object):
+
+    @staticmethod
+    @counted('Copy.ToClipboard')
+    def ToClipboard(selection):
+        session.clipboard = list(selection)
+
+
+class Paste(object):
+
+    @staticmethod
+    @counted('Paste.FromClipboard')
+    def FromClipboard():
+        return Result([x.clone(session.root) for x in session.clipboard])
+
+
+class Pattern(object):
+
+    @staticmethod
+    @counted('Pattern.CreateLinear')
+    def CreateLinear(selection, data, info):
+        ''' along the datum line LinearDirection selects, as
+        a recorded pattern has it '''
+        axis = list(data.LinearDirection)
+        if len(axis) != 1 or not isinstance(axis[0], DatumLine):
+            raise NotImplementedError('a pattern along anything but '
+                                      'one datum line')
+        direction = axis[0].Shape.Geometry.Direction
+        step = scale(unit(tuple(direction)), data.PitchX)
+        for item in selection:
+            for i in range(1, data.CountX):
+                item.clone(item.parent).translate(scale(step, i))
+
+
+class ComponentHelper(object):
+
+    @staticmethod
+    @counted('ComponentHelper.MoveBodiesToComponent')
+    def MoveBodiesToComponent(selection):
+        bodies = list(selection)
+        part = Part('Component{}'.format(len(session.root.Components) + 1))
+        for body in bodies:
+            body.detach()
+            body.attach(part)
+        return Component(session.root, part)
+
+
+class SplitBody(object):
+
+    @staticmethod
+    @counted('SplitBody.ByCutter')
+    def ByCutter(bodies, cutters, extend=False):
+        SplitBody.cut(bodies, cutters)
+
+    @staticmethod
+    @counted('SplitBody.Execute')
+    def Execute(bodies, cutters):
+        ''' the split by planes as SpaceClaim 18.2 names it '''
+        SplitBody.cut(bodies, cutters)
+
+    @staticmethod
+    def cut(bodies, cutters):
+        ''' every body by every datum plane, the pieces keep
+        the name of the body '''
+        planes = []
+        for cutter in cutters:
+            if not isinstance(cutter, Datum):
+                raise NotImplementedError('splitting by a face')
+            frame = cutter.Shape.Geometry.Frame
+            planes.append((tuple(frame.Origin), unit(tuple(frame.DirZ))))
+        for body in list(bodies):
+            pieces = [body.shape]
+            for origin, normal in planes:
+                pieces = [y for x in pieces for y in x.split(origin, normal)]
+            if len(pieces) > 1:
+                body.replace(pieces)
+
+
+class Combine(object):
+
+    @staticmethod
+    @counted('Combine.Merge')
+    def Merge(selection):
+        raise NotImplementedError('merging bodies')
+
+
+class Delete(object):
+
+    @staticmethod
+    @counted('Delete.Execute')
+    def Execute(selection):
+        for item in selection:
+            item.detach()
+
+
+class ShareTopology(object):
+
+    @staticmethod
+    @counted('ShareTopology.FindAndFix')
+    def FindAndFix(options):
+        pass
+
+
+class DocumentSave(object):
+
+    @staticmethod
+    @counted('DocumentSave.Execute')
+    def Execute(path, options):
+        pass
+
+
+class ViewHelper(object):
+
+    @staticmethod
+    @counted('ViewHelper.ZoomToEntity')
+    def ZoomToEntity():
+        pass
+
+
+class Parameters(object):
+    ''' batch parameters, as strings like SpaceClaim has them '''
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+API = ['MM', 'DEG', 'Point', 'Direction', 'Vector', 'Frame', 'Plane', 'Line',
+       'Circle', 'Interval', 'CurveSegment', 'ITrimmedCurve', 'IDocObject',
+       'MoveOptions', 'ExtrudeFaceOptions', 'RevolveFaceOptions',
+       'SweepCommandOptions', 'ShareTopologyOptions', 'ExportOptions',
+       'LinearPatternData', 'ExtrudeType', 'PatternDimensionType', 'Matrix',
+       'DesignBody', 'DesignFace', 'DesignEdge', 'Component', 'DatumPlane', 'DatumLine',
+       'DatumPlaneCreator', 'Group', 'GetRootPart', 'Selection',
+       'PlanarBody', 'ExtrudeFaces', 'RevolveFaces', 'Move', 'Copy', 'Paste',
+       'Pattern', 'ComponentHelper', 'SplitBody', 'Combine', 'Delete',
+       'ShareTopology', 'DocumentSave', 'ViewHelper']
+
+
+class ExternalException(Exception):
+    ''' what .NET raises for a clipboard another process holds,
+    the stand-in never does '''
+
+
+def modules():
+    ''' System.Collections.Generic and
+    System.Runtime.InteropServices as the scripts import them '''
+    system = types.ModuleType('System')
+    system.Collections = types.ModuleType('System.Collections')
+    system.Collections.Generic = types.ModuleType(
+        'System.Collections.Generic')
+    system.Collections.Generic.List = List
+    system.Runtime = types.ModuleType('System.Runtime')
+    system.Runtime.InteropServices = types.ModuleType(
+        'System.Runtime.InteropServices')
+    system.Runtime.InteropServices.ExternalException = ExternalException
+    return {'System': system,
+            'System.Collections': system.Collections,
+            'System.Collections.Generic': system.Collections.Generic,
+            'System.Runtime': system.Runtime,
+            'System.Runtime.InteropServices':
+                system.Runtime.InteropServices}
+
+
+''' -------------------------------------------------------
+running a script
+------------------------------------------------------- '''
+def run(script, params=None, counting=True):
+    ''' script run once against a new document, params are
+    its batch parameters, returns the session
+
+    counting hands the script the count of operations as its
+    clock, otherwise it keeps time.time '''
+    global session
+    if sys.version_info[0] > 2:
+        raise RuntimeError('the builders are IronPython 2 scripts, '
+                           'run the stand-in with python2.7')
+    session = Session()
+    values = {'clock': session.clock} if counting else {}
+    values.update(params or {})
+    scope = dict((x, globals()[x]) for x in API)
+    scope.update({'__name__': '__main__', '__file__': script,
+                  'Parameters': Parameters(values)})
+    with io.open(script, encoding='utf-8') as f:
+        code = compile(f.read().encode('utf-8'), script, 'exec')
+    saved = dict((x, sys.modules.get(x)) for x in modules())
+    sys.modules.update(modules())
+    start = time.time()
+    try:
+        exec(code, scope)
+    finally:
+        session.seconds = time.time() - start
+        for name, module in saved.items():
+            if module:
+                sys.modules[name] = module
+            else:
+                del sys.modules[name]
+    return session
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    wall = '--wall' in argv
+    argv = [x for x in argv if x != '--wall']
+    if not argv or argv[0].startswith('-'):
+        print(__doc__)
+        return 2
+    params = dict(x.split('=', 1) for x in argv[1:])
+    result = run(argv[0], params, not wall)
+    for name in sorted(result.counts):
+        print('{:<44}{:>10}'.format(name, result.counts[name]))
+    print('{:<44}{:>10}'.format('total', result.total))
+    print('{:<44}{:>10.3f}'.format('seconds', result.seconds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
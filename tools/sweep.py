@@ -0,0 +1,215 @@
+''' -------------------------------------------------------
+parallel sweep driver
+
+Splits the heights x pitches grid of a builder, the one its
+heights and pitches dicts define unless --heights/--pitches
+are given, into jobs and
+runs every job as its own headless SpaceClaim batch process,
+with height, pitch and output injected as script parameters
+(see parameter() in the builders). Concurrency is bounded by
+--jobs so a sweep never asks for more licences than there are.
+
+    python tools/sweep.py script/3T.py --jobs 4 \\
+        --exe "C:\\Program Files\\ANSYS Inc\\v182\\scdm\\SpaceClaim.exe" \\
+        --output C:\\users\\frenc\\yandexdisk\\cfd\\geo
+
+With --trace every job times its CAD helpers (see Tracer in the
+builders) into a csv per variant, and the traces of all the jobs
+are merged into one trace.json timeline of the sweep. With
+--record every job keeps a journal of its calls into the
+document (see Journal in the builders) that replays the build
+without its Python.
+
+Any executable accepting the same arguments can stand in for
+SpaceClaim, which is how the driver is exercised on Linux, see
+test_sweep.py.
+------------------------------------------------------- '''
+from __future__ import print_function
+
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+EXE = os.environ.get('SPACECLAIM', 'SpaceClaim.exe')
+
+# keys of a job passed on as script parameters, see
+# parameter() in the builders, script for the fingerprint
+PARAMS = ['height', 'pitch', 'output', 'trace', 'length', 'validate',
+          'record', 'replay', 'scale', 'script']
+
+
+def label(kind, height, pitch):
+    ''' file name of a variant, same as heights/pitches in the
+    builders: 0.3 mm and 10 mm give 3T-30-100 '''
+    return '{}-{:02d}-{:03d}'.format(
+        kind, int(round(height * 100)), int(round(pitch * 10)))
+
+
+def tables(script):
+    ''' heights and pitches in mm of the heights and pitches
+    dicts of a builder, its keys being MM(x) '''
+    with io.open(script, encoding='utf-8') as f:
+        source = f.read()
+    grid = []
+    for name in ['heights', 'pitches']:
+        match = re.search(r'^{} = \{{(.*?)\}}'.format(name), source,
+                          re.M | re.S)
+        if not match:
+            raise ValueError('{} has no {} dict'.format(script, name))
+        grid.append(sorted(float(x) for x in
+                           re.findall(r'MM\(([\d.]+)\)', match.group(1))))
+    return grid
+
+
+def jobs(script, heights, pitches, output, trace=None, record=None):
+    kind = os.path.splitext(os.path.basename(script))[0]
+    for pitch in pitches:
+        for height in heights:
+            name = label(kind, height, pitch)
+            job = {'name': name,
+                   'script': script,
+                   'height': height,
+                   'pitch': pitch,
+                   'output': os.path.join(output, name)}
+            if trace:
+                job['trace'] = trace
+            if record:
+                job['record'] = record
+            yield job
+
+
+def command(exe, job):
+    params = ';'.join('{}={}'.format(x, job[x]) for x in PARAMS
+                      if job.get(x) is not None)
+    return [exe,
+            '/RunScript={}'.format(job['script']),
+            '/ScriptParams={}'.format(params),
+            '/Headless=True',
+            '/Splash=False',
+            '/Welcome=False',
+            '/ExitAfterScript=True']
+
+
+def run(exe, job, logs, timeout=None):
+    ''' one batch process, its output goes to logs/<name>.log,
+    an executable that cannot be started fails this job alone
+    with the error in its log and status -1 '''
+    log = os.path.join(logs, job['name'] + '.log')
+    start = time.time()
+    status = -1
+    with open(log, 'w') as f:
+        try:
+            process = subprocess.Popen(command(exe, job), stdout=f,
+                                       stderr=subprocess.STDOUT)
+        except OSError as error:
+            f.write('cannot run {}: {}\n'.format(exe, error))
+        else:
+            while process.poll() is None:
+                if timeout and time.time() - start > timeout:
+                    process.kill()
+                    process.wait()
+                    break
+                time.sleep(.1)
+            status = process.returncode
+    path = job['output'] + '.scdoc'
+    result = dict(job)
+    result.update({'status': status,
+                   'seconds': round(time.time() - start, 3),
+                   'path': path if os.path.exists(path) else None,
+                   'log': log})
+    return result
+
+
+def merge_traces(folder):
+    ''' trace-<pid>.json of every job as one trace.json, the
+    jobs are told apart by their pid '''
+    events = []
+    for path in sorted(glob.glob(os.path.join(folder, 'trace-*.json'))):
+        with open(path) as f:
+            events += json.load(f)['traceEvents']
+    events.sort(key=lambda x: x['ts'])
+    path = os.path.join(folder, 'trace.json')
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return path
+
+
+def sweep(exe, script, heights, pitches, output, processes=1,
+          logs=None, timeout=None, trace=None, record=None):
+    logs = logs or output
+    for folder in [output, logs] + [x for x in [trace, record] if x]:
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+    pool = ThreadPool(processes)
+    try:
+        results = pool.map(lambda x: run(exe, x, logs, timeout),
+                           list(jobs(script, heights, pitches, output,
+                                     trace, record)))
+    finally:
+        pool.close()
+        pool.join()
+    if trace:
+        merge_traces(trace)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('script', help='builder, e.g. script/3T.py')
+    parser.add_argument('--exe', default=EXE,
+                        help='SpaceClaim executable (or $SPACECLAIM)')
+    parser.add_argument('--heights', type=float, nargs='+',
+                        help='rib heights, mm, those of the builder '
+                             'by default')
+    parser.add_argument('--pitches', type=float, nargs='+',
+                        help='rib pitches, mm, those of the builder '
+                             'by default')
+    parser.add_argument('--output', default='geo',
+                        help='folder for the .scdoc files')
+    parser.add_argument('--logs', help='folder for the job logs, '
+                                       'defaults to --output')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='concurrent processes, at most the '
+                             'number of licences')
+    parser.add_argument('--timeout', type=float,
+                        help='seconds before a job is killed')
+    parser.add_argument('--summary', help='write the results as json')
+    parser.add_argument('--trace', help='folder for the per-variant csv '
+                                        'and the trace.json of the sweep')
+    parser.add_argument('--record', help='folder for the journal of '
+                                         'every job')
+    args = parser.parse_args(argv)
+
+    heights, pitches = args.heights, args.pitches
+    if not heights or not pitches:
+        try:
+            defined = tables(args.script)
+        except (IOError, ValueError) as error:
+            parser.error('{}, pass --heights and --pitches'.format(error))
+        heights, pitches = heights or defined[0], pitches or defined[1]
+
+    trace = args.trace and os.path.abspath(args.trace)
+    record = args.record and os.path.abspath(args.record)
+    results = sweep(args.exe, os.path.abspath(args.script), heights,
+                    pitches, os.path.abspath(args.output),
+                    args.jobs, args.logs, args.timeout, trace, record)
+
+    for x in results:
+        print('{:<12}{:>6}{:>10.1f}  {}'.format(
+            x['name'], x['status'], x['seconds'], x['path'] or '-'))
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    failed = [x for x in results if x['status'] != 0 or not x['path']]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
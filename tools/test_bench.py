@@ -0,0 +1,69 @@
+''' -------------------------------------------------------
+bench without SpaceClaim
+
+    python -m pytest tools
+------------------------------------------------------- '''
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import bench
+
+
+class Lines(list):
+    ''' what is printed, line by line '''
+
+    def write(self, text):
+        self.extend(text.splitlines())
+
+
+class BenchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.exe = os.environ.pop('SPACECLAIM', None)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        if self.exe is not None:
+            os.environ['SPACECLAIM'] = self.exe
+
+    def test_growth(self):
+        # synthetic costs of 1, 10 and 100 sections
+        self.assertEqual(bench.growth([1, 10, 100], [5, 50, 500]), (1., 5.))
+        exponent, marginal = bench.growth([10, 20], [100, 400])
+        self.assertAlmostEqual(exponent, 2.)
+        self.assertEqual(marginal, 30.)
+        # a fixed cost on top of a linear one grows slower
+        exponent, marginal = bench.growth([10, 20], [1010, 1020])
+        self.assertLess(exponent, .1)
+        self.assertEqual(marginal, 1.)
+        self.assertEqual(bench.growth([10, 10], [1, 2]), (None, None))
+        self.assertEqual(bench.growth([10, 20], [0, 10]), (None, 1.))
+
+    def test_report(self):
+        result = [(n, {'total': (1, 100. * n), 'share_topology': (1, n * n),
+                       'save': (1, 7.)}) for n in [10, 20]]
+        lines, stdout = Lines(), sys.stdout
+        sys.stdout = lines
+        try:
+            bench.report('2R', result, 'ops')
+        finally:
+            sys.stdout = stdout
+        rows = dict((x.split()[0], x) for x in lines if x)
+        self.assertTrue(rows['share_topology'].endswith('super-linear'))
+        self.assertFalse(rows['total'].endswith('super-linear'))
+        # a fixed cost does not grow
+        self.assertEqual(rows['save'].split()[-2:], ['0', '0.00'])
+
+    def test_skipped(self):
+        # plate is skipped by the stand-in before anything runs
+        argv = ['plate', '--output', self.folder]
+        self.assertEqual(bench.main(argv), 1)
+        self.assertEqual(bench.main(argv + ['--allow-skip']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+''' -------------------------------------------------------
+builders against the stand-in
+
+    python2.7 -m unittest discover tools
+
+The builders are IronPython 2 scripts, so these tests run
+under python2.7 only and are skipped by python 3.
+------------------------------------------------------- '''
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import standin
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, 'script')
+
+# the builders with an inventory the stand-in builds, plate
+# merges and splits by faces
+SUPPORTED = ['2F', '2R', '2T', '2V', '3F', '3R', '3T']
+
+# a second build of the same run at another pitch
+AGAIN = '''execfile({script!r}, globals())
+builder(MM({height}), MM({pitch}), {output!r}, force=True)
+'''
+
+
+@unittest.skipIf(sys.version_info[0] > 2,
+                 'the builders run under python2.7')
+class BuilderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def script(self, kind):
+        return os.path.join(SCRIPTS, kind + '.py')
+
+    def again(self, kind, height, pitch):
+        ''' the builder run at .3 mm and 10 mm, then built again
+        in the same run, returns the counts of that run '''
+        path = os.path.join(self.folder, 'again.py')
+        with open(path, 'w') as f:
+            f.write(AGAIN.format(script=self.script(kind), height=height,
+                                 pitch=pitch,
+                                 output=os.path.join(self.folder, 'b')))
+        return standin.run(path, {'height': '.3', 'pitch': '10',
+                                  'output': os.path.join(self.folder, 'a')})
+
+    def test_validate(self):
+        # the inventory is asserted on, a build off its count fails
+        for kind in SUPPORTED:
+            session = standin.run(self.script(kind), {
+                'height': '.3', 'pitch': '10', 'validate': 'True',
+                'output': os.path.join(self.folder, 'v')})
+            self.assertTrue(session.counts['Group.Create'], kind)
+
+    def test_replay(self):
+        # a build made again from its journal alone has the same
+        # named selections, of the same sizes
+        for kind in ['2R', '3R']:
+            output = os.path.join(self.folder, kind)
+            build = standin.run(self.script(kind), {
+                'height': '.3', 'pitch': '10', 'output': output,
+                'record': self.folder})
+            replay = standin.run(self.script(kind), {
+                'replay': output + '.journal.json',
+                'output': output + '-replay'})
+            groups = [dict((x.Name, len(x.items)) for x in y.root.Groups)
+                      for y in [build, replay]]
+            self.assertTrue(groups[0], kind)
+            self.assertEqual(groups[0], groups[1], kind)
+
+    def test_stabilizer_cache(self):
+        for kind in ['3R', '3T']:
+            once = standin.run(self.script(kind), {
+                'height': '.3', 'pitch': '10',
+                'output': os.path.join(self.folder, 'a')})
+            self.assertEqual(once.counts['DesignBody.Create'], 0)
+            # only the pitch changes: its middle, 4 inner and 4
+            # outer bodies are restored, the outer ones not revolved
+            hit = self.again(kind, .3, 5.)
+            self.assertEqual(hit.counts['DesignBody.Create'], 9)
+            self.assertEqual(hit.counts['RevolveFaces.Execute'],
+                             2 * once.counts['RevolveFaces.Execute'] - 4)
+            # the height changes, it is built again
+            miss = self.again(kind, .2, 10.)
+            self.assertEqual(miss.counts['DesignBody.Create'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+''' -------------------------------------------------------
+geometry and topology of the stand-in
+
+    python -m pytest tools
+
+The modeler alone, driven through the API as the builders
+drive it, against areas, volumes and counts worked out by
+hand.
+------------------------------------------------------- '''
+import math
+import unittest
+
+import standin
+from standin import (Combine, Component, ComponentHelper, Copy,
+                     CurveSegment, DatumPlaneCreator, Direction,
+                     ExtrudeFaces, GetRootPart, Line, Matrix, Paste,
+                     PlanarBody, Plane, Point, RevolveFaces, Selection,
+                     SplitBody)
+
+
+def rectangle(plane, x0, y0, x1, y1):
+    ''' the face of a sketch, x and y along the axes of plane '''
+    frame = plane.Frame
+
+    def at(x, y):
+        return Point(*[o + x * u + y * v for o, u, v in
+                       zip(frame.Origin, frame.DirX, frame.DirY)])
+    corners = [at(x0, y0), at(x1, y0), at(x1, y1), at(x0, y1)]
+    curves = [CurveSegment.Create(a, b)
+              for a, b in zip(corners, corners[1:] + corners[:1])]
+    return PlanarBody.Create(plane, curves).CreatedBody
+
+
+def cutter(origin, normal):
+    return DatumPlaneCreator.Create(Point(*origin), Direction(*normal),
+                                    False)
+
+
+class StandinTest(unittest.TestCase):
+
+    def setUp(self):
+        standin.session = standin.Session()
+
+    def tearDown(self):
+        standin.session = None
+
+    def extruded(self, length=3.):
+        sheet = rectangle(Plane.PlaneXY, 0., 0., 1., 2.)
+        return ExtrudeFaces.Execute(Selection.Create(sheet.Faces),
+                                    Direction.DirZ, length,
+                                    None).CreatedBody
+
+    def revolved(self, angle=2 * math.pi):
+        ''' a tube, radii 1 to 2 and 3 long about z '''
+        sheet = rectangle(Plane.PlaneZX, 0., 1., 3., 2.)
+        axis = Line.Create(Point.Origin, Direction.DirZ)
+        return RevolveFaces.Execute(Selection.Create(sheet.Faces), axis,
+                                    angle, None).CreatedBody
+
+    def test_sheet(self):
+        sheet = rectangle(Plane.PlaneXY, 0., 0., 1., 2.)
+        self.assertEqual(len(sheet.Faces), 1)
+        self.assertEqual(len(sheet.Edges), 4)
+        self.assertAlmostEqual(sheet.Faces[0].Area, 2.)
+        self.assertEqual(sorted(x.GetInterval().Span for x in sheet.Edges),
+                         [1., 1., 2., 2.])
+
+    def test_prism(self):
+        body = self.extruded()
+        self.assertEqual(GetRootPart().Bodies, [body])
+        self.assertEqual((len(body.Faces), len(body.Edges)), (6, 12))
+        self.assertAlmostEqual(body.Shape.Volume, 6.)
+        self.assertAlmostEqual(sum(x.Area for x in body.Faces), 22.)
+        box = body.Shape.GetBoundingBox(Matrix.Identity)
+        self.assertEqual(tuple(box.MinCorner), (0., 0., 0.))
+        self.assertEqual(tuple(box.MaxCorner), (1., 2., 3.))
+
+    def test_prism_split(self):
+        body = self.extruded()
+        SplitBody.ByCutter(Selection.Create(body),
+                           Selection.Create(cutter((0., 0., 1.),
+                                                   (0., 0., 1.)),
+                                            cutter((.5, 0., 0.),
+                                                   (1., 0., 0.))))
+        pieces = GetRootPart().Bodies
+        self.assertEqual(len(pieces), 4)
+        self.assertEqual(sorted(round(x.Shape.Volume, 9) for x in pieces),
+                         [1., 1., 2., 2.])
+        for piece in pieces:
+            self.assertEqual((len(piece.Faces), len(piece.Edges)), (6, 12))
+
+    def test_revolution(self):
+        body = self.revolved()
+        # inner, outer and both ends, each end ring bounded by
+        # one circle at either radius
+        self.assertEqual((len(body.Faces), len(body.Edges)), (4, 4))
+        self.assertAlmostEqual(body.Shape.Volume, math.pi * 3 * 3)
+        self.assertAlmostEqual(sorted(x.Area for x in body.Faces)[-1],
+                               2 * math.pi * 2 * 3)
+
+    def test_revolution_quarters(self):
+        body = self.revolved()
+        SplitBody.ByCutter(Selection.Create(body),
+                           Selection.Create(cutter((0., 0., 0.),
+                                                   (1., 0., 0.)),
+                                            cutter((0., 0., 0.),
+                                                   (0., 1., 0.))))
+        quarters = GetRootPart().Bodies
+        self.assertEqual(len(quarters), 4)
+        for quarter in quarters:
+            self.assertAlmostEqual(quarter.Shape.Volume, math.pi * 9 / 4)
+            self.assertEqual((len(quarter.Faces), len(quarter.Edges)),
+                             (6, 12))
+        corners = set()
+        for quarter in quarters:
+            box = quarter.Shape.GetBoundingBox(Matrix.Identity)
+            corners.add(tuple(round(x, 9) for x in box.MinCorner))
+        self.assertEqual(len(corners), 4)
+
+    def test_copies_keep_attributes(self):
+        body = self.extruded()
+        body.SetTextAttribute('role', 'solid')
+        body.Faces[0].SetTextAttribute('role', 'inlet')
+        Copy.ToClipboard(Selection.Create(body))
+        copy = Paste.FromClipboard().CreatedBodies[0]
+        self.assertEqual(copy.TryGetTextAttribute('role'), (True, 'solid'))
+        self.assertEqual(copy.Faces[0].TryGetTextAttribute('role'),
+                         (True, 'inlet'))
+        self.assertEqual(copy.Faces[1].TryGetTextAttribute('role'),
+                         (False, None))
+        self.assertIsNot(copy.Faces[0], body.Faces[0])
+
+    def test_component(self):
+        body = self.extruded()
+        component = ComponentHelper.MoveBodiesToComponent(
+            Selection.Create(body))
+        self.assertEqual(GetRootPart().Bodies, [])
+        instance = Component.Create(GetRootPart(), component.Template)
+        instance.Transform(Matrix.CreateTranslation(
+            standin.Vector(0., 0., 5.)))
+        box = instance.GetBodies()[0].Shape.GetBoundingBox(Matrix.Identity)
+        self.assertEqual(tuple(box.MinCorner), (0., 0., 5.))
+        self.assertAlmostEqual(instance.GetBodies()[0].Shape.Volume, 6.)
+
+    def test_unsupported(self):
+        body = self.extruded()
+        with self.assertRaises(NotImplementedError):
+            Combine.Merge(Selection.Create(body, self.extruded()))
+        with self.assertRaises(NotImplementedError):
+            SplitBody.ByCutter(Selection.Create(body),
+                               Selection.Create(body.Faces[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+''' -------------------------------------------------------
+sweep driver against a fake SpaceClaim
+
+    python -m pytest tools
+
+The fake takes the arguments of a batch job, saves an empty
+<output>.scdoc and exits 0, except for the heights it is told
+to fail, where it saves nothing and exits 3.
+------------------------------------------------------- '''
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+import sweep
+
+FAKE = '''#!{python}
+import sys
+params = dict(x.split('=', 1) for x in
+              sys.argv[2].split('=', 1)[1].split(';'))
+print('running {{}}'.format(sys.argv[1].split('=', 1)[1]))
+if float(params['height']) in {fail}:
+    sys.exit(3)
+open(params['output'] + '.scdoc', 'w').close()
+'''
+
+BUILDER = '''heights = {
+    MM(.1): '10',
+    MM(.2): '20'}
+
+pitches = {
+    MM(10.): '100'}
+'''
+
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.output = os.path.join(self.folder, 'geo')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def fake(self, fail=()):
+        path = os.path.join(self.folder, 'SpaceClaim')
+        with open(path, 'w') as f:
+            f.write(FAKE.format(python=sys.executable, fail=list(fail)))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def builder(self, source=BUILDER):
+        path = os.path.join(self.folder, '3T.py')
+        with open(path, 'w') as f:
+            f.write(source)
+        return path
+
+    def test_command(self):
+        job = {'name': '3T-30-100', 'script': '3T.py', 'height': .3,
+               'pitch': 10., 'output': 'geo/3T-30-100', 'trace': None}
+        self.assertEqual(sweep.command('sc', job)[:3], [
+            'sc', '/RunScript=3T.py',
+            '/ScriptParams=height=0.3;pitch=10.0;output=geo/3T-30-100;'
+            'script=3T.py'])
+
+    def test_grid(self):
+        results = sweep.sweep(self.fake(), '3T.py', [.1, .2], [5., 10.],
+                              self.output, processes=2)
+        self.assertEqual(sorted(x['name'] for x in results),
+                         ['3T-10-050', '3T-10-100',
+                          '3T-20-050', '3T-20-100'])
+        for x in results:
+            self.assertEqual(x['status'], 0)
+            self.assertTrue(os.path.exists(x['path']))
+            with open(x['log']) as f:
+                self.assertIn('running 3T.py', f.read())
+
+    def test_failed_job(self):
+        results = sweep.sweep(self.fake(fail=[.2]), '3T.py', [.1, .2],
+                              [10.], self.output)
+        status = dict((x['name'], (x['status'], x['path']))
+                      for x in results)
+        self.assertEqual(status['3T-10-100'][0], 0)
+        self.assertEqual(status['3T-20-100'], (3, None))
+
+    def test_missing_exe(self):
+        exe = os.path.join(self.folder, 'missing')
+        results = sweep.sweep(exe, '3T.py', [.1, .2], [10.], self.output)
+        self.assertEqual(len(results), 2)
+        for x in results:
+            self.assertEqual((x['status'], x['path']), (-1, None))
+            with open(x['log']) as f:
+                self.assertIn('cannot run', f.read())
+
+    def test_tables(self):
+        self.assertEqual(sweep.tables(self.builder()), [[.1, .2], [10.]])
+        with self.assertRaises(ValueError):
+            sweep.tables(self.builder('pitches = {}\n'))
+
+    def test_main(self):
+        exe, script = self.fake(fail=[.2]), self.builder()
+        self.assertEqual(sweep.main([script, '--exe', exe, '--heights',
+                                     '.1', '--output', self.output]), 0)
+        self.assertEqual(sweep.main([script, '--exe', exe,
+                                     '--output', self.output]), 1)
+        self.assertEqual(sorted(os.listdir(self.output)),
+                         ['3T-10-100.log', '3T-10-100.scdoc',
+                          '3T-20-100.log'])
+
+    def test_main_without_tables(self):
+        script = self.builder('')
+        with self.assertRaises(SystemExit):
+            sweep.main([script, '--exe', self.fake(), '--output',
+                        self.output])
+        self.assertEqual(sweep.main([script, '--exe', self.fake(),
+                                     '--heights', '.1', '--pitches', '5',
+                                     '--output', self.output]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()